@@ -25,7 +25,11 @@ from .const import VacuumEyePowerMode  # noqa: F401
 from .const import VacuumHeuristPowerMode  # noqa: F401
 from .const import VacuumState  # noqa: F401
 from .const import WaterHardness  # noqa: F401
+from .connection_manager import DysonConnectionManager  # noqa: F401
 from .discovery import DysonDiscovery  # noqa: F401
+from .dispatch import AsyncioDispatcher  # noqa: F401
+from .dispatch import InlineDispatcher  # noqa: F401
+from .dispatch import ThreadDispatcher  # noqa: F401
 from .dyson_360_eye import Dyson360Eye
 from .dyson_360_heurist import Dyson360Heurist
 from .dyson_device import DysonDevice
@@ -35,6 +39,9 @@ from .dyson_pure_cool_link import DysonPureCoolLink
 from .dyson_pure_hot_cool import DysonPureHotCool
 from .dyson_pure_hot_cool_link import DysonPureHotCoolLink
 from .dyson_pure_humidify_cool import DysonPureHumidifyCool, DysonPurifierHumidifyCoolFormaldehyde
+from .fleet import DysonEnvironmentalPoller  # noqa: F401
+from .fleet import connect_all  # noqa: F401
+from .reconnect import ReconnectPolicy  # noqa: F401
 from .utils import get_mqtt_info_from_wifi_info  # noqa: F401
 
 
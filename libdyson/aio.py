@@ -0,0 +1,368 @@
+"""Asyncio interface of Dyson devices."""
+
+import asyncio
+from concurrent.futures import Future
+import logging
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+import paho.mqtt.client as mqtt
+
+from . import get_device
+from .connection_manager import _ClientState, _report_connect_fail
+from .const import MessageType
+from .dyson_device import (
+    TIMEOUT,
+    ChangeListener,
+    DysonDevice,
+    DysonFanDevice,
+    _connection_error,
+)
+from .dyson_vacuum_device import DysonVacuumDevice
+from .exceptions import DysonConnectTimeout
+from .reconnect import ReconnectPolicy
+from .state import DysonSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+MISC_INTERVAL = 1
+
+
+class _AsyncioNetwork:
+    """Serve the network I/O of MQTT clients on an asyncio event loop."""
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, reconnect_policy: ReconnectPolicy
+    ):
+        """Initialize the network."""
+        self._loop = loop
+        self._reconnect_policy = reconnect_policy
+        self._clients: Dict[mqtt.Client, _ClientState] = {}
+        self._reconnect_handles: Dict[mqtt.Client, asyncio.TimerHandle] = {}
+        self._misc_handle = None
+
+    def register(self, client: mqtt.Client, host: str) -> None:
+        """Connect a client to host and serve its network I/O."""
+        client.on_socket_open = self._on_socket_open
+        client.on_socket_close = self._on_socket_close
+        client.on_socket_register_write = self._on_socket_register_write
+        client.on_socket_unregister_write = self._on_socket_unregister_write
+        client.connect_async(host)
+        self._clients[client] = _ClientState()
+        self._loop.create_task(self._connect(client))
+        if self._misc_handle is None:
+            self._misc_handle = self._loop.call_later(MISC_INTERVAL, self._misc)
+
+    def unregister(self, client: mqtt.Client) -> None:
+        """Stop reconnecting a client and release it once disconnected."""
+        state = self._clients.get(client)
+        if state is None:
+            return
+        state.closing = True
+        if client.socket() is None and not state.connecting:
+            self._discard(client)
+
+    def _discard(self, client: mqtt.Client) -> None:
+        self._clients.pop(client, None)
+        handle = self._reconnect_handles.pop(client, None)
+        if handle is not None:
+            handle.cancel()
+        client.on_socket_open = None
+        client.on_socket_close = None
+        client.on_socket_register_write = None
+        client.on_socket_unregister_write = None
+        if not self._clients and self._misc_handle is not None:
+            self._misc_handle.cancel()
+            self._misc_handle = None
+
+    async def _connect(self, client: mqtt.Client) -> None:
+        self._reconnect_handles.pop(client, None)
+        state = self._clients.get(client)
+        if state is None or state.closing:
+            return
+        state.connecting = True
+        # paho only offers a blocking TCP connect, which is the single step
+        # that has to run on the executor.
+        try:
+            await self._loop.run_in_executor(None, client.reconnect)
+        except (OSError, ValueError) as err:
+            _LOGGER.debug("Failed to connect: %s", err)
+            state.connecting = False
+            if state.closing:
+                self._discard(client)
+            else:
+                _report_connect_fail(client)
+                self._schedule_reconnect(client)
+            return
+        state.connecting = False
+        if state.closing:
+            # Disconnect was requested while the connection was being opened
+            client.disconnect()
+
+    def _schedule_reconnect(self, client: mqtt.Client) -> None:
+        state = self._clients.get(client)
+        if state is None:
+            return
+        delay = self._reconnect_policy.delay(state.failures)
+        state.failures += 1
+        self._reconnect_handles[client] = self._loop.call_later(
+            delay, lambda: self._loop.create_task(self._connect(client))
+        )
+
+    def _call(self, func: Callable, *args) -> None:
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            func(*args)
+        else:
+            self._loop.call_soon_threadsafe(func, *args)
+
+    def _on_socket_open(self, client: mqtt.Client, userdata, sock) -> None:
+        def _opened():
+            state = self._clients.get(client)
+            if state is None:
+                return
+            state.failures = 0
+            self._loop.add_reader(sock, client.loop_read)
+
+        self._call(_opened)
+
+    def _on_socket_close(self, client: mqtt.Client, userdata, sock) -> None:
+        def _closed():
+            self._loop.remove_reader(sock)
+            self._loop.remove_writer(sock)
+            state = self._clients.get(client)
+            if state is None:
+                return
+            if state.closing:
+                if not state.connecting:
+                    self._discard(client)
+            else:
+                self._schedule_reconnect(client)
+
+        self._call(_closed)
+
+    def _on_socket_register_write(self, client: mqtt.Client, userdata, sock) -> None:
+        self._call(self._loop.add_writer, sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, client: mqtt.Client, userdata, sock) -> None:
+        self._call(self._loop.remove_writer, sock)
+
+    def _misc(self) -> None:
+        for client in list(self._clients):
+            client.loop_misc()
+        self._misc_handle = self._loop.call_later(MISC_INTERVAL, self._misc)
+
+
+class AsyncDysonDevice:
+    """Asyncio interface of a Dyson device.
+
+    Connection and disconnection are awaitable. Properties of the wrapped
+    device are available directly, and its public methods, e.g. ``set_speed``,
+    are exposed as coroutines. Commands returning a future wait for it, so
+    awaiting them waits for the device to report the new values.
+    """
+
+    def __init__(self, device: DysonDevice):
+        """Initialize the device."""
+        self._device = device
+        self._network: Optional[_AsyncioNetwork] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._updated: Optional[asyncio.Event] = None
+        self._queues: List[asyncio.Queue] = []
+        device.add_message_listener(self._on_message)
+
+    @property
+    def device(self) -> DysonDevice:
+        """Return the wrapped device."""
+        return self._device
+
+    def snapshot(self) -> DysonSnapshot:
+        """Return an immutable snapshot of the current state."""
+        return self._device.snapshot()
+
+    def __getattr__(self, name: str) -> Any:
+        """Forward properties and commands to the wrapped device."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = getattr(self._device, name)
+        if not callable(value):
+            return value
+
+        async def _command(*args, **kwargs):
+            result = value(*args, **kwargs)
+            if isinstance(result, Future):
+                return await asyncio.wrap_future(result, loop=self._loop)
+            return result
+
+        return _command
+
+    async def connect(
+        self,
+        host: str,
+        wait_for_data: bool = True,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Connect to the device MQTT broker.
+
+        The whole connection, including receiving the first data, must finish
+        within timeout, TIMEOUT by default. If wait_for_data is False, this
+        returns as soon as the broker accepts the connection and the data is
+        filled in when it arrives.
+        """
+        device = self._device
+        self._loop = asyncio.get_running_loop()
+        deadline = self._loop.time() + (TIMEOUT if timeout is None else timeout)
+        self._network = _AsyncioNetwork(self._loop, device.reconnect_policy)
+        self._updated = asyncio.Event()
+        connected = self._loop.create_future()
+
+        def _on_connect(client: mqtt.Client, userdata: Any, flags, rc):
+            _LOGGER.debug("Connected with result code %d", rc)
+            error = _connection_error(rc)
+            if error is None:
+                client.subscribe(device._status_topic)
+            device._connected.set()
+            if not connected.done():
+                connected.set_result(error)
+
+        def _on_disconnect(client, userdata, rc):
+            _LOGGER.debug(f"Disconnected with result code {str(rc)}")
+
+        device._disconnected.clear()
+        client = mqtt.Client(protocol=mqtt.MQTTv31)
+        client.username_pw_set(device._serial, device._credential)
+        client.on_connect = _on_connect
+        client.on_disconnect = _on_disconnect
+        client.on_message = device._on_message
+        device._mqtt_client = client
+        self._network.register(client, host)
+
+        try:
+            error = await asyncio.wait_for(connected, deadline - self._loop.time())
+        except asyncio.TimeoutError:
+            error = DysonConnectTimeout
+        if error is None:
+            _LOGGER.info("Connected to device %s", device.serial)
+            try:
+                if wait_for_data:
+                    await asyncio.wait_for(
+                        self._request_first_data(), deadline - self._loop.time()
+                    )
+                else:
+                    device._request_data()
+            except asyncio.TimeoutError:
+                error = DysonConnectTimeout
+            else:
+                device._install_callbacks(client)
+                return
+
+        await self.disconnect()
+        raise error
+
+    async def disconnect(self) -> None:
+        """Disconnect from the device."""
+        device = self._device
+        client = device._mqtt_client
+        disconnected = self._loop.create_future()
+        on_disconnect = client.on_disconnect
+
+        def _on_disconnect(client, userdata, rc):
+            on_disconnect(client, userdata, rc)
+            if not disconnected.done():
+                disconnected.set_result(None)
+
+        client.on_disconnect = _on_disconnect
+        device._before_disconnect()
+        device._connected.clear()
+        self._network.unregister(client)
+        if client.disconnect() != mqtt.MQTT_ERR_NO_CONN:
+            try:
+                await asyncio.wait_for(disconnected, TIMEOUT)
+            except asyncio.TimeoutError:
+                _LOGGER.warning("Disconnect timed out")
+        device._disconnected.set()
+        device._mqtt_client = None
+        device._after_disconnect()
+
+    def add_message_listener(self, callback) -> None:
+        """Add a callback to receive update notification."""
+        self._device.add_message_listener(callback)
+
+    def remove_message_listener(self, callback) -> None:
+        """Remove an existed callback."""
+        self._device.remove_message_listener(callback)
+
+    def add_change_listener(
+        self, callback: ChangeListener, fields: Optional[Iterable[str]] = None
+    ) -> None:
+        """Add a callback to receive changed fields."""
+        self._device.add_change_listener(callback, fields)
+
+    def remove_change_listener(self, callback) -> None:
+        """Remove an existed change callback."""
+        self._device.remove_change_listener(callback)
+
+    async def updates(self) -> AsyncIterator[MessageType]:
+        """Iterate over update notifications."""
+        queue = asyncio.Queue()
+        self._queues.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.remove(queue)
+
+    def _on_message(self, message_type: MessageType) -> None:
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._notify, message_type)
+
+    def _notify(self, message_type: MessageType) -> None:
+        self._updated.set()
+        for queue in self._queues:
+            queue.put_nowait(message_type)
+
+    async def _wait_until(self, predicate: Callable[[], bool]) -> None:
+        while not predicate():
+            self._updated.clear()
+            await self._updated.wait()
+
+    async def _request_first_data(self) -> None:
+        """Request and wait for first data."""
+        self._device._request_data()
+        await self._wait_until(lambda: self._device.is_data_available)
+
+
+class AsyncDysonFanDevice(AsyncDysonDevice):
+    """Asyncio interface of a Dyson fan device."""
+
+    def batch(self) -> ContextManager[None]:
+        """Send the configuration changes made in the context together."""
+        return self._device.batch()
+
+
+class AsyncDysonVacuumDevice(AsyncDysonDevice):
+    """Asyncio interface of a Dyson vacuum device."""
+
+
+def get_async_device(
+    serial: str, credential: str, device_type: str
+) -> Optional[AsyncDysonDevice]:
+    """Get a new AsyncDysonDevice instance."""
+    device = get_device(serial, credential, device_type)
+    if isinstance(device, DysonFanDevice):
+        return AsyncDysonFanDevice(device)
+    if isinstance(device, DysonVacuumDevice):
+        return AsyncDysonVacuumDevice(device)
+    return None
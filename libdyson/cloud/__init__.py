@@ -3,5 +3,11 @@
 from .account import DysonAccount, DysonAccountCN  # noqa: F401
 from .cloud_360_eye import DysonCloud360Eye  # noqa: F401
 from .cloud_device import DysonCloudDevice  # noqa: F401
+from .credential_store import CredentialStore  # noqa: F401
+from .credential_store import FileCredentialStore  # noqa: F401
+from .credential_store import StoredDevice  # noqa: F401
 from .device_info import DysonDeviceInfo  # noqa: F401
+from .map_cache import MapCache  # noqa: F401
 from .regions import REGIONS  # noqa: F401
+from .retry import CircuitBreaker  # noqa: F401
+from .retry import RetryPolicy  # noqa: F401
@@ -1,13 +1,17 @@
 """Dyson cloud account client."""
 
 import pathlib
-from typing import Callable, List, Optional
+import time
+from typing import Callable, List, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase, HTTPBasicAuth
+from urllib3.util.retry import Retry
 
 from libdyson.exceptions import (
     DysonAuthRequired,
+    DysonCircuitOpen,
     DysonInvalidAccountStatus,
     DysonInvalidAuth,
     DysonLoginFailure,
@@ -17,6 +21,8 @@ from libdyson.exceptions import (
 )
 
 from .device_info import DysonDeviceInfo
+from .retry import RetryPolicy, get_circuit_breaker
+from .utils import decrypt_passwords
 
 DYSON_API_HOST = "https://appapi.cp.dyson.com"
 DYSON_API_HOST_CN = "https://appapi.cp.dyson.cn"
@@ -31,8 +37,95 @@ API_PATH_MOBILE_REQUEST = "/v3/userregistration/mobile/auth"
 API_PATH_MOBILE_VERIFY = "/v3/userregistration/mobile/verify"
 API_PATH_DEVICES = "/v2/provisioningservice/manifest"
 
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (10, 30)  # Connect and read timeouts in seconds
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+Timeout = Union[float, Tuple[float, float]]
+
 FILE_PATH = pathlib.Path(__file__).parent.absolute()
 
+
+def create_session(
+    pool_size: int = DEFAULT_POOL_SIZE, retries: Union[int, Retry] = 0
+) -> requests.Session:
+    """Create a session keeping up to pool_size connections per host alive.
+
+    retries is passed to urllib3. An int only retries failed connections.
+    The session may be shared by several accounts.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _limit_timeout(timeout: Optional[Timeout], deadline: Optional[float]) -> Timeout:
+    """Limit timeout to the time left until deadline, a time.monotonic() value."""
+    if deadline is None:
+        return timeout
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DysonNetworkError
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(min(value, remaining) for value in timeout)
+    return min(timeout, remaining)
+
+
+def _parse_devices(manifest: List[dict]) -> List[DysonDeviceInfo]:
+    """Parse the device manifest."""
+    # Lightcycle lights don't have LocalCredentials.
+    # They're not supported so just skip.
+    # See https://github.com/shenxn/libdyson/issues/2 for more info
+    raws = [raw for raw in manifest if raw.get("LocalCredentials") is not None]
+    credentials = decrypt_passwords(raw["LocalCredentials"] for raw in raws)
+    return [
+        DysonDeviceInfo.from_raw(raw, credential)
+        for raw, credential in zip(raws, credentials)
+    ]
+
+
+class _ManifestCache:
+    """Device manifest of an account kept for ttl seconds."""
+
+    def __init__(self, ttl: float):
+        """Initialize the cache."""
+        self._ttl = ttl
+        self._devices: Optional[List[DysonDeviceInfo]] = None
+        self._etag: Optional[str] = None
+        self._expires = 0.0
+
+    def get(self) -> Optional[List[DysonDeviceInfo]]:
+        """Return the devices if they have not expired."""
+        if self._devices is None or time.monotonic() >= self._expires:
+            return None
+        return list(self._devices)
+
+    def conditional_headers(self) -> Optional[dict]:
+        """Return the headers to fetch the manifest only if it changed."""
+        if self._devices is None or self._etag is None:
+            return None
+        return {"If-None-Match": self._etag}
+
+    def update(
+        self, status_code: int, etag: Optional[str], manifest: Callable[[], list]
+    ) -> List[DysonDeviceInfo]:
+        """Update the cache with a response and return the devices."""
+        if status_code != 304 or self._devices is None:
+            self._devices = _parse_devices(manifest())
+            self._etag = etag
+        self._expires = time.monotonic() + self._ttl
+        return list(self._devices)
+
+    def invalidate(self) -> None:
+        """Drop the cached devices."""
+        self._devices = None
+        self._etag = None
+
+
 class HTTPBearerAuth(AuthBase):
     """Attaches HTTP Bearder Authentication to the given Request object."""
 
@@ -62,9 +155,45 @@ class DysonAccount:
     def __init__(
         self,
         auth_info: Optional[dict] = None,
+        session: Optional[requests.Session] = None,
+        timeout: Optional[Timeout] = DEFAULT_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        retries: Union[int, Retry] = 0,
+        retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+        manifest_ttl: Optional[float] = None,
     ):
-        """Create a new Dyson account."""
+        """Create a new Dyson account.
+
+        Requests go through session, which is left open by close(). Without
+        a session, the account creates its own with pool_size and retries.
+        GET requests failing with a network error, 429 or 5xx are retried
+        following retry_policy. All accounts share a circuit breaker per host.
+        If manifest_ttl is given, devices() keeps its result for that many
+        seconds, then asks the cloud whether the manifest changed.
+        """
         self._auth_info = auth_info
+        self._timeout = timeout
+        self._retry_policy = retry_policy
+        self._manifest_cache = (
+            None if manifest_ttl is None else _ManifestCache(manifest_ttl)
+        )
+        self._owns_session = session is None
+        if session is None:
+            session = create_session(pool_size, retries)
+        self._session = session
+
+    def close(self) -> None:
+        """Close the connections of the account."""
+        if self._owns_session:
+            self._session.close()
+
+    def __enter__(self) -> "DysonAccount":
+        """Enter the context."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the account when exiting the context."""
+        self.close()
 
     @property
     def auth_info(self) -> Optional[dict]:
@@ -94,21 +223,77 @@ class DysonAccount:
         params: Optional[dict] = None,
         data: Optional[dict] = None,
         auth: bool = True,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+        headers: Optional[dict] = None,
+        stream: bool = False,
     ) -> requests.Response:
-        """Make API request."""
+        """Make API request.
+
+        timeout replaces the timeout of the account for this request. If a
+        deadline is given as a time.monotonic() value, DysonNetworkError is
+        raised once it has passed, and the timeout is cut to the time left.
+        requests applies the read timeout to each socket read, so this bounds
+        connecting and waiting for the first byte, but a body arriving slowly
+        may be read past the deadline. If stream is True, the body is read by
+        the caller, who must close the response.
+        """
         if auth and self._auth is None:
             raise DysonAuthRequired
-        try:
-            response = requests.request(
-                method,
-                self._HOST + path,
-                params=params,
-                json=data,
-                headers=DYSON_API_HEADERS,
-                auth=self._auth if auth else None,
-                verify=True,
+        if timeout is None:
+            timeout = self._timeout
+        if headers is not None:
+            headers = {**DYSON_API_HEADERS, **headers}
+        else:
+            headers = DYSON_API_HEADERS
+        breaker = get_circuit_breaker(self._HOST)
+        retry_policy = self._retry_policy if method == "GET" else None
+        attempt = 0
+        while True:
+            request_timeout = _limit_timeout(timeout, deadline)
+            if not breaker.allow():
+                raise DysonCircuitOpen
+            try:
+                response = self._session.request(
+                    method,
+                    self._HOST + path,
+                    params=params,
+                    json=data,
+                    headers=headers,
+                    auth=self._auth if auth else None,
+                    verify=True,
+                    timeout=request_timeout,
+                    stream=stream,
+                )
+            except requests.RequestException:
+                breaker.record_failure()
+                response = None
+            except BaseException:
+                # Let another request try the host
+                breaker.release()
+                raise
+            else:
+                if 500 <= response.status_code < 600:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if retry_policy is None:
+                break
+            delay = retry_policy.delay(
+                attempt,
+                None if response is None else response.status_code,
+                None if response is None else response.headers.get("Retry-After"),
             )
-        except requests.RequestException:
+            if delay is None or (
+                deadline is not None and time.monotonic() + delay >= deadline
+            ):
+                break
+            if response is not None:
+                # Give the connection back to the pool before waiting
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+        if response is None:
             raise DysonNetworkError
         if response.status_code in [401, 403]:
             raise DysonInvalidAuth
@@ -161,22 +346,39 @@ class DysonAccount:
                 raise DysonLoginFailure
             body = response.json()
             self._auth_info = body
+            self.invalidate_devices()
             return self._auth_info
 
         return _verify
 
-    def devices(self) -> List[DysonDeviceInfo]:
+    def devices(
+        self, timeout: Optional[Timeout] = None, deadline: Optional[float] = None
+    ) -> List[DysonDeviceInfo]:
         """Get device info from cloud account."""
-        devices = []
-        response = self.request("GET", API_PATH_DEVICES)
-        for raw in response.json():
-            if raw.get("LocalCredentials") is None:
-                # Lightcycle lights don't have LocalCredentials.
-                # They're not supported so just skip.
-                # See https://github.com/shenxn/libdyson/issues/2 for more info
-                continue
-            devices.append(DysonDeviceInfo.from_raw(raw))
-        return devices
+        cache = self._manifest_cache
+        if cache is None:
+            response = self.request(
+                "GET", API_PATH_DEVICES, timeout=timeout, deadline=deadline
+            )
+            return _parse_devices(response.json())
+        devices = cache.get()
+        if devices is not None:
+            return devices
+        response = self.request(
+            "GET",
+            API_PATH_DEVICES,
+            timeout=timeout,
+            deadline=deadline,
+            headers=cache.conditional_headers(),
+        )
+        return cache.update(
+            response.status_code, response.headers.get("ETag"), response.json
+        )
+
+    def invalidate_devices(self) -> None:
+        """Drop the cached device manifest."""
+        if self._manifest_cache is not None:
+            self._manifest_cache.invalidate()
 
 
 class DysonAccountCN(DysonAccount):
@@ -212,6 +414,7 @@ class DysonAccountCN(DysonAccount):
                 raise DysonLoginFailure
             body = response.json()
             self._auth_info = body
+            self.invalidate_devices()
             return self._auth_info
 
         return _verify
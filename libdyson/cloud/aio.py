@@ -0,0 +1,370 @@
+"""Asyncio interface of the Dyson cloud.
+
+Requires aiohttp, installed with the aiohttp extra.
+"""
+
+import asyncio
+import base64
+import json
+import time
+from typing import Awaitable, Callable, List, Mapping, Optional
+
+import aiohttp
+import attr
+
+from libdyson.exceptions import (
+    DysonAuthRequired,
+    DysonCircuitOpen,
+    DysonInvalidAccountStatus,
+    DysonInvalidAuth,
+    DysonLoginFailure,
+    DysonNetworkError,
+    DysonOTPTooFrequently,
+    DysonServerError,
+)
+
+from .account import (
+    API_PATH_DEVICES,
+    API_PATH_EMAIL_REQUEST,
+    API_PATH_EMAIL_VERIFY,
+    API_PATH_MOBILE_REQUEST,
+    API_PATH_MOBILE_VERIFY,
+    API_PATH_USER_STATUS,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RETRY_POLICY,
+    DEFAULT_TIMEOUT,
+    DYSON_API_HEADERS,
+    DYSON_API_HOST,
+    DYSON_API_HOST_CN,
+    Timeout,
+    _limit_timeout,
+    _ManifestCache,
+    _parse_devices,
+)
+from .cloud_360_eye import CleaningTask
+from .device_info import DysonDeviceInfo
+from .retry import RetryPolicy, get_circuit_breaker
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class CloudResponse:
+    """Response of a cloud API request."""
+
+    status_code: int
+    content: bytes
+    headers: Mapping[str, str] = attr.Factory(dict)
+
+    def json(self):
+        """Return the decoded JSON body."""
+        return json.loads(self.content)
+
+
+def _client_timeout(
+    timeout: Optional[Timeout], deadline: Optional[float]
+) -> aiohttp.ClientTimeout:
+    total = None if deadline is None else _limit_timeout(None, deadline)
+    if timeout is None:
+        return aiohttp.ClientTimeout(total=total)
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return aiohttp.ClientTimeout(total=total, sock_connect=connect, sock_read=read)
+    if total is not None:
+        timeout = min(timeout, total)
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+class AsyncDysonAccount:
+    """Dyson account on asyncio."""
+
+    _HOST = DYSON_API_HOST
+
+    def __init__(
+        self,
+        auth_info: Optional[dict] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        timeout: Optional[Timeout] = DEFAULT_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+        manifest_ttl: Optional[float] = None,
+    ):
+        """Create a new Dyson account.
+
+        Requests go through session, which is left open by close(). Without
+        a session, the account creates its own keeping up to pool_size
+        connections alive. Retries, circuit breakers and the manifest cache
+        work the same as DysonAccount.
+        """
+        self._auth_info = auth_info
+        self._timeout = timeout
+        self._retry_policy = retry_policy
+        self._manifest_cache = (
+            None if manifest_ttl is None else _ManifestCache(manifest_ttl)
+        )
+        self._pool_size = pool_size
+        self._owns_session = session is None
+        self._session = session
+
+    @property
+    def auth_info(self) -> Optional[dict]:
+        """Return the authentication info."""
+        return self._auth_info
+
+    @property
+    def _authorization(self) -> Optional[str]:
+        if self.auth_info is None:
+            return None
+        # Basic auth for backward capability to already stored auth info
+        if "Password" in self.auth_info:
+            credentials = f"{self.auth_info['Account']}:{self.auth_info['Password']}"
+            return "Basic " + base64.b64encode(credentials.encode()).decode()
+        elif self.auth_info.get("tokenType") == "Bearer":
+            return f"Bearer {self.auth_info['token']}"
+        return None
+
+    async def close(self) -> None:
+        """Close the connections of the account."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncDysonAccount":
+        """Enter the context."""
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        """Close the account when exiting the context."""
+        await self.close()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict] = None,
+        data: Optional[dict] = None,
+        auth: bool = True,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+        headers: Optional[dict] = None,
+    ) -> CloudResponse:
+        """Make API request.
+
+        timeout replaces the timeout of the account for this request. If a
+        deadline is given as a time.monotonic() value, the whole request must
+        finish by then or DysonNetworkError is raised.
+        """
+        if timeout is None:
+            timeout = self._timeout
+        headers = {**DYSON_API_HEADERS, **(headers or {})}
+        if auth:
+            authorization = self._authorization
+            if authorization is None:
+                raise DysonAuthRequired
+            headers["Authorization"] = authorization
+        if self._session is None:
+            # Created on first use so that it is bound to the running loop
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self._pool_size)
+            )
+        breaker = get_circuit_breaker(self._HOST)
+        retry_policy = self._retry_policy if method == "GET" else None
+        attempt = 0
+        while True:
+            client_timeout = _client_timeout(timeout, deadline)
+            if not breaker.allow():
+                raise DysonCircuitOpen
+            status = None
+            try:
+                async with self._session.request(
+                    method,
+                    self._HOST + path,
+                    params=params,
+                    json=data,
+                    headers=headers,
+                    timeout=client_timeout,
+                ) as response:
+                    content = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                breaker.record_failure()
+            except BaseException:
+                # Let another request try the host, e.g. when cancelled
+                breaker.release()
+                raise
+            else:
+                status = response.status
+                if 500 <= status < 600:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if retry_policy is None:
+                break
+            delay = retry_policy.delay(
+                attempt,
+                status,
+                None if status is None else response.headers.get("Retry-After"),
+            )
+            if delay is None or (
+                deadline is not None and time.monotonic() + delay >= deadline
+            ):
+                break
+            await asyncio.sleep(delay)
+            attempt += 1
+        if status is None:
+            raise DysonNetworkError
+        if status in [401, 403]:
+            raise DysonInvalidAuth
+        if 500 <= status < 600:
+            raise DysonServerError
+        return CloudResponse(status, content, response.headers)
+
+    async def login_email_otp(
+        self, email: str, region: str
+    ) -> Callable[[str, str], Awaitable[dict]]:
+        """Login using email and OTP code."""
+        # Check account status first. This is expected by the cloud API.
+        response = await self.request(
+            "POST",
+            API_PATH_USER_STATUS,
+            params={"country": region},
+            data={"email": email},
+            auth=False,
+        )
+        account_status = response.json()["accountStatus"]
+        if account_status != "ACTIVE":
+            raise DysonInvalidAccountStatus(account_status)
+
+        response = await self.request(
+            "POST",
+            API_PATH_EMAIL_REQUEST,
+            params={"country": region, "culture": "en-US"},
+            data={"email": email},
+            auth=False,
+        )
+        if response.status_code == 429:
+            raise DysonOTPTooFrequently
+
+        challenge_id = response.json()["challengeId"]
+
+        async def _verify(otp_code: str, password: str):
+            response = await self.request(
+                "POST",
+                API_PATH_EMAIL_VERIFY,
+                data={
+                    "email": email,
+                    "password": password,
+                    "challengeId": challenge_id,
+                    "otpCode": otp_code,
+                },
+                auth=False,
+            )
+            if response.status_code == 400:
+                raise DysonLoginFailure
+            self._auth_info = response.json()
+            self.invalidate_devices()
+            return self._auth_info
+
+        return _verify
+
+    async def devices(
+        self, timeout: Optional[Timeout] = None, deadline: Optional[float] = None
+    ) -> List[DysonDeviceInfo]:
+        """Get device info from cloud account."""
+        cache = self._manifest_cache
+        if cache is None:
+            response = await self.request(
+                "GET", API_PATH_DEVICES, timeout=timeout, deadline=deadline
+            )
+            return _parse_devices(response.json())
+        devices = cache.get()
+        if devices is not None:
+            return devices
+        response = await self.request(
+            "GET",
+            API_PATH_DEVICES,
+            timeout=timeout,
+            deadline=deadline,
+            headers=cache.conditional_headers(),
+        )
+        return cache.update(
+            response.status_code, response.headers.get("ETag"), response.json
+        )
+
+    def invalidate_devices(self) -> None:
+        """Drop the cached device manifest."""
+        if self._manifest_cache is not None:
+            self._manifest_cache.invalidate()
+
+
+class AsyncDysonAccountCN(AsyncDysonAccount):
+    """Dyson account in Mainland China on asyncio."""
+
+    _HOST = DYSON_API_HOST_CN
+
+    async def login_mobile_otp(self, mobile: str) -> Callable[[str], Awaitable[dict]]:
+        """Login using phone number and OTP code."""
+        response = await self.request(
+            "POST",
+            API_PATH_MOBILE_REQUEST,
+            data={"mobile": mobile},
+            auth=False,
+        )
+        if response.status_code == 429:
+            raise DysonOTPTooFrequently
+
+        challenge_id = response.json()["challengeId"]
+
+        async def _verify(otp_code: str):
+            response = await self.request(
+                "POST",
+                API_PATH_MOBILE_VERIFY,
+                data={
+                    "mobile": mobile,
+                    "challengeId": challenge_id,
+                    "otpCode": otp_code,
+                },
+                auth=False,
+            )
+            if response.status_code == 400:
+                raise DysonLoginFailure
+            self._auth_info = response.json()
+            self.invalidate_devices()
+            return self._auth_info
+
+        return _verify
+
+
+class AsyncDysonCloud360Eye:
+    """Dyson 360 Eye cloud client on asyncio."""
+
+    def __init__(self, account: AsyncDysonAccount, serial: str):
+        """Initialize the client."""
+        self._account = account
+        self._serial = serial
+
+    async def get_cleaning_history(
+        self, timeout: Optional[Timeout] = None, deadline: Optional[float] = None
+    ) -> List[CleaningTask]:
+        """Get cleaning history from the cloud."""
+        response = await self._account.request(
+            "GET",
+            f"/v1/assets/devices/{self._serial}/cleanhistory",
+            timeout=timeout,
+            deadline=deadline,
+        )
+        return [CleaningTask.from_raw(raw) for raw in response.json()["Entries"]]
+
+    async def get_cleaning_map(
+        self,
+        cleaning_id: str,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> Optional[bytes]:
+        """Get cleaning map in PNG format."""
+        response = await self._account.request(
+            "GET",
+            f"/v1/mapvisualizer/devices/{self._serial}/map/{cleaning_id}",
+            timeout=timeout,
+            deadline=deadline,
+        )
+        if response.status_code == 404:
+            return None  # No map associate with the cleaning id
+        return response.content
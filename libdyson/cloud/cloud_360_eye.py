@@ -1,12 +1,26 @@
 """Dyson 360 Eye cloud client."""
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import List, Optional
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
 import attr
+import requests
 
+from libdyson.exceptions import DysonException, DysonNetworkError
+from libdyson.scheduling import TokenBucket
+
+from .account import DysonAccount, Timeout
 from .cloud_device import DysonCloudDevice
+from .map_cache import MapCache
+from .utils import iter_json_array
+
+CHUNK_SIZE = 8192
+
+# Shared by the map downloads of all prefetch_maps calls
+MAP_RATE_LIMITER = TokenBucket(5, 10)
 
 
 class CleaningType(Enum):
@@ -51,20 +65,128 @@ class CleaningTask:
 class DysonCloud360Eye(DysonCloudDevice):
     """Dyson 360 Eye cloud client."""
 
-    def get_cleaning_history(self) -> List[CleaningTask]:
+    def __init__(
+        self, account: DysonAccount, serial: str, map_cache: Optional[MapCache] = None
+    ):
+        """Initialize the client.
+
+        Cleaning maps are kept in map_cache if given. They are cached as soon
+        as downloaded, so only pass one when maps of finished cleanings are
+        fetched.
+        """
+        super().__init__(account, serial)
+        self._map_cache = map_cache
+
+    def get_cleaning_history(
+        self, timeout: Optional[Timeout] = None, deadline: Optional[float] = None
+    ) -> List[CleaningTask]:
         """Get cleaning history from the cloud."""
+        return list(self.iter_cleaning_history(timeout=timeout, deadline=deadline))
+
+    def iter_cleaning_history(
+        self,
+        since: Optional[datetime] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator[CleaningTask]:
+        """Iterate over the cleaning history, newest first.
+
+        Tasks are parsed as the history is downloaded, and the download stops
+        when iteration stops. If since is given, iteration stops at the first
+        task started before it. If deadline is given, DysonNetworkError is
+        raised when a chunk of the history arrives after it.
+        """
         response = self._account.request(
             "GET",
             f"/v1/assets/devices/{self._serial}/cleanhistory",
+            timeout=timeout,
+            deadline=deadline,
+            stream=True,
         )
-        return [CleaningTask.from_raw(raw) for raw in response.json()["Entries"]]
 
-    def get_cleaning_map(self, cleaning_id: str) -> Optional[bytes]:
+        def _chunks() -> Iterator[bytes]:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                # Read timeouts apply per read, so a slow body is cut here
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise DysonNetworkError
+                yield chunk
+
+        try:
+            for raw in iter_json_array(_chunks(), "Entries"):
+                task = CleaningTask.from_raw(raw)
+                if since is not None and task.start_time < since:
+                    return
+                yield task
+        except requests.RequestException:
+            raise DysonNetworkError
+        finally:
+            response.close()
+
+    def get_cleaning_map(
+        self,
+        cleaning_id: str,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None,
+    ) -> Optional[bytes]:
         """Get cleaning map in PNG format."""
+        if self._map_cache is not None:
+            cached, content = self._map_cache.get(self._serial, cleaning_id)
+            if cached:
+                return content
         response = self._account.request(
             "GET",
             f"/v1/mapvisualizer/devices/{self._serial}/map/{cleaning_id}",
+            timeout=timeout,
+            deadline=deadline,
         )
         if response.status_code == 404:
-            return None  # No map associate with the cleaning id
-        return response.content
+            content = None  # No map associate with the cleaning id
+        else:
+            content = response.content
+        if self._map_cache is not None and (content is None or response.ok):
+            self._map_cache.put(self._serial, cleaning_id, content)
+        return content
+
+    def prefetch_maps(
+        self,
+        cleaning_ids: Iterable[str],
+        concurrency: int = 4,
+        rate_limiter: Optional[TokenBucket] = None,
+    ) -> Iterator[Tuple[str, Union[bytes, None, DysonException]]]:
+        """Download cleaning maps in parallel.
+
+        Yield each cleaning id with its map, None if it has none, or the
+        exception that failed the download, in order of completion. Requests
+        share the connection pool of the account, so concurrency should not
+        exceed its size. Downloads take a token from rate_limiter, by default
+        MAP_RATE_LIMITER shared by all calls. Maps in the map cache are not
+        downloaded. Downloads not started are cancelled when iteration stops.
+        """
+        if rate_limiter is None:
+            rate_limiter = MAP_RATE_LIMITER
+
+        def _get_map(cleaning_id: str) -> Union[bytes, None, DysonException]:
+            if self._map_cache is not None:
+                cached, content = self._map_cache.get(self._serial, cleaning_id)
+                if cached:
+                    return content
+            rate_limiter.acquire()
+            try:
+                return self.get_cleaning_map(cleaning_id)
+            except DysonException as err:
+                return err
+
+        executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="libdyson-prefetch-maps"
+        )
+        futures = {
+            executor.submit(_get_map, cleaning_id): cleaning_id
+            for cleaning_id in cleaning_ids
+        }
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown()
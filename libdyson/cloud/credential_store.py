@@ -0,0 +1,154 @@
+"""Local stores of device credentials."""
+
+from abc import abstractmethod
+from concurrent.futures import Future
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional
+
+import attr
+from cryptography.fernet import Fernet, InvalidToken
+
+from .account import DysonAccount
+from .device_info import DysonDeviceInfo
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class StoredDevice:
+    """What is needed to connect to a device locally."""
+
+    serial: str
+    credential: str
+    product_type: str
+    host: Optional[str] = None
+
+
+class CredentialStore:
+    """Base class of stores of device credentials.
+
+    Subclasses implement load and save. The other methods read, modify and
+    write the store, one at a time.
+    """
+
+    def __init__(self):
+        """Initialize the store."""
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def load(self) -> Dict[str, StoredDevice]:
+        """Return the stored devices by serial."""
+
+    @abstractmethod
+    def save(self, devices: Dict[str, StoredDevice]) -> None:
+        """Replace the stored devices."""
+
+    def set_host(self, serial: str, host: str) -> None:
+        """Record the last known host of a device."""
+        with self._lock:
+            devices = self.load()
+            device = devices.get(serial)
+            if device is None or device.host == host:
+                return
+            devices[serial] = attr.evolve(device, host=host)
+            self.save(devices)
+
+    def reconcile(self, devices: Iterable[DysonDeviceInfo]) -> Dict[str, StoredDevice]:
+        """Replace the stored devices with devices from the cloud.
+
+        Last known hosts of devices still in the cloud are kept. Return the
+        stored devices.
+        """
+        with self._lock:
+            stored = self.load()
+            reconciled = {}
+            for info in devices:
+                previous = stored.get(info.serial)
+                reconciled[info.serial] = StoredDevice(
+                    info.serial,
+                    info.credential,
+                    info.product_type,
+                    None if previous is None else previous.host,
+                )
+            if reconciled != stored:
+                self.save(reconciled)
+            return reconciled
+
+    def refresh(self, account: DysonAccount) -> Dict[str, StoredDevice]:
+        """Reconcile the store with the devices of a cloud account."""
+        return self.reconcile(account.devices())
+
+    def refresh_in_background(
+        self, account: DysonAccount
+    ) -> "Future[Dict[str, StoredDevice]]":
+        """Refresh the store on a new thread.
+
+        Return a future resolved with the stored devices, or failed with the
+        exception of the refresh.
+        """
+        future: "Future[Dict[str, StoredDevice]]" = Future()
+
+        def _refresh() -> None:
+            try:
+                future.set_result(self.refresh(account))
+            except Exception as err:  # pylint: disable=broad-except
+                future.set_exception(err)
+
+        threading.Thread(
+            target=_refresh, name="libdyson-credential-refresh", daemon=True
+        ).start()
+        return future
+
+
+class FileCredentialStore(CredentialStore):
+    """Store credentials in a JSON file.
+
+    The file is replaced atomically on save. If a Fernet key is given, the
+    file is encrypted with it. A missing or unreadable file holds no devices.
+    """
+
+    def __init__(self, path: str, key: Optional[bytes] = None):
+        """Initialize the store."""
+        super().__init__()
+        self._path = path
+        self._fernet = None if key is None else Fernet(key)
+
+    def load(self) -> Dict[str, StoredDevice]:
+        """Return the stored devices by serial."""
+        try:
+            with open(self._path, "rb") as file:
+                content = file.read()
+        except FileNotFoundError:
+            return {}
+        try:
+            if self._fernet is not None:
+                content = self._fernet.decrypt(content)
+            devices = [StoredDevice(**raw) for raw in json.loads(content)]
+        except (InvalidToken, TypeError, ValueError):
+            _LOGGER.warning("Ignored unreadable credential store %s", self._path)
+            return {}
+        return {device.serial: device for device in devices}
+
+    def save(self, devices: Dict[str, StoredDevice]) -> None:
+        """Replace the stored devices."""
+        content = json.dumps(
+            [attr.asdict(device) for device in devices.values()]
+        ).encode()
+        if self._fernet is not None:
+            content = self._fernet.encrypt(content)
+        directory = os.path.dirname(os.path.abspath(self._path))
+        # mkstemp creates the file readable by the owner only
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".libdyson-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self._path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
@@ -21,14 +21,19 @@ class DysonDeviceInfo:
     product_type: str
 
     @classmethod
-    def from_raw(cls, raw: dict):
-        """Parse raw data."""
+    def from_raw(cls, raw: dict, credential: Optional[str] = None):
+        """Parse raw data.
+
+        credential is decrypted from the raw data unless given.
+        """
+        if credential is None:
+            credential = decrypt_password(raw["LocalCredentials"])
         return cls(
             raw["Active"] if "Active" in raw else None,
             raw["Serial"],
             raw["Name"],
             raw["Version"],
-            decrypt_password(raw["LocalCredentials"]),
+            credential,
             raw["AutoUpdate"],
             raw["NewVersionAvailable"],
             raw["ProductType"],
@@ -0,0 +1,166 @@
+"""Cache of 360 Eye cleaning maps."""
+
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+MapKey = Tuple[str, str]  # Serial and cleaning id
+
+
+class MapCache:
+    """Cache cleaning maps by serial and cleaning id.
+
+    Maps are kept in memory up to max_bytes, least recently used first out.
+    If a directory is given, maps are also written there up to
+    max_disk_bytes, and read back once evicted from memory. Cleanings
+    without a map are remembered for negative_ttl seconds, since the map of
+    a running cleaning may show up later.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 16 * 1024 * 1024,
+        directory: Optional[str] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        negative_ttl: float = 300,
+    ):
+        """Initialize the cache."""
+        self._max_bytes = max_bytes
+        self._directory = directory
+        self._max_disk_bytes = max_disk_bytes
+        self._negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._maps: "OrderedDict[MapKey, bytes]" = OrderedDict()
+        self._size = 0
+        self._missing: Dict[MapKey, float] = {}
+        self._disk_size: Optional[int] = None
+
+    @property
+    def size(self) -> int:
+        """Return the bytes of maps held in memory."""
+        return self._size
+
+    def get(self, serial: str, cleaning_id: str) -> Tuple[bool, Optional[bytes]]:
+        """Return whether the map is cached, and the map or None if none."""
+        key = (serial, cleaning_id)
+        with self._lock:
+            expires = self._missing.get(key)
+            if expires is not None:
+                if time.monotonic() < expires:
+                    return True, None
+                del self._missing[key]
+            content = self._maps.get(key)
+            if content is not None:
+                self._maps.move_to_end(key)
+                return True, content
+        content = self._read(key)
+        if content is None:
+            return False, None
+        with self._lock:
+            self._remember(key, content)
+        return True, content
+
+    def put(self, serial: str, cleaning_id: str, content: Optional[bytes]) -> None:
+        """Cache a map, or None for a cleaning without map."""
+        key = (serial, cleaning_id)
+        with self._lock:
+            if content is None:
+                self._missing[key] = time.monotonic() + self._negative_ttl
+                return
+            self._missing.pop(key, None)
+            self._remember(key, content)
+        self._write(key, content)
+
+    def clear(self) -> None:
+        """Drop the maps held in memory."""
+        with self._lock:
+            self._maps.clear()
+            self._size = 0
+            self._missing.clear()
+
+    def _remember(self, key: MapKey, content: bytes) -> None:
+        previous = self._maps.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        if len(content) > self._max_bytes:
+            return
+        self._maps[key] = content
+        self._size += len(content)
+        while self._size > self._max_bytes:
+            _, evicted = self._maps.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _path(self, key: MapKey) -> str:
+        name = hashlib.sha256("/".join(key).encode()).hexdigest()
+        return os.path.join(self._directory, f"{name}.png")
+
+    def _read(self, key: MapKey) -> Optional[bytes]:
+        if self._directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                content = file.read()
+            # The modification time orders eviction from disk
+            os.utime(path)
+        except OSError:
+            return None
+        return content
+
+    def _write(self, key: MapKey, content: bytes) -> None:
+        if self._directory is None or len(content) > self._max_disk_bytes:
+            return
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        except OSError:
+            _LOGGER.warning("Failed to write cleaning map to %s", self._directory)
+            return
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            _LOGGER.warning("Failed to write cleaning map to %s", self._directory)
+            # Not a map file, so eviction would never remove it
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            return
+        try:
+            self._evict_disk(len(content))
+        except OSError:
+            _LOGGER.warning("Failed to evict cleaning maps from %s", self._directory)
+
+    def _evict_disk(self, added: int) -> None:
+        with self._lock:
+            if self._disk_size is not None:
+                self._disk_size += added
+                if self._disk_size <= self._max_disk_bytes:
+                    return
+            entries = [
+                entry
+                for entry in os.scandir(self._directory)
+                if entry.is_file() and entry.name.endswith(".png")
+            ]
+            stats = sorted(
+                ((entry.stat(), entry.path) for entry in entries),
+                key=lambda item: item[0].st_mtime,
+            )
+            self._disk_size = sum(stat.st_size for stat, _ in stats)
+            for stat, path in stats:
+                if self._disk_size <= self._max_disk_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                self._disk_size -= stat.st_size
@@ -0,0 +1,126 @@
+"""Retries and circuit breakers of cloud requests."""
+
+from email.utils import parsedate_to_datetime
+import threading
+import time
+from typing import Dict, FrozenSet, Optional
+
+import attr
+
+from libdyson.reconnect import backoff
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the seconds to wait given by a Retry-After header."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff between attempts of idempotent requests."""
+
+    attempts: int = 3
+    min_delay: float = 0.5
+    max_delay: float = 30
+    jitter: float = 0.5
+    statuses: FrozenSet[int] = frozenset([429, 500, 502, 503, 504])
+
+    def delay(
+        self, attempt: int, status: Optional[int], retry_after: Optional[str] = None
+    ) -> Optional[float]:
+        """Return the delay before retrying, or None not to retry.
+
+        attempt counts from 0 and status is None after a network error. A
+        Retry-After header asking for more than max_delay stops retrying.
+        """
+        if attempt + 1 >= self.attempts:
+            return None
+        if status is not None and status not in self.statuses:
+            return None
+        delay = backoff(attempt, self.min_delay, self.max_delay, self.jitter)
+        server_delay = _parse_retry_after(retry_after)
+        if server_delay is not None:
+            if server_delay > self.max_delay:
+                return None
+            delay = max(delay, server_delay)
+        return delay
+
+
+class CircuitBreaker:
+    """Refuse requests to a host after consecutive failures.
+
+    After failure_threshold failures in a row, requests are refused for
+    reset_timeout seconds. A single request is then let through, and its
+    outcome closes or opens the circuit again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        """Return if requests are being refused."""
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """Return if a request may be sent."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() < self._opened_at + self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        """Record a request that reached the host."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        """Record a network or server error."""
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+    def release(self) -> None:
+        """Record a request that ended without an outcome, e.g. cancelled."""
+        with self._lock:
+            self._trial = False
+
+    def reset(self) -> None:
+        """Close the circuit."""
+        self.record_success()
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    """Return the circuit breaker shared by all requests to host."""
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(host)
+        if breaker is None:
+            breaker = _BREAKERS[host] = CircuitBreaker()
+        return breaker
@@ -1,7 +1,9 @@
 """Dyson cloud client utilities."""
 
 import base64
+import codecs
 import json
+from typing import Any, Iterable, Iterator, List
 
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
@@ -14,19 +16,123 @@ DYSON_ENCRYPTION_INIT_VECTOR = (
 )
 
 
-def _unpad(string: str) -> str:
-    """Un-pad string."""
-    return string[: -ord(string[len(string) - 1 :])]
+_CIPHER = Cipher(
+    algorithms.AES(DYSON_ENCRYPTION_KEY),
+    modes.CBC(DYSON_ENCRYPTION_INIT_VECTOR),
+)
+
+
+def _unpad(data: memoryview) -> memoryview:
+    """Remove PKCS#7 padding."""
+    if not data or len(data) % 16 != 0:
+        raise ValueError("Invalid padding")
+    n_pad = data[-1]
+    if not 1 <= n_pad <= 16 or data[-n_pad:] != bytes([n_pad]) * n_pad:
+        raise ValueError("Invalid padding")
+    return data[:-n_pad]
 
 
 def decrypt_password(encrypted_password: str) -> str:
     """Decrypt local credential into MQTT password."""
-    cipher = Cipher(
-        algorithms.AES(DYSON_ENCRYPTION_KEY),
-        modes.CBC(DYSON_ENCRYPTION_INIT_VECTOR),
-    )
-    decryptor = cipher.decryptor()
-    encrypted = base64.b64decode(encrypted_password)
-    decrypted = decryptor.update(encrypted) + decryptor.finalize()
-    json_password = json.loads(_unpad(decrypted))
-    return json_password["apPasswordHash"]
+    return decrypt_passwords([encrypted_password])[0]
+
+
+def decrypt_passwords(encrypted_passwords: Iterable[str]) -> List[str]:
+    """Decrypt local credentials into MQTT passwords.
+
+    All credentials are decrypted into a single buffer and decoded from views
+    of it. Raises ValueError if a credential is not valid base64 or is badly
+    padded.
+    """
+    encrypted = [base64.b64decode(password) for password in encrypted_passwords]
+    # update_into needs room for a block more than the data
+    buffer = bytearray(sum(len(data) for data in encrypted) + 15)
+    view = memoryview(buffer)
+    passwords = []
+    offset = 0
+    for data in encrypted:
+        if len(data) % 16 != 0:
+            raise ValueError("Invalid padding")
+        # Every credential is encrypted with the same IV, so each one needs
+        # its own decryptor, but the cipher is shared.
+        decryptor = _CIPHER.decryptor()
+        decryptor.update_into(data, view[offset:])
+        decryptor.finalize()
+        decrypted = _unpad(view[offset : offset + len(data)])
+        passwords.append(json.loads(str(decrypted, "utf-8"))["apPasswordHash"])
+        offset += len(data)
+    return passwords
+
+
+_JSON_DELIMITERS = frozenset(",:]} \t\r\n")
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """Yield the items of an array in a JSON object read in chunks.
+
+    key is the key of the array in the top level object. Items are decoded
+    as soon as they are complete, so the document is never held whole.
+    Nothing is yielded if the key is missing. Raises ValueError on invalid
+    JSON.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+
+    def _read() -> None:
+        nonlocal buffer, pos
+        chunk = next(chunks, None)
+        if chunk is None:
+            raise ValueError("Unexpected end of JSON")
+        # Drop what has been consumed so memory stays bounded
+        buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+    def _peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            _read()
+
+    def _expect(char: str) -> None:
+        nonlocal pos
+        if _peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON")
+        pos += 1
+
+    def _value() -> Any:
+        nonlocal pos
+        _peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                pass
+            else:
+                # A complete value is followed by a delimiter. Otherwise it
+                # may be a truncated number.
+                if end < len(buffer) and buffer[end] in _JSON_DELIMITERS:
+                    pos = end
+                    return value
+            _read()
+
+    _expect("{")
+    while _peek() != "}":
+        if _peek() == ",":
+            pos += 1
+        name = _value()
+        _expect(":")
+        if name != key:
+            _value()
+            continue
+        _expect("[")
+        while _peek() != "]":
+            if _peek() == ",":
+                pos += 1
+            yield _value()
+        return
@@ -0,0 +1,79 @@
+"""Acknowledgement of device commands."""
+
+from concurrent.futures import Future
+import threading
+from typing import List
+
+from .exceptions import DysonCommandTimeout
+from .scheduling import SCHEDULER
+from .state import DysonState
+
+
+def _start(future: Future) -> bool:
+    """Return whether the future may be resolved, False if it was cancelled."""
+    # Once running, a caller can no longer cancel the future
+    return future.set_running_or_notify_cancel()
+
+
+class _PendingCommand:
+    """Command waiting for the device status to show its values."""
+
+    def __init__(self, data: dict):
+        """Initialize the command."""
+        self.data = data
+        self.future: "Future[DysonState]" = Future()
+
+
+class CommandTracker:
+    """Resolve command futures when the device status shows their values."""
+
+    def __init__(self):
+        """Initialize the tracker."""
+        self._lock = threading.Lock()
+        self._pending: List[_PendingCommand] = []
+
+    def track(self, data: dict, timeout: float) -> "Future[DysonState]":
+        """Return a future resolved by the first status showing data.
+
+        Fields the status does not hold are not checked, so a command made of
+        such fields only is resolved by the next status. The future fails
+        with DysonCommandTimeout if no such status arrives within timeout.
+        """
+        command = _PendingCommand(data)
+        with self._lock:
+            self._pending.append(command)
+        SCHEDULER.call_later(timeout, lambda: self._expire(command))
+        return command.future
+
+    def update(self, status: DysonState) -> None:
+        """Resolve the commands shown by a new status."""
+        with self._lock:
+            if not self._pending:
+                return
+            resolved = [
+                command for command in self._pending if status.matches(command.data)
+            ]
+            if not resolved:
+                return
+            self._pending = [
+                command for command in self._pending if command not in resolved
+            ]
+        for command in resolved:
+            if _start(command.future):
+                command.future.set_result(status)
+
+    def fail_all(self, exception: Exception) -> None:
+        """Fail all pending commands."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for command in pending:
+            if _start(command.future):
+                command.future.set_exception(exception)
+
+    def _expire(self, command: _PendingCommand) -> None:
+        with self._lock:
+            if command not in self._pending:
+                return
+            self._pending.remove(command)
+        if _start(command.future):
+            command.future.set_exception(DysonCommandTimeout())
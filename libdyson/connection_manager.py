@@ -0,0 +1,337 @@
+"""Shared MQTT network loop for Dyson devices."""
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import selectors
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import paho.mqtt.client as mqtt
+
+from .reconnect import ReconnectPolicy
+
+_LOGGER = logging.getLogger(__name__)
+
+MISC_INTERVAL = 1
+
+
+def _report_connect_fail(client: mqtt.Client) -> None:
+    """Report a failed connection attempt like the paho network thread."""
+    on_connect_fail = getattr(client, "on_connect_fail", None)
+    if on_connect_fail is not None:
+        on_connect_fail(client, None)
+
+
+class _ClientState:
+    """Bookkeeping of a client served by a network loop."""
+
+    def __init__(self):
+        """Initialize the state."""
+        self.closing = False
+        self.connecting = False
+        self.reconnect_at = 0.0
+        self.failures = 0
+
+
+class _NetworkLoop:
+    """Selector driven network loop serving many MQTT clients."""
+
+    def __init__(
+        self, executor: ThreadPoolExecutor, name: str, reconnect_policy: ReconnectPolicy
+    ):
+        """Initialize the loop."""
+        self._executor = executor
+        self._reconnect_policy = reconnect_policy
+        self._name = name
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+        self._selector.register(self._wakeup_reader, selectors.EVENT_READ)
+        self._lock = threading.Lock()
+        self._pending: List[Callable[[], None]] = []
+        self._clients: Dict[mqtt.Client, _ClientState] = {}
+        self._thread = None
+        self._running = False
+
+    def start(self) -> None:
+        """Start the loop thread."""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the loop thread."""
+        self._call_soon(self._stop)
+        self._thread.join()
+        self._thread = None
+        self._selector.close()
+        self._wakeup_reader.close()
+        self._wakeup_writer.close()
+
+    def add(self, client: mqtt.Client) -> None:
+        """Start serving a client and connect it."""
+        client.on_socket_open = self._on_socket_open
+        client.on_socket_close = self._on_socket_close
+        client.on_socket_register_write = self._on_socket_register_write
+        client.on_socket_unregister_write = self._on_socket_unregister_write
+        self._call_soon(self._add, client)
+
+    def remove(self, client: mqtt.Client) -> None:
+        """Stop reconnecting a client and drop it once its socket is closed."""
+        self._call_soon(self._remove, client)
+
+    def _call_soon(self, func: Callable, *args) -> None:
+        if threading.current_thread() is self._thread:
+            func(*args)
+            return
+        with self._lock:
+            self._pending.append(lambda: func(*args))
+        try:
+            self._wakeup_writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # Loop is already woken up or stopped
+
+    def _stop(self) -> None:
+        self._running = False
+
+    def _add(self, client: mqtt.Client) -> None:
+        self._clients[client] = _ClientState()
+
+    def _remove(self, client: mqtt.Client) -> None:
+        state = self._clients.get(client)
+        if state is None:
+            return
+        state.closing = True
+        if client.socket() is None and not state.connecting:
+            self._discard(client)
+
+    def _discard(self, client: mqtt.Client) -> None:
+        del self._clients[client]
+        client.on_socket_open = None
+        client.on_socket_close = None
+        client.on_socket_register_write = None
+        client.on_socket_unregister_write = None
+
+    def _on_socket_open(self, client: mqtt.Client, userdata, sock) -> None:
+        self._call_soon(self._register_socket, client, sock)
+
+    def _on_socket_close(self, client: mqtt.Client, userdata, sock) -> None:
+        self._call_soon(self._unregister_socket, client, sock)
+
+    def _on_socket_register_write(self, client: mqtt.Client, userdata, sock) -> None:
+        self._call_soon(
+            self._modify_socket,
+            client,
+            sock,
+            selectors.EVENT_READ | selectors.EVENT_WRITE,
+        )
+
+    def _on_socket_unregister_write(self, client: mqtt.Client, userdata, sock) -> None:
+        self._call_soon(self._modify_socket, client, sock, selectors.EVENT_READ)
+
+    def _register_socket(self, client: mqtt.Client, sock) -> None:
+        state = self._clients.get(client)
+        if state is None:
+            return
+        state.failures = 0
+        events = selectors.EVENT_READ
+        if client.want_write():
+            events |= selectors.EVENT_WRITE
+        try:
+            self._selector.register(sock, events, client)
+        except ValueError:
+            pass  # Socket was closed before the loop got to it
+
+    def _unregister_socket(self, client: mqtt.Client, sock) -> None:
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass  # Socket was never registered
+        state = self._clients.get(client)
+        if state is None:
+            return
+        if state.closing:
+            if not state.connecting:
+                self._discard(client)
+            return
+        self._schedule_reconnect(state)
+
+    def _modify_socket(self, client: mqtt.Client, sock, events: int) -> None:
+        try:
+            self._selector.modify(sock, events, client)
+        except (KeyError, ValueError):
+            pass  # Socket already closed
+
+    def _schedule_reconnect(self, state: _ClientState) -> None:
+        state.reconnect_at = time.monotonic() + self._reconnect_policy.delay(
+            state.failures
+        )
+        state.failures += 1
+
+    def _reconnect(self, client: mqtt.Client) -> None:
+        """Open the connection, running on the connect executor."""
+        try:
+            client.reconnect()
+        except (OSError, ValueError) as err:
+            _LOGGER.debug("Failed to connect: %s", err)
+            self._call_soon(self._reconnect_failed, client)
+        else:
+            self._call_soon(self._reconnect_done, client)
+
+    def _reconnect_done(self, client: mqtt.Client) -> None:
+        state = self._clients.get(client)
+        if state is None:
+            return
+        state.connecting = False
+        if state.closing:
+            # Disconnect was requested while the connection was being opened
+            client.disconnect()
+
+    def _reconnect_failed(self, client: mqtt.Client) -> None:
+        state = self._clients.get(client)
+        if state is None:
+            return
+        state.connecting = False
+        if state.closing:
+            self._discard(client)
+        else:
+            _report_connect_fail(client)
+            self._schedule_reconnect(state)
+
+    def _run(self) -> None:
+        last_misc = time.monotonic()
+        while self._running:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            for func in pending:
+                func()
+            if not self._running:
+                break
+
+            now = time.monotonic()
+            for client, state in self._clients.items():
+                if (
+                    not state.closing
+                    and not state.connecting
+                    and client.socket() is None
+                    and state.reconnect_at <= now
+                ):
+                    state.connecting = True
+                    self._executor.submit(self._reconnect, client)
+
+            timeout = max(0, last_misc + MISC_INTERVAL - now)
+            for key, mask in self._selector.select(timeout):
+                client = key.data
+                if client is None:
+                    try:
+                        while self._wakeup_reader.recv(1024):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                try:
+                    if mask & selectors.EVENT_READ:
+                        client.loop_read()
+                    if mask & selectors.EVENT_WRITE:
+                        client.loop_write()
+                except Exception:  # pylint: disable=broad-except
+                    # Never let one device stop the loop for all the others
+                    _LOGGER.exception("Error while processing network events")
+
+            now = time.monotonic()
+            if now - last_misc >= MISC_INTERVAL:
+                last_misc = now
+                for client in list(self._clients):
+                    try:
+                        client.loop_misc()
+                    except Exception:  # pylint: disable=broad-except
+                        _LOGGER.exception("Error while processing network events")
+
+
+class DysonConnectionManager:
+    """Run the MQTT network I/O of many devices on a fixed pool of threads.
+
+    Lost connections are reopened with the backoff of reconnect_policy. The
+    threads start with the first registered client or start(), and a stopped
+    manager cannot be started again.
+    """
+
+    def __init__(
+        self,
+        loops: int = 1,
+        connect_workers: int = 4,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
+    ):
+        """Initialize the manager."""
+        if reconnect_policy is None:
+            reconnect_policy = ReconnectPolicy()
+        self._executor = ThreadPoolExecutor(
+            max_workers=connect_workers, thread_name_prefix="libdyson-connect"
+        )
+        self._loops = [
+            _NetworkLoop(self._executor, f"libdyson-mqtt-{index}", reconnect_policy)
+            for index in range(loops)
+        ]
+        self._client_loops: Dict[mqtt.Client, _NetworkLoop] = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._stopped = False
+
+    @property
+    def client_count(self) -> int:
+        """Return the number of clients served by the manager."""
+        return len(self._client_loops)
+
+    def start(self) -> None:
+        """Start the network loops."""
+        with self._lock:
+            self._start()
+
+    def _start(self) -> None:
+        if self._stopped:
+            raise RuntimeError("Connection manager is stopped")
+        if self._started:
+            return
+        for loop in self._loops:
+            loop.start()
+        self._started = True
+
+    def stop(self) -> None:
+        """Stop the network loops.
+
+        Connection attempts in progress are waited for, which takes at most
+        the connect timeout of paho.
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            if not self._started:
+                self._executor.shutdown()
+                return
+        for loop in self._loops:
+            loop.stop()
+        # The loops no longer submit attempts once stopped
+        self._executor.shutdown()
+
+    def register(self, client: mqtt.Client, host: str) -> None:
+        """Connect a client to host and serve its network I/O."""
+        client.connect_async(host)
+        with self._lock:
+            self._start()
+            loads = {loop: 0 for loop in self._loops}
+            for served_by in self._client_loops.values():
+                loads[served_by] += 1
+            loop = min(self._loops, key=loads.get)
+            self._client_loops[client] = loop
+        loop.add(client)
+
+    def unregister(self, client: mqtt.Client) -> None:
+        """Stop reconnecting a client and release it once disconnected."""
+        with self._lock:
+            loop: Optional[_NetworkLoop] = self._client_loops.pop(client, None)
+        if loop is not None:
+            loop.remove(client)
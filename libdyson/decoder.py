@@ -0,0 +1,54 @@
+"""MQTT payload decoders."""
+
+import json
+from typing import Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+PayloadDecoder = Callable[[bytes], dict]
+
+# json.loads detects the encoding of bytes itself, so no str is built first.
+DECODERS: Dict[str, PayloadDecoder] = {"json": json.loads}
+if msgspec is not None:
+    DECODERS["msgspec"] = msgspec.json.Decoder().decode
+if orjson is not None:
+    DECODERS["orjson"] = orjson.loads
+
+_PREFERRED_DECODERS = ["orjson", "msgspec", "json"]
+
+
+def get_decoder(name: Optional[str] = None) -> PayloadDecoder:
+    """Return the decoder with the given name, or the fastest available one."""
+    if name is None:
+        name = next(name for name in _PREFERRED_DECODERS if name in DECODERS)
+    if name not in DECODERS:
+        raise ValueError(f"Payload decoder {name} is not available")
+    return DECODERS[name]
+
+
+def normalize_state(state: dict) -> dict:
+    """Collapse the [old, new] pairs of a state message into new values."""
+    return {
+        key: value[1] if isinstance(value, list) else value
+        for key, value in state.items()
+    }
+
+
+def changed_state(state: dict) -> dict:
+    """Return the new values of the fields changed by a state message.
+
+    Fields sent as [old, new] pairs with equal values are left out.
+    """
+    return {
+        key: value[1] if isinstance(value, list) else value
+        for key, value in state.items()
+        if not isinstance(value, list) or value[0] != value[1]
+    }
@@ -0,0 +1,250 @@
+"""Dispatchers of listener callbacks."""
+
+from abc import abstractmethod
+import asyncio
+from collections import OrderedDict
+import itertools
+import logging
+import threading
+from typing import Callable, Hashable, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+MergeFunction = Callable[[tuple, tuple], tuple]
+
+
+class Dispatcher:
+    """Base class of dispatchers running listener callbacks."""
+
+    @abstractmethod
+    def dispatch(
+        self,
+        key: Hashable,
+        callback: Callable,
+        args: tuple,
+        merge: Optional[MergeFunction] = None,
+    ) -> None:
+        """Run callback with args.
+
+        A dispatcher may merge a call into a pending call with the same key.
+        The arguments are then combined by merge, or the new ones are used if
+        merge is None.
+        """
+
+    def close(self) -> None:
+        """Release the resources of the dispatcher."""
+
+
+class InlineDispatcher(Dispatcher):
+    """Run callbacks immediately on the calling thread."""
+
+    def dispatch(
+        self,
+        key: Hashable,
+        callback: Callable,
+        args: tuple,
+        merge: Optional[MergeFunction] = None,
+    ) -> None:
+        """Run callback with args."""
+        callback(*args)
+
+
+class _CallQueue:
+    """Bounded queue of pending calls."""
+
+    def __init__(self, max_size: int, overflow: str, merge: bool):
+        """Initialize the queue."""
+        if overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown overflow policy {overflow}")
+        self._calls: "OrderedDict[Hashable, Tuple[Callable, tuple]]" = OrderedDict()
+        self._max_size = max_size
+        self._overflow = overflow
+        self._merge = merge
+        self._counter = itertools.count()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        """Return the number of pending calls."""
+        return len(self._calls)
+
+    def put(
+        self,
+        key: Hashable,
+        callback: Callable,
+        args: tuple,
+        merge: Optional[MergeFunction],
+    ) -> None:
+        """Queue a call, merging it into a pending call with the same key."""
+        if not self._merge:
+            key = next(self._counter)
+        elif key in self._calls:
+            # Keep the position of the pending call so order is preserved
+            pending_args = self._calls[key][1]
+            if merge is not None:
+                args = merge(pending_args, args)
+            self._calls[key] = (callback, args)
+            return
+        if len(self._calls) >= self._max_size:
+            self.dropped += 1
+            if self._overflow == DROP_NEWEST:
+                return
+            self._calls.popitem(last=False)
+        self._calls[key] = (callback, args)
+
+    def get(self) -> Tuple[Callable, tuple]:
+        """Remove and return the oldest call."""
+        return self._calls.popitem(last=False)[1]
+
+
+def _run(callback: Callable, args: tuple) -> None:
+    try:
+        callback(*args)
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception("Error in listener callback")
+
+
+class _Worker:
+    """Thread running queued calls in order."""
+
+    def __init__(self, queue: _CallQueue, name: str):
+        """Initialize the worker."""
+        self._queue = queue
+        self._name = name
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def dropped(self) -> int:
+        """Return the number of calls dropped because the queue was full."""
+        return self._queue.dropped
+
+    def put(self, key: Hashable, callback: Callable, args: tuple, merge) -> None:
+        """Queue a call."""
+        with self._condition:
+            if self._closed:
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                self._thread.start()
+            self._queue.put(key, callback, args, merge)
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Run the pending calls and stop the thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                callback, args = self._queue.get()
+            _run(callback, args)
+
+
+class ThreadDispatcher(Dispatcher):
+    """Run callbacks on worker threads.
+
+    Calls with the same key always run on the same worker in order. Each
+    worker has a queue of at most max_queue_size calls. When it is full, the
+    oldest or the newest call is dropped depending on overflow. If merge is
+    True, a call replaces a pending call with the same key, so a slow listener
+    only sees the latest update.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_queue_size: int = 100,
+        overflow: str = DROP_OLDEST,
+        merge: bool = True,
+    ):
+        """Initialize the dispatcher."""
+        self._workers = [
+            _Worker(
+                _CallQueue(max_queue_size, overflow, merge),
+                f"libdyson-dispatch-{index}",
+            )
+            for index in range(workers)
+        ]
+
+    @property
+    def dropped(self) -> int:
+        """Return the number of calls dropped because a queue was full."""
+        return sum(worker.dropped for worker in self._workers)
+
+    def dispatch(
+        self,
+        key: Hashable,
+        callback: Callable,
+        args: tuple,
+        merge: Optional[MergeFunction] = None,
+    ) -> None:
+        """Queue callback to run on a worker thread."""
+        worker = self._workers[hash(key) % len(self._workers)]
+        worker.put(key, callback, args, merge)
+
+    def close(self) -> None:
+        """Run the pending calls and stop the worker threads."""
+        for worker in self._workers:
+            worker.close()
+
+
+class AsyncioDispatcher(Dispatcher):
+    """Run callbacks on an asyncio event loop.
+
+    Queueing works the same as ThreadDispatcher with a single worker.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        max_queue_size: int = 100,
+        overflow: str = DROP_OLDEST,
+        merge: bool = True,
+    ):
+        """Initialize the dispatcher."""
+        self._loop = loop
+        self._queue = _CallQueue(max_queue_size, overflow, merge)
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    @property
+    def dropped(self) -> int:
+        """Return the number of calls dropped because the queue was full."""
+        return self._queue.dropped
+
+    def dispatch(
+        self,
+        key: Hashable,
+        callback: Callable,
+        args: tuple,
+        merge: Optional[MergeFunction] = None,
+    ) -> None:
+        """Queue callback to run on the event loop."""
+        with self._lock:
+            self._queue.put(key, callback, args, merge)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._loop.call_soon_threadsafe(self._drain)
+
+    def _drain(self) -> None:
+        with self._lock:
+            calls = [self._queue.get() for _ in range(len(self._queue))]
+            self._scheduled = False
+        for callback, args in calls:
+            _run(callback, args)
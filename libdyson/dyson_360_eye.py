@@ -1,12 +1,26 @@
 """Dyson 360 Eye vacuum robot."""
 
+import attr
+
 from .const import DEVICE_TYPE_360_EYE, VacuumEyePowerMode
-from .dyson_vacuum_device import DysonVacuumDevice
+from .dyson_vacuum_device import DysonVacuumDevice, DysonVacuumStatus
+from .state import state_field
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class Dyson360EyeStatus(DysonVacuumStatus):
+    """Status snapshot of a Dyson 360 Eye."""
+
+    power_mode: VacuumEyePowerMode = state_field(
+        "currentVacuumPowerMode", VacuumEyePowerMode
+    )
 
 
 class Dyson360Eye(DysonVacuumDevice):
     """Dyson 360 Eye device."""
 
+    _STATUS_CLASS = Dyson360EyeStatus
+
     @property
     def device_type(self) -> str:
         """Return the device type."""
@@ -15,7 +29,7 @@ class Dyson360Eye(DysonVacuumDevice):
     @property
     def power_mode(self) -> VacuumEyePowerMode:
         """Power mode of the device."""
-        return VacuumEyePowerMode(self._status["currentVacuumPowerMode"])
+        return self._status.power_mode
 
     def start(self) -> None:
         """Start cleaning."""
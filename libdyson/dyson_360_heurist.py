@@ -2,13 +2,46 @@
 
 from typing import Optional
 
+import attr
+
 from .const import DEVICE_TYPE_360_HEURIST, CleaningMode, VacuumHeuristPowerMode
-from .dyson_vacuum_device import DysonVacuumDevice
+from .dyson_vacuum_device import DysonVacuumDevice, DysonVacuumStatus
+from .state import state_field
+
+
+def _is_bin_full(raw: dict) -> bool:
+    airways = raw.get("faults", {}).get("AIRWAYS")
+    if airways is None:
+        return False
+    return (
+        airways.get("active") is True and airways.get("description") == "1.0.-1"
+    )  # Not sure what this means
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class Dyson360HeuristStatus(DysonVacuumStatus):
+    """Status snapshot of a Dyson 360 Heurist."""
+
+    current_power_mode: VacuumHeuristPowerMode = state_field(
+        "currentVacuumPowerMode", VacuumHeuristPowerMode
+    )
+    default_power_mode: VacuumHeuristPowerMode = state_field(
+        "defaultVacuumPowerMode", VacuumHeuristPowerMode
+    )
+    current_cleaning_mode: CleaningMode = state_field(
+        "currentCleaningMode", CleaningMode
+    )
+    default_cleaning_mode: CleaningMode = state_field(
+        "defaultCleaningMode", CleaningMode
+    )
+    is_bin_full: bool = state_field(None, _is_bin_full)
 
 
 class Dyson360Heurist(DysonVacuumDevice):
     """Dyson 360 Heurist device."""
 
+    _STATUS_CLASS = Dyson360HeuristStatus
+
     @property
     def device_type(self) -> str:
         """Return the device type."""
@@ -17,32 +50,27 @@ class Dyson360Heurist(DysonVacuumDevice):
     @property
     def current_power_mode(self) -> VacuumHeuristPowerMode:
         """Return current power mode."""
-        return VacuumHeuristPowerMode(self._status["currentVacuumPowerMode"])
+        return self._status.current_power_mode
 
     @property
     def default_power_mode(self) -> VacuumHeuristPowerMode:
         """Return default power mode."""
-        return VacuumHeuristPowerMode(self._status["defaultVacuumPowerMode"])
+        return self._status.default_power_mode
 
     @property
     def current_cleaning_mode(self) -> CleaningMode:
         """Return current cleaning mode."""
-        return CleaningMode(self._status["currentCleaningMode"])
+        return self._status.current_cleaning_mode
 
     @property
     def default_cleaning_mode(self) -> CleaningMode:
         """Return default cleaning mode."""
-        return CleaningMode(self._status["defaultCleaningMode"])
+        return self._status.default_cleaning_mode
 
     @property
     def is_bin_full(self) -> bool:
         """Return if the bin is full."""
-        airways = self._status.get("faults", {}).get("AIRWAYS")
-        if airways is None:
-            return False
-        return (
-            airways.get("active") is True and airways.get("description") == "1.0.-1"
-        )  # Not sure what this means
+        return self._status.is_bin_full
 
     def _send_command(self, command: str, data: Optional[dict] = None):
         if data is None:
@@ -1,44 +1,122 @@
 """Dyson device."""
 from abc import abstractmethod
+from concurrent.futures import Future
+from contextlib import contextmanager
 import json
 import logging
 import threading
-from typing import Any, Optional
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
+import attr
 import paho.mqtt.client as mqtt
 
-from .const import (
-    ENVIRONMENTAL_FAIL,
-    ENVIRONMENTAL_INIT,
-    ENVIRONMENTAL_OFF,
-    MessageType,
-)
+from .command import CommandTracker
+from .const import MessageType
+from .decoder import PayloadDecoder, changed_state, get_decoder, normalize_state
+from .dispatch import Dispatcher, InlineDispatcher, ThreadDispatcher
 from .exceptions import (
     DysonConnectionRefused,
     DysonConnectTimeout,
     DysonInvalidCredential,
     DysonNotConnected,
 )
+from .outbound import PRIORITY_REQUEST, OutboundQueue
+from .reconnect import ReconnectPolicy
+from .scheduling import SCHEDULER
+from .state import DysonSnapshot, DysonState, environmental, flag, state_field
 from .utils import mqtt_time
 
+if TYPE_CHECKING:
+    from .connection_manager import DysonConnectionManager
+
 _LOGGER = logging.getLogger(__name__)
 
 TIMEOUT = 10
 
+ChangeListener = Callable[[MessageType, FrozenSet[str]], None]
+
+# Rolls back optimistic updates off the shared scheduler thread, since
+# listeners notified of the rollback may be slow
+_ROLLBACKS = ThreadDispatcher()
+
+
+def _remaining(deadline: Optional[float]) -> float:
+    """Return the time left until deadline, or TIMEOUT without deadline."""
+    if deadline is None:
+        return TIMEOUT
+    return max(0, deadline - time.monotonic())
+
+
+def _merge_changes(pending: tuple, new: tuple) -> tuple:
+    """Merge the changed fields of two change notifications."""
+    return (new[0], pending[1] | new[1])
+
+
+def _merge_state_set(pending: dict, new: dict) -> dict:
+    """Merge the data of two STATE-SET messages."""
+    return {**new, "data": {**pending["data"], **new["data"]}}
+
+
+def _connection_error(rc: int) -> Optional[type]:
+    """Return the exception matching a CONNACK result code."""
+    if rc == mqtt.CONNACK_REFUSED_BAD_USERNAME_PASSWORD:
+        return DysonInvalidCredential
+    if rc != mqtt.CONNACK_ACCEPTED:
+        return DysonConnectionRefused
+    return None
+
 
 class DysonDevice:
     """Base class for dyson devices."""
 
+    # Decoder of MQTT payloads, may be replaced on a class or an instance
+    payload_decoder: PayloadDecoder = staticmethod(get_decoder())
+
+    # Runs listener callbacks, may be replaced on a class or an instance
+    dispatcher: Dispatcher = InlineDispatcher()
+
+    # Backoff of reconnection when the device runs its own network thread
+    reconnect_policy: ReconnectPolicy = ReconnectPolicy()
+
+    # Average number of messages per second sent to the device, None for no
+    # limit, and number of messages that may be sent at once. May be replaced
+    # on a class, applies to devices created afterwards.
+    rate_limit: Optional[float] = 10
+    rate_burst: int = 20
+
     def __init__(self, serial: str, credential: str):
         """Initialize the device."""
         self._serial = serial
         self._credential = credential
         self._mqtt_client = None
+        self._connection_manager = None
         self._connected = threading.Event()
         self._disconnected = threading.Event()
-        self._status = None
+        self._snapshot = DysonSnapshot()
+        self._snapshot_lock = threading.Lock()
         self._status_data_available = threading.Event()
         self._callbacks = []
+        self._reconnect_count = 0
+        self._failed_reconnect_count = 0
+        self._reconnect_failures = 0
+        self._change_listeners: List[
+            Tuple[ChangeListener, Optional[FrozenSet[str]]]
+        ] = []
+        self._outbound = OutboundQueue(
+            self._publish_now, self.rate_limit, self.rate_burst
+        )
 
     @property
     def serial(self) -> str:
@@ -50,11 +128,57 @@ class DysonDevice:
         """Whether MQTT connection is active."""
         return self._connected.is_set()
 
+    @property
+    def is_data_available(self) -> bool:
+        """Whether the first data has been received from the device."""
+        return self._status_data_available.is_set()
+
+    @property
+    def reconnect_count(self) -> int:
+        """Return the number of times the connection was restored."""
+        return self._reconnect_count
+
+    @property
+    def failed_reconnect_count(self) -> int:
+        """Return the number of failed reconnection attempts."""
+        return self._failed_reconnect_count
+
     @property
     @abstractmethod
     def device_type(self) -> str:
         """Device type."""
 
+    def snapshot(self) -> DysonSnapshot:
+        """Return an immutable snapshot of the current state.
+
+        Read several fields from one snapshot to get values of the same
+        message, since properties may change between two reads.
+        """
+        return self._snapshot
+
+    @property
+    def _status(self):
+        return self._snapshot.status
+
+    @_status.setter
+    def _status(self, status) -> None:
+        # Writers replace the snapshot one at a time so none of their updates
+        # is lost. Readers do not lock and always see either the old or the
+        # new snapshot as a whole.
+        with self._snapshot_lock:
+            self._snapshot = attr.evolve(self._snapshot, status=status)
+
+    @property
+    def _environmental_data(self):
+        return self._snapshot.environmental_data
+
+    @_environmental_data.setter
+    def _environmental_data(self, environmental_data) -> None:
+        with self._snapshot_lock:
+            self._snapshot = attr.evolve(
+                self._snapshot, environmental_data=environmental_data
+            )
+
     @property
     @abstractmethod
     def _status_topic(self) -> str:
@@ -65,13 +189,35 @@ class DysonDevice:
         """MQTT command topic."""
         return f"{self.device_type}/{self._serial}/command"
 
-    def _request_first_data(self) -> bool:
-        """Request and wait for first data."""
+    def _request_data(self) -> None:
+        """Request all data of the device."""
         self.request_current_status()
-        return self._status_data_available.wait(timeout=TIMEOUT)
 
-    def connect(self, host: str) -> None:
-        """Connect to the device MQTT broker."""
+    def _request_first_data(self, deadline: Optional[float] = None) -> bool:
+        """Request and wait for first data."""
+        self._request_data()
+        return self._status_data_available.wait(timeout=_remaining(deadline))
+
+    def connect(
+        self,
+        host: str,
+        connection_manager: Optional["DysonConnectionManager"] = None,
+        timeout: Optional[float] = None,
+        wait_for_data: bool = True,
+    ) -> None:
+        """Connect to the device MQTT broker.
+
+        If a connection manager is given, the network I/O is served by its
+        shared loop instead of a dedicated thread for this device. If timeout
+        is given, the whole connection, including receiving the first data,
+        must finish within it. Otherwise each step waits up to TIMEOUT.
+
+        If wait_for_data is False, this returns as soon as the broker accepts
+        the connection and the data is filled in when it arrives. Check
+        is_data_available before reading properties.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._connection_manager = connection_manager
         self._disconnected.clear()
         self._mqtt_client = mqtt.Client(protocol=mqtt.MQTTv31)
         self._mqtt_client.username_pw_set(self._serial, self._credential)
@@ -80,11 +226,8 @@ class DysonDevice:
         def _on_connect(client: mqtt.Client, userdata: Any, flags, rc):
             _LOGGER.debug("Connected with result code %d", rc)
             nonlocal error
-            if rc == mqtt.CONNACK_REFUSED_BAD_USERNAME_PASSWORD:
-                error = DysonInvalidCredential
-            elif rc != mqtt.CONNACK_ACCEPTED:
-                error = DysonConnectionRefused
-            else:
+            error = _connection_error(rc)
+            if error is None:
                 client.subscribe(self._status_topic)
             self._connected.set()
 
@@ -96,17 +239,24 @@ class DysonDevice:
         self._mqtt_client.on_connect = _on_connect
         self._mqtt_client.on_disconnect = _on_disconnect
         self._mqtt_client.on_message = self._on_message
-        self._mqtt_client.connect_async(host)
-        self._mqtt_client.loop_start()
-        if self._connected.wait(timeout=TIMEOUT):
+        if connection_manager is None:
+            self._mqtt_client.connect_async(host)
+            self._mqtt_client.loop_start()
+        else:
+            connection_manager.register(self._mqtt_client, host)
+        if self._connected.wait(timeout=_remaining(deadline)):
             if error is not None:
                 self.disconnect()
                 raise error
 
             _LOGGER.info("Connected to device %s", self._serial)
-            if self._request_first_data():
-                self._mqtt_client.on_connect = self._on_connect
-                self._mqtt_client.on_disconnect = self._on_disconnect
+            if wait_for_data:
+                data_available = self._request_first_data(deadline)
+            else:
+                self._request_data()
+                data_available = True
+            if data_available:
+                self._install_callbacks(self._mqtt_client)
                 return
 
         # Close connection if timeout or connected but failed to get data
@@ -116,12 +266,26 @@ class DysonDevice:
 
     def disconnect(self) -> None:
         """Disconnect from the device."""
+        self._before_disconnect()
         self._connected.clear()
+        if self._connection_manager is not None:
+            self._connection_manager.unregister(self._mqtt_client)
         self._mqtt_client.disconnect()
         if not self._disconnected.wait(timeout=TIMEOUT):
             _LOGGER.warning("Disconnect timed out")
-        self._mqtt_client.loop_stop()
+        if self._connection_manager is None:
+            self._mqtt_client.loop_stop()
         self._mqtt_client = None
+        self._connection_manager = None
+        self._after_disconnect()
+
+    def _before_disconnect(self) -> None:
+        """Run while still connected when disconnecting."""
+
+    def _after_disconnect(self) -> None:
+        """Run once disconnected."""
+        # Do not send stale messages after a later connect
+        self._outbound.clear()
 
     def add_message_listener(self, callback) -> None:
         """Add a callback to receive update notification."""
@@ -132,33 +296,113 @@ class DysonDevice:
         if callback in self._callbacks:
             self._callbacks.remove(callback)
 
+    def add_change_listener(
+        self,
+        callback: ChangeListener,
+        fields: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Add a callback to receive changed fields.
+
+        The callback is called with the message type and a frozenset of the
+        raw fields that changed, e.g. "fnsp". If fields is given, it is only
+        called when one of those fields changes, and only with those fields.
+        """
+        if fields is not None:
+            fields = frozenset(fields)
+        self._change_listeners.append((callback, fields))
+
+    def remove_change_listener(self, callback) -> None:
+        """Remove an existed change callback."""
+        self._change_listeners = [
+            listener for listener in self._change_listeners if listener[0] != callback
+        ]
+
+    def _install_callbacks(self, client: mqtt.Client) -> None:
+        """Handle reconnections of an established connection."""
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_connect_fail = self._on_connect_fail
+
     def _on_connect(self, client: mqtt.Client, userdata: Any, flags, rc):
         _LOGGER.debug("Connected with result code %d", rc)
+        if _connection_error(rc) is not None:
+            self._on_connect_fail(client, userdata)
+            return
+        self._reconnect_count += 1
+        self._reconnect_failures = 0
         self._disconnected.clear()
         self._connected.set()
         client.subscribe(self._status_topic)
-        for callback in self._callbacks:
-            callback(MessageType.STATE)
+        # The state may have changed while disconnected
+        self._request_data()
+        self._notify_listeners(MessageType.STATE)
 
     def _on_disconnect(self, client, userdata, rc):
         _LOGGER.debug(f"Disconnected with result code {str(rc)}")
+        connection_lost = self._connected.is_set()
         self._connected.clear()
         self._disconnected.set()
-        for callback in self._callbacks:
-            callback(MessageType.STATE)
+        if connection_lost:
+            self._backoff(client)
+        self._notify_listeners(MessageType.STATE)
+
+    def _on_connect_fail(self, client: mqtt.Client, userdata: Any) -> None:
+        _LOGGER.debug("Failed to reconnect to device %s", self._serial)
+        self._failed_reconnect_count += 1
+        self._backoff(client)
+
+    def _backoff(self, client: mqtt.Client) -> None:
+        """Set the delay before the next reconnection attempt of paho."""
+        delay = self.reconnect_policy.delay(self._reconnect_failures)
+        self._reconnect_failures += 1
+        if self._connection_manager is None:
+            # Connection managers schedule reconnections themselves
+            client.reconnect_delay_set(delay, delay)
 
     def _on_message(self, client, userdata: Any, msg: mqtt.MQTTMessage):
-        payload = json.loads(msg.payload.decode("utf-8"))
+        payload = self.payload_decoder(msg.payload)
         self._handle_message(payload)
 
     def _handle_message(self, payload: dict) -> None:
         if payload["msg"] in ["CURRENT-STATE", "STATE-CHANGE"]:
             _LOGGER.debug("New state: %s", payload)
+            previous = self._status
             self._update_status(payload)
             if not self._status_data_available.is_set():
                 self._status_data_available.set()
-            for callback in self._callbacks:
-                callback(MessageType.STATE)
+            self._notify_listeners(MessageType.STATE)
+            self._notify_changes(MessageType.STATE, previous, self._status)
+
+    def _notify_listeners(self, message_type: MessageType) -> None:
+        for callback in self._callbacks:
+            self.dispatcher.dispatch(
+                ("message", self, callback, message_type), callback, (message_type,)
+            )
+
+    def _notify_changes(
+        self,
+        message_type: MessageType,
+        previous: Optional[DysonState],
+        current: DysonState,
+    ) -> None:
+        if not self._change_listeners:
+            return  # Skip the diff if nobody is interested
+        changed = current.changed_fields(previous)
+        if not changed:
+            return
+        for callback, fields in self._change_listeners:
+            if fields is None:
+                fields_changed = changed
+            elif fields.isdisjoint(changed):
+                continue
+            else:
+                fields_changed = changed & fields
+            self.dispatcher.dispatch(
+                ("change", self, callback, message_type),
+                callback,
+                (message_type, fields_changed),
+                _merge_changes,
+            )
 
     @abstractmethod
     def _update_status(self, payload: dict) -> None:
@@ -174,7 +418,17 @@ class DysonDevice:
             "time": mqtt_time(),
         }
         payload.update(data)
-        self._mqtt_client.publish(self._command_topic, json.dumps(payload))
+        self._outbound.put(payload)
+
+    def _publish_now(self, payload: dict, qos: int) -> None:
+        client = self._mqtt_client
+        if client is None:
+            _LOGGER.debug("Dropped message to disconnected device: %s", payload)
+            return
+        if qos:
+            client.publish(self._command_topic, json.dumps(payload), qos)
+        else:
+            client.publish(self._command_topic, json.dumps(payload))
 
     def request_current_status(self):
         """Request current status."""
@@ -184,19 +438,65 @@ class DysonDevice:
             "msg": "REQUEST-CURRENT-STATE",
             "time": mqtt_time(),
         }
-        self._mqtt_client.publish(self._command_topic, json.dumps(payload))
+        # Requests come after commands and a queued request is not repeated
+        self._outbound.put(payload, priority=PRIORITY_REQUEST, key=payload["msg"])
+
+
+def _speed(value: str) -> Optional[int]:
+    return None if value == "AUTO" else int(value)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonFanStatus(DysonState):
+    """Status snapshot of a Dyson fan device."""
+
+    fan_state: bool = state_field("fnst", flag("FAN"))
+    speed: Optional[int] = state_field("fnsp", _speed)
+    night_mode: bool = state_field("nmod", flag("ON"))
+    continuous_monitoring: bool = state_field("rhtm", flag("ON"))
+    error_code: str = state_field("ercd", str)
+    warning_code: str = state_field("wacd", str)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonFanEnvironmentalData(DysonState):
+    """Environmental data snapshot of a Dyson fan device."""
+
+    humidity: int = state_field("hact", environmental())
+    temperature: float = state_field("tact", environmental(divisor=10))
+    sleep_timer: int = state_field("sltm", environmental())
 
 
 class DysonFanDevice(DysonDevice):
     """Dyson fan device."""
 
+    _STATUS_CLASS = DysonFanStatus
+    _ENVIRONMENTAL_DATA_CLASS = DysonFanEnvironmentalData
+
+    # Seconds to wait for more configuration changes before sending them in a
+    # single STATE-SET message. 0 sends every change immediately.
+    coalesce_window: float = 0
+
+    # Apply configuration changes to the local status before the device
+    # reports them, and roll them back if it does not within TIMEOUT
+    optimistic: bool = False
+
     def __init__(self, serial: str, credential: str, device_type: str):
         """Initialize the device."""
         super().__init__(serial, credential)
         self._device_type = device_type
 
-        self._environmental_data = None
         self._environmental_data_available = threading.Event()
+        self._environmental_data_received: Optional[float] = None
+        self._configuration_lock = threading.Lock()
+        self._pending_configuration: Dict[str, str] = {}
+        self._batch_depth = 0
+        # Identifies the open coalescing window, None if there is none
+        self._coalesce_window: Optional[object] = None
+        self._commands = CommandTracker()
+        self._reported_status: Optional[DysonState] = None
+        self._optimistic_lock = threading.Lock()
+        self._optimistic_fields: Dict[str, Tuple[str, float]] = {}
 
     @property
     def device_type(self) -> str:
@@ -208,18 +508,30 @@ class DysonFanDevice(DysonDevice):
         """MQTT status topic."""
         return f"{self.device_type}/{self._serial}/status/current"
 
+    @property
+    def is_data_available(self) -> bool:
+        """Whether the first data has been received from the device."""
+        return (
+            self._status_data_available.is_set()
+            and self._environmental_data_available.is_set()
+        )
+
+    @property
+    def environmental_data_age(self) -> Optional[float]:
+        """Return seconds since environmental data was last received."""
+        if self._environmental_data_received is None:
+            return None
+        return time.monotonic() - self._environmental_data_received
+
     @property
     def fan_state(self) -> bool:
         """Return if the fan is running."""
-        return self._get_field_value(self._status, "fnst") == "FAN"
+        return self._status.fan_state
 
     @property
     def speed(self) -> Optional[int]:
         """Return fan speed."""
-        speed = self._get_field_value(self._status, "fnsp")
-        if speed == "AUTO":
-            return None
-        return int(speed)
+        return self._status.speed
 
     @property
     @abstractmethod
@@ -239,32 +551,32 @@ class DysonFanDevice(DysonDevice):
     @property
     def night_mode(self) -> bool:
         """Return night mode status."""
-        return self._get_field_value(self._status, "nmod") == "ON"
+        return self._status.night_mode
 
     @property
     def continuous_monitoring(self) -> bool:
         """Return standby monitoring status."""
-        return self._get_field_value(self._status, "rhtm") == "ON"
+        return self._status.continuous_monitoring
 
     @property
     def error_code(self) -> str:
         """Return error code."""
-        return self._get_field_value(self._status, "ercd")
+        return self._status.error_code
 
     @property
     def warning_code(self) -> str:
         """Return warning code."""
-        return self._get_field_value(self._status, "wacd")
+        return self._status.warning_code
 
     @property
     def humidity(self) -> int:
         """Return humidity in percentage."""
-        return self._get_environmental_field_value("hact")
+        return self._environmental_data.humidity
 
     @property
-    def temperature(self) -> int:
+    def temperature(self) -> float:
         """Return temperature in kelvin."""
-        return self._get_environmental_field_value("tact", divisor=10)
+        return self._environmental_data.temperature
 
     @property
     @abstractmethod
@@ -274,57 +586,180 @@ class DysonFanDevice(DysonDevice):
     @property
     def sleep_timer(self) -> int:
         """Return sleep timer in minutes."""
-        return self._get_environmental_field_value("sltm")
-
-    @staticmethod
-    def _get_field_value(state, field):
-        return state[field][1] if isinstance(state[field], list) else state[field]
-
-    def _get_environmental_field_value(self, field, divisor=1):
-        value = self._get_field_value(self._environmental_data, field)
-        if value == "OFF":
-            return ENVIRONMENTAL_OFF
-        if value == "INIT":
-            return ENVIRONMENTAL_INIT
-        if value == "FAIL":
-            return ENVIRONMENTAL_FAIL
-        if divisor == 1:
-            return int(value)
-        return float(value) / divisor
+        return self._environmental_data.sleep_timer
 
     def _handle_message(self, payload: dict) -> None:
         super()._handle_message(payload)
         if payload["msg"] == "ENVIRONMENTAL-CURRENT-SENSOR-DATA":
             _LOGGER.debug("New environmental state: %s", payload)
-            self._environmental_data = payload["data"]
+            previous = self._environmental_data
+            self._environmental_data = self._ENVIRONMENTAL_DATA_CLASS.from_raw(
+                normalize_state(payload["data"])
+            )
+            self._environmental_data_received = time.monotonic()
             if not self._environmental_data_available.is_set():
                 self._environmental_data_available.set()
-            for callback in self._callbacks:
-                callback(MessageType.ENVIRONMENTAL)
+            self._notify_listeners(MessageType.ENVIRONMENTAL)
+            self._notify_changes(
+                MessageType.ENVIRONMENTAL, previous, self._environmental_data
+            )
+
+    @property
+    def pending_fields(self) -> FrozenSet[str]:
+        """Return the fields set optimistically but not reported yet."""
+        return frozenset(self._optimistic_fields)
 
     def _update_status(self, payload: dict) -> None:
-        self._status = payload["product-state"]
+        state = payload["product-state"]
+        with self._optimistic_lock:
+            if payload["msg"] == "STATE-CHANGE" and self._reported_status is not None:
+                reported = self._reported_status.merge(changed_state(state))
+            else:
+                reported = self._STATUS_CLASS.from_raw(normalize_state(state))
+            self._reported_status = reported
+            self._status = self._apply_optimistic_fields()
+        self._commands.update(reported)
+
+    def _apply_optimistic_fields(self) -> DysonState:
+        """Return the reported status with the pending optimistic fields."""
+        reported = self._reported_status
+        if not self._optimistic_fields:
+            return reported
+        now = time.monotonic()
+        self._optimistic_fields = {
+            field: (value, deadline)
+            for field, (value, deadline) in self._optimistic_fields.items()
+            if deadline > now and not reported.matches({field: value})
+        }
+        return reported.merge(
+            {field: value for field, (value, _) in self._optimistic_fields.items()}
+        )
+
+    def _set_optimistic_fields(self, data: dict) -> None:
+        with self._optimistic_lock:
+            if self._reported_status is None:
+                return
+            previous = self._status
+            deadline = time.monotonic() + TIMEOUT
+            for field, value in data.items():
+                self._optimistic_fields[field] = (value, deadline)
+            self._status = self._apply_optimistic_fields()
+        SCHEDULER.call_later(
+            TIMEOUT,
+            lambda: _ROLLBACKS.dispatch(
+                ("rollback", self), self._expire_optimistic_fields, ()
+            ),
+        )
+        self._notify_listeners(MessageType.STATE)
+        self._notify_changes(MessageType.STATE, previous, self._status)
 
-    def _set_configuration(self, **kwargs: dict) -> None:
+    def _expire_optimistic_fields(self) -> None:
+        with self._optimistic_lock:
+            if self._reported_status is None:
+                return
+            previous = self._status
+            self._status = self._apply_optimistic_fields()
+        if self._status is not previous:
+            _LOGGER.debug("Rolled back unconfirmed state of %s", self._serial)
+            self._notify_listeners(MessageType.STATE)
+            self._notify_changes(MessageType.STATE, previous, self._status)
+
+    def _before_disconnect(self) -> None:
+        """Run while still connected when disconnecting."""
+        # Send changes still waiting in the coalescing window
+        self._flush_configuration()
+
+    def _after_disconnect(self) -> None:
+        """Run once disconnected."""
+        super()._after_disconnect()
+        self._commands.fail_all(DysonNotConnected())
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Send the configuration changes made in the context together.
+
+        Changes are merged into a single STATE-SET message sent when the
+        outermost batch exits. A later change of a field overrides an earlier
+        one. Batches are per device, so changes made by other threads during
+        a batch join it.
+        """
+        with self._configuration_lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._configuration_lock:
+                self._batch_depth -= 1
+            self._flush_configuration()
+
+    def _set_configuration(self, **kwargs: dict) -> "Future[DysonState]":
+        """Set configuration of the device.
+
+        Return a future resolved with the status once the device reports the
+        new values. It fails with DysonCommandTimeout after TIMEOUT seconds.
+        """
         if not self.is_connected:
             raise DysonNotConnected
-        payload = json.dumps(
-            {
-                "msg": "STATE-SET",
-                "time": mqtt_time(),
-                "mode-reason": "LAPP",
-                "data": kwargs,
-            }
-        )
-        self._mqtt_client.publish(self._command_topic, payload, 1)
+        future = self._commands.track(kwargs, TIMEOUT)
+        if self.optimistic:
+            self._set_optimistic_fields(kwargs)
+        with self._configuration_lock:
+            self._pending_configuration.update(kwargs)
+            if self._batch_depth > 0:
+                return future
+            if self.coalesce_window > 0:
+                if self._coalesce_window is None:
+                    window = self._coalesce_window = object()
+                    SCHEDULER.call_later(
+                        self.coalesce_window,
+                        lambda: self._close_coalesce_window(window),
+                    )
+                return future
+        self._flush_configuration()
+        return future
+
+    def _flush_configuration(self) -> None:
+        with self._configuration_lock:
+            if self._batch_depth > 0:
+                return  # Sent when the batch exits
+            self._coalesce_window = None
+            data, self._pending_configuration = self._pending_configuration, {}
+        if not data:
+            return
+        if not self.is_connected:
+            _LOGGER.debug("Dropped configuration of disconnected device: %s", data)
+            return
+        payload = {
+            "msg": "STATE-SET",
+            "time": mqtt_time(),
+            "mode-reason": "LAPP",
+            "data": data,
+        }
+        # Configuration waiting for the rate limit is merged with later changes
+        self._outbound.put(payload, 1, key=payload["msg"], merge=_merge_state_set)
+
+    def _close_coalesce_window(self, window: object) -> None:
+        with self._configuration_lock:
+            if self._coalesce_window is not window:
+                return  # Already flushed
+        self._flush_configuration()
+
+    def _request_data(self) -> None:
+        """Request all data of the device."""
+        super()._request_data()
+        self.request_environmental_data()
 
-    def _request_first_data(self) -> bool:
+    def _request_first_data(self, deadline: Optional[float] = None) -> bool:
         """Request and wait for first data."""
-        self.request_current_status()
-        self.request_environmental_data()
-        status_available = self._status_data_available.wait(timeout=TIMEOUT)
+        # Both replies share a single deadline
+        if deadline is None:
+            deadline = time.monotonic() + TIMEOUT
+        self._request_data()
+        status_available = self._status_data_available.wait(
+            timeout=_remaining(deadline)
+        )
         environmental_available = self._environmental_data_available.wait(
-            timeout=TIMEOUT
+            timeout=_remaining(deadline)
         )
         return status_available and environmental_available
 
@@ -336,109 +771,125 @@ class DysonFanDevice(DysonDevice):
             "msg": "REQUEST-PRODUCT-ENVIRONMENT-CURRENT-SENSOR-DATA",
             "time": mqtt_time(),
         }
-        self._mqtt_client.publish(self._command_topic, json.dumps(payload))
+        self._outbound.put(payload, priority=PRIORITY_REQUEST, key=payload["msg"])
 
     @abstractmethod
-    def turn_on(self) -> None:
+    def turn_on(self) -> "Future[DysonState]":
         """Turn on the device."""
 
     @abstractmethod
-    def turn_off(self) -> None:
+    def turn_off(self) -> "Future[DysonState]":
         """Turn off the device."""
 
-    def set_speed(self, speed: int) -> None:
+    def set_speed(self, speed: int) -> "Future[DysonState]":
         """Set manual speed."""
         if not 1 <= speed <= 10:
             raise ValueError("Invalid speed %s", speed)
-        self._set_speed(speed)
+        return self._set_speed(speed)
 
     @abstractmethod
-    def _set_speed(self, speed: int) -> None:
+    def _set_speed(self, speed: int) -> "Future[DysonState]":
         """Actually set the speed without range check."""
 
     @abstractmethod
-    def enable_auto_mode(self) -> None:
+    def enable_auto_mode(self) -> "Future[DysonState]":
         """Turn on auto mode."""
 
     @abstractmethod
-    def disable_auto_mode(self) -> None:
+    def disable_auto_mode(self) -> "Future[DysonState]":
         """Turn off auto mode."""
 
     @abstractmethod
-    def enable_oscillation(self) -> None:
+    def enable_oscillation(self) -> "Future[DysonState]":
         """Turn on oscillation."""
 
     @abstractmethod
-    def disable_oscillation(self) -> None:
+    def disable_oscillation(self) -> "Future[DysonState]":
         """Turn off oscillation."""
 
-    def enable_night_mode(self) -> None:
+    def enable_night_mode(self) -> "Future[DysonState]":
         """Turn on auto mode."""
-        self._set_configuration(nmod="ON")
+        return self._set_configuration(nmod="ON")
 
-    def disable_night_mode(self) -> None:
+    def disable_night_mode(self) -> "Future[DysonState]":
         """Turn off auto mode."""
-        self._set_configuration(nmod="OFF")
+        return self._set_configuration(nmod="OFF")
 
     @abstractmethod
-    def enable_continuous_monitoring(self) -> None:
+    def enable_continuous_monitoring(self) -> "Future[DysonState]":
         """Turn on continuous monitoring."""
 
     @abstractmethod
-    def disable_continuous_monitoring(self) -> None:
+    def disable_continuous_monitoring(self) -> "Future[DysonState]":
         """Turn off continuous monitoring."""
 
-    def set_sleep_timer(self, duration: int) -> None:
+    def set_sleep_timer(self, duration: int) -> "Future[DysonState]":
         """Set sleep timer."""
         if not 0 < duration <= 540:
             raise ValueError("Duration must be between 1 and 540")
-        self._set_configuration(sltm="%04d" % duration)
+        return self._set_configuration(sltm="%04d" % duration)
 
-    def disable_sleep_timer(self) -> None:
+    def disable_sleep_timer(self) -> "Future[DysonState]":
         """Disable sleep timer."""
-        self._set_configuration(sltm="OFF")
+        return self._set_configuration(sltm="OFF")
 
-    def reset_filter(self) -> None:
+    def reset_filter(self) -> "Future[DysonState]":
         """Reset filter life."""
-        self._set_configuration(rstf="RSTF")
+        return self._set_configuration(rstf="RSTF")
+
+
+def _heat_target(value: str) -> float:
+    return int(value) / 10
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonHeatingStatus(DysonFanStatus):
+    """Status snapshot of a Dyson heating fan device."""
+
+    focus_mode: bool = state_field("ffoc", flag("ON"))
+    heat_target: float = state_field("hmax", _heat_target)
+    heat_mode_is_on: bool = state_field("hmod", flag("HEAT"))
+    heat_status_is_on: bool = state_field("hsta", flag("HEAT"))
 
 
 class DysonHeatingDevice(DysonFanDevice):
     """Dyson heating fan device."""
 
+    _STATUS_CLASS = DysonHeatingStatus
+
     @property
     def focus_mode(self) -> bool:
         """Return if fan focus mode is on."""
-        return self._get_field_value(self._status, "ffoc") == "ON"
+        return self._status.focus_mode
 
     @property
     def heat_target(self) -> float:
         """Return heat target in kelvin."""
-        return int(self._get_field_value(self._status, "hmax")) / 10
+        return self._status.heat_target
 
     @property
     def heat_mode_is_on(self) -> bool:
         """Return if heat mode is set to on."""
-        return self._get_field_value(self._status, "hmod") == "HEAT"
+        return self._status.heat_mode_is_on
 
     @property
     def heat_status_is_on(self) -> bool:
         """Return if the device is currently heating."""
-        return self._get_field_value(self._status, "hsta") == "HEAT"
+        return self._status.heat_status_is_on
 
-    def set_heat_target(self, heat_target: float) -> None:
+    def set_heat_target(self, heat_target: float) -> "Future[DysonState]":
         """Set heat target in kelvin."""
         if not 274 <= heat_target <= 310:
             raise ValueError("Heat target must be between 274 and 310 kelvin")
-        self._set_configuration(
+        return self._set_configuration(
             hmod="HEAT",
             hmax=f"{round(heat_target * 10):04d}",
         )
 
-    def enable_heat_mode(self) -> None:
+    def enable_heat_mode(self) -> "Future[DysonState]":
         """Enable heat mode."""
-        self._set_configuration(hmod="HEAT")
+        return self._set_configuration(hmod="HEAT")
 
-    def disable_heat_mode(self) -> None:
+    def disable_heat_mode(self) -> "Future[DysonState]":
         """Disable heat mode."""
-        self._set_configuration(hmod="OFF")
+        return self._set_configuration(hmod="OFF")
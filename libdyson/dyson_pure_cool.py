@@ -1,23 +1,70 @@
 """Dyson Pure Cool fan."""
 
 from abc import abstractmethod
+from concurrent.futures import Future
 from typing import Optional
 
-from .dyson_device import DysonFanDevice
+import attr
+
+from .dyson_device import DysonFanDevice, DysonFanEnvironmentalData, DysonFanStatus
+from .state import DysonState, environmental, flag, state_field
+
+
+def _carbon_filter_life(value: str) -> Optional[int]:
+    return None if value == "INV" else int(value)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonPureCoolBaseStatus(DysonFanStatus):
+    """Status snapshot of the Dyson Pure Cool series."""
+
+    is_on: bool = state_field("fpwr", flag("ON"))
+    auto_mode: bool = state_field("auto", flag("ON"))
+    oscillation_status: bool = state_field("oscs", flag("ON"))
+    front_airflow: bool = state_field("fdir", flag("ON"))
+    night_mode_speed: int = state_field("nmdv", int)
+    carbon_filter_life: Optional[int] = state_field("cflr", _carbon_filter_life)
+    hepa_filter_life: int = state_field("hflr", int)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonPureCoolEnvironmentalData(DysonFanEnvironmentalData):
+    """Environmental data snapshot of the Dyson Pure Cool series."""
+
+    particulate_matter_2_5: int = state_field("pm25", environmental())
+    particulate_matter_10: int = state_field("pm10", environmental())
+    volatile_organic_compounds: int = state_field("va10", environmental())
+    nitrogen_dioxide: int = state_field("noxl", environmental())
+    formaldehyde: Optional[int] = state_field("hcho", environmental())
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonPureCoolStatus(DysonPureCoolBaseStatus):
+    """Status snapshot of a Dyson Pure Cool."""
+
+    # Seems some devices use OION/OIOF while others uses ON/OFF
+    # https://github.com/shenxn/ha-dyson/issues/22
+    oscillation: bool = state_field("oson", flag("OION", "ON"))
+    oscillation_raw: str = state_field("oson", str)
+    oscillation_angle_low: int = state_field("osal", int)
+    oscillation_angle_high: int = state_field("osau", int)
 
 
 class DysonPureCoolBase(DysonFanDevice):
     """Dyson Pure Cool series base class."""
 
+    _STATUS_CLASS = DysonPureCoolBaseStatus
+    _ENVIRONMENTAL_DATA_CLASS = DysonPureCoolEnvironmentalData
+
     @property
     def is_on(self) -> bool:
         """Return if the device is on."""
-        return self._get_field_value(self._status, "fpwr") == "ON"
+        return self._status.is_on
 
     @property
     def auto_mode(self) -> bool:
         """Return auto mode status."""
-        return self._get_field_value(self._status, "auto") == "ON"
+        return self._status.auto_mode
 
     @property
     @abstractmethod
@@ -27,118 +74,115 @@ class DysonPureCoolBase(DysonFanDevice):
     @property
     def oscillation_status(self) -> bool:
         """Return the status of oscillation."""
-        return self._get_field_value(self._status, "oscs") == "ON"
+        return self._status.oscillation_status
 
     @property
     def front_airflow(self) -> bool:
         """Return if airflow from front is on."""
-        return self._get_field_value(self._status, "fdir") == "ON"
+        return self._status.front_airflow
 
     @property
     def night_mode_speed(self) -> int:
         """Return speed in night mode."""
-        return int(self._get_field_value(self._status, "nmdv"))
+        return self._status.night_mode_speed
 
     @property
     def carbon_filter_life(self) -> Optional[int]:
         """Return carbon filter life in percentage."""
-        filter_life = self._get_field_value(self._status, "cflr")
-        if filter_life == "INV":
-            return None
-        return int(filter_life)
+        return self._status.carbon_filter_life
 
     @property
     def hepa_filter_life(self) -> Optional[int]:
         """Return HEPA filter life in percentage."""
-        return int(self._get_field_value(self._status, "hflr"))
+        return self._status.hepa_filter_life
 
     @property
     def particulate_matter_2_5(self):
         """Return PM 2.5 in micro grams per cubic meter."""
-        return int(self._get_environmental_field_value("pm25"))
+        return self._environmental_data.particulate_matter_2_5
 
     @property
     def particulate_matter_10(self):
         """Return PM 2.5 in micro grams per cubic meter."""
-        return int(self._get_environmental_field_value("pm10"))
+        return self._environmental_data.particulate_matter_10
 
     @property
     def volatile_organic_compounds(self):
         """Return VOCs in micro grams per cubic meter."""
-        return int(self._get_environmental_field_value("va10"))
+        return self._environmental_data.volatile_organic_compounds
 
     @property
     def nitrogen_dioxide(self):
         """Return nitrogen dioxide level in micro grams per cubic meter."""
-        return int(self._get_environmental_field_value("noxl"))
+        return self._environmental_data.nitrogen_dioxide
 
-    def turn_on(self) -> None:
+    def turn_on(self) -> "Future[DysonState]":
         """Turn on the device."""
-        self._set_configuration(fpwr="ON")
+        return self._set_configuration(fpwr="ON")
 
-    def turn_off(self) -> None:
+    def turn_off(self) -> "Future[DysonState]":
         """Turn off the device."""
-        self._set_configuration(fpwr="OFF")
+        return self._set_configuration(fpwr="OFF")
 
-    def _set_speed(self, speed: int) -> None:
-        self._set_configuration(fpwr="ON", fnsp=f"{speed:04d}")
+    def _set_speed(self, speed: int) -> "Future[DysonState]":
+        return self._set_configuration(fpwr="ON", fnsp=f"{speed:04d}")
 
-    def enable_auto_mode(self) -> None:
+    def enable_auto_mode(self) -> "Future[DysonState]":
         """Turn on auto mode."""
-        self._set_configuration(auto="ON")
+        return self._set_configuration(auto="ON")
 
-    def disable_auto_mode(self) -> None:
+    def disable_auto_mode(self) -> "Future[DysonState]":
         """Turn off auto mode."""
-        self._set_configuration(auto="OFF")
+        return self._set_configuration(auto="OFF")
 
-    def enable_continuous_monitoring(self) -> None:
+    def enable_continuous_monitoring(self) -> "Future[DysonState]":
         """Turn on continuous monitoring."""
-        self._set_configuration(
+        return self._set_configuration(
             fpwr="ON" if self.is_on else "OFF",  # Not sure about this
             rhtm="ON",
         )
 
-    def disable_continuous_monitoring(self) -> None:
+    def disable_continuous_monitoring(self) -> "Future[DysonState]":
         """Turn off continuous monitoring."""
-        self._set_configuration(
+        return self._set_configuration(
             fpwr="ON" if self.is_on else "OFF",
             rhtm="OFF",
         )
 
-    def enable_front_airflow(self) -> None:
+    def enable_front_airflow(self) -> "Future[DysonState]":
         """Turn on front airflow."""
-        self._set_configuration(fdir="ON")
+        return self._set_configuration(fdir="ON")
 
-    def disable_front_airflow(self) -> None:
+    def disable_front_airflow(self) -> "Future[DysonState]":
         """Turn off front airflow."""
-        self._set_configuration(fdir="OFF")
+        return self._set_configuration(fdir="OFF")
 
 
 class DysonPureCool(DysonPureCoolBase):
     """Dyson Pure Cool device."""
 
+    _STATUS_CLASS = DysonPureCoolStatus
+
     @property
     def oscillation(self) -> bool:
         """Return oscillation status."""
-        # Seems some devices use OION/OIOF while others uses ON/OFF
-        # https://github.com/shenxn/ha-dyson/issues/22
-        return self._get_field_value(self._status, "oson") in ["OION", "ON"]
+        return self._status.oscillation
 
     @property
     def oscillation_angle_low(self) -> int:
         """Return oscillation low angle."""
-        return int(self._get_field_value(self._status, "osal"))
+        return self._status.oscillation_angle_low
 
     @property
     def oscillation_angle_high(self) -> int:
         """Return oscillation high angle."""
-        return int(self._get_field_value(self._status, "osau"))
+        return self._status.oscillation_angle_high
 
     def enable_oscillation(
         self,
         angle_low: Optional[int] = None,
         angle_high: Optional[int] = None,
-    ) -> None:
+    ) -> "Future[DysonState]":
         """Turn on oscillation."""
         if angle_low is None:
             angle_low = self.oscillation_angle_low
@@ -154,12 +198,12 @@ class DysonPureCool(DysonPureCoolBase):
                 "angle_high must be either equal to angle_low or at least 30 larger than angle_low"
             )
 
-        current_oscillation_raw = self._get_field_value(self._status, "oson")
+        current_oscillation_raw = self._status.oscillation_raw
         if current_oscillation_raw in ["OION", "OIOF"]:
             oson = "OION"
         else:
             oson = "ON"
-        self._set_configuration(
+        return self._set_configuration(
             oson=oson,
             fpwr="ON",
             ancp="CUST",
@@ -167,14 +211,14 @@ class DysonPureCool(DysonPureCoolBase):
             osau=f"{angle_high:04d}",
         )
 
-    def disable_oscillation(self) -> None:
+    def disable_oscillation(self) -> "Future[DysonState]":
         """Turn off oscillation."""
-        current_oscillation_raw = self._get_field_value(self._status, "oson")
+        current_oscillation_raw = self._status.oscillation_raw
         if current_oscillation_raw in ["OION", "OIOF"]:
             oson = "OIOF"
         else:
             oson = "OFF"
-        self._set_configuration(oson=oson)
+        return self._set_configuration(oson=oson)
 
 
 class DysonPureCoolFormaldehyde(DysonPureCool):
@@ -191,4 +235,4 @@ class DysonPureCoolFormaldehyde(DysonPureCool):
         #
         # This is part of environmental data as per:
         # https://github.com/seanrees/prometheus-dyson/issues/13#issue-923525150
-        return self._get_environmental_field_value("hcho")
+        return self._environmental_data.formaldehyde
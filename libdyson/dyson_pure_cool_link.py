@@ -1,93 +1,123 @@
 """Dyson Pure Cool Link fan."""
 
+from concurrent.futures import Future
+
+import attr
+
 from .const import AirQualityTarget
-from .dyson_device import DysonFanDevice
+from .dyson_device import DysonFanDevice, DysonFanEnvironmentalData, DysonFanStatus
+from .state import DysonState, environmental, flag, state_field
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonPureCoolLinkStatus(DysonFanStatus):
+    """Status snapshot of a Dyson Pure Cool Link."""
+
+    fan_mode: str = state_field("fmod", str)
+    is_on: bool = state_field("fmod", flag("FAN", "AUTO"))
+    auto_mode: bool = state_field("fmod", flag("AUTO"))
+    oscillation: bool = state_field("oson", flag("ON"))
+    air_quality_target: AirQualityTarget = state_field("qtar", AirQualityTarget)
+    filter_life: int = state_field("filf", int)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonPureCoolLinkEnvironmentalData(DysonFanEnvironmentalData):
+    """Environmental data snapshot of a Dyson Pure Cool Link."""
+
+    particulates: int = state_field("pact", environmental())
+    volatile_organic_compounds: int = state_field("vact", environmental())
 
 
 class DysonPureCoolLink(DysonFanDevice):
     """Dyson Pure Cool Link device."""
 
+    _STATUS_CLASS = DysonPureCoolLinkStatus
+    _ENVIRONMENTAL_DATA_CLASS = DysonPureCoolLinkEnvironmentalData
+
     @property
     def fan_mode(self) -> str:
         """Return the fan mode of the fan."""
-        return self._get_field_value(self._status, "fmod")
+        return self._status.fan_mode
 
     @property
     def is_on(self) -> bool:
         """Return if the device is on."""
-        return self.fan_mode in ["FAN", "AUTO"]
+        return self._status.is_on
 
     @property
     def auto_mode(self) -> bool:
         """Return auto mode status."""
-        return self.fan_mode == "AUTO"
+        return self._status.auto_mode
 
     @property
     def oscillation(self) -> bool:
         """Return oscillation status."""
-        return self._get_field_value(self._status, "oson") == "ON"
+        return self._status.oscillation
 
     @property
     def air_quality_target(self) -> AirQualityTarget:
         """Return air quality target."""
-        return AirQualityTarget(self._get_field_value(self._status, "qtar"))
+        return self._status.air_quality_target
 
     @property
     def filter_life(self) -> int:
         """Return filter life in hours."""
-        return int(self._get_field_value(self._status, "filf"))
+        return self._status.filter_life
 
     @property
     def particulates(self) -> int:
         """Return particulate matter in unknown unit."""
-        return self._get_environmental_field_value("pact")
+        return self._environmental_data.particulates
 
     @property
     def volatile_organic_compounds(self) -> int:
         """Return VOCs in unknown unit."""
-        return self._get_environmental_field_value("vact")
+        return self._environmental_data.volatile_organic_compounds
 
-    def turn_on(self) -> None:
+    def turn_on(self) -> "Future[DysonState]":
         """Turn on the device."""
-        self._set_configuration(fmod="FAN")
+        return self._set_configuration(fmod="FAN")
 
-    def turn_off(self) -> None:
+    def turn_off(self) -> "Future[DysonState]":
         """Turn off the device."""
-        self._set_configuration(fmod="OFF")
+        return self._set_configuration(fmod="OFF")
 
-    def _set_speed(self, speed: int) -> None:
-        self._set_configuration(fmod="FAN", fnsp=f"{speed:04d}")
+    def _set_speed(self, speed: int) -> "Future[DysonState]":
+        return self._set_configuration(fmod="FAN", fnsp=f"{speed:04d}")
 
-    def enable_auto_mode(self) -> None:
+    def enable_auto_mode(self) -> "Future[DysonState]":
         """Turn on auto mode."""
-        self._set_configuration(fmod="AUTO")
+        return self._set_configuration(fmod="AUTO")
 
-    def disable_auto_mode(self) -> None:
+    def disable_auto_mode(self) -> "Future[DysonState]":
         """Turn off auto mode."""
-        self._set_configuration(fmod="FAN")
+        return self._set_configuration(fmod="FAN")
 
-    def enable_oscillation(self) -> None:
+    def enable_oscillation(self) -> "Future[DysonState]":
         """Turn on oscillation."""
-        self._set_configuration(oson="ON")
+        return self._set_configuration(oson="ON")
 
-    def disable_oscillation(self) -> None:
+    def disable_oscillation(self) -> "Future[DysonState]":
         """Turn off oscillation."""
-        self._set_configuration(oson="OFF")
+        return self._set_configuration(oson="OFF")
 
-    def enable_continuous_monitoring(self) -> None:
+    def enable_continuous_monitoring(self) -> "Future[DysonState]":
         """Turn on continuous monitoring."""
-        self._set_configuration(
+        return self._set_configuration(
             fmod=self.fan_mode,  # Seems fmod is required to make this work
             rhtm="ON",
         )
 
-    def disable_continuous_monitoring(self) -> None:
+    def disable_continuous_monitoring(self) -> "Future[DysonState]":
         """Turn off continuous monitoring."""
-        self._set_configuration(
+        return self._set_configuration(
             fmod=self.fan_mode,
             rhtm="OFF",
         )
 
-    def set_air_quality_target(self, air_quality_target: AirQualityTarget) -> None:
+    def set_air_quality_target(
+        self, air_quality_target: AirQualityTarget
+    ) -> "Future[DysonState]":
         """Set air quality target."""
-        self._set_configuration(qtar=air_quality_target.value)
+        return self._set_configuration(qtar=air_quality_target.value)
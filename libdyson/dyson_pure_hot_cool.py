@@ -1,8 +1,23 @@
 """Dyson Pure Hot+Cool device."""
 
-from .dyson_device import DysonHeatingDevice
-from .dyson_pure_cool import DysonPureCool
+import attr
+
+from .dyson_device import DysonHeatingDevice, _heat_target
+from .dyson_pure_cool import DysonPureCool, DysonPureCoolStatus
+from .state import flag, state_field
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonPureHotCoolStatus(DysonPureCoolStatus):
+    """Status snapshot of a Dyson Pure Hot+Cool."""
+
+    focus_mode: bool = state_field("ffoc", flag("ON"))
+    heat_target: float = state_field("hmax", _heat_target)
+    heat_mode_is_on: bool = state_field("hmod", flag("HEAT"))
+    heat_status_is_on: bool = state_field("hsta", flag("HEAT"))
 
 
 class DysonPureHotCool(DysonPureCool, DysonHeatingDevice):
     """Dyson Pure Hot+Cool device."""
+
+    _STATUS_CLASS = DysonPureHotCoolStatus
@@ -1,21 +1,39 @@
 """Dyson Pure Hot+Cool Link device."""
 
-from .dyson_device import DysonHeatingDevice
-from .dyson_pure_cool_link import DysonPureCoolLink
+from concurrent.futures import Future
+
+import attr
+
+from .dyson_device import DysonHeatingDevice, _heat_target
+from .dyson_pure_cool_link import DysonPureCoolLink, DysonPureCoolLinkStatus
+from .state import DysonState, flag, state_field
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonPureHotCoolLinkStatus(DysonPureCoolLinkStatus):
+    """Status snapshot of a Dyson Pure Hot+Cool Link."""
+
+    focus_mode: bool = state_field("ffoc", flag("ON"))
+    heat_target: float = state_field("hmax", _heat_target)
+    heat_mode_is_on: bool = state_field("hmod", flag("HEAT"))
+    heat_status_is_on: bool = state_field("hsta", flag("HEAT"))
+    tilt: bool = state_field("tilt", flag("TILT"))
 
 
 class DysonPureHotCoolLink(DysonPureCoolLink, DysonHeatingDevice):
     """Dyson Pure Hot+Cool Link device."""
 
+    _STATUS_CLASS = DysonPureHotCoolLinkStatus
+
     @property
     def tilt(self) -> bool:
         """Return tilt status."""
-        return self._get_field_value(self._status, "tilt") == "TILT"
+        return self._status.tilt
 
-    def enable_focus_mode(self) -> None:
+    def enable_focus_mode(self) -> "Future[DysonState]":
         """Enable fan focus mode."""
-        self._set_configuration(ffoc="ON")
+        return self._set_configuration(ffoc="ON")
 
-    def disable_focus_mode(self) -> None:
+    def disable_focus_mode(self) -> "Future[DysonState]":
         """Disable fan focus mode."""
-        self._set_configuration(ffoc="OFF")
+        return self._set_configuration(ffoc="OFF")
@@ -1,9 +1,13 @@
 """Dyson Pure Humidify+Cool device."""
 
+from concurrent.futures import Future
 from typing import Optional
 
+import attr
+
 from .const import HumidifyOscillationMode, WaterHardness
-from .dyson_pure_cool import DysonPureCoolBase
+from .dyson_pure_cool import DysonPureCoolBase, DysonPureCoolBaseStatus
+from .state import DysonState, flag, state_field
 
 WATER_HARDNESS_ENUM_TO_STR = {
     WaterHardness.SOFT: "2025",
@@ -15,90 +19,113 @@ WATER_HARDNESS_STR_TO_ENUM = {
 }
 
 
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonPureHumidifyCoolStatus(DysonPureCoolBaseStatus):
+    """Status snapshot of a Dyson Pure Humidify+Cool."""
+
+    oscillation: bool = state_field("oson", flag("ON"))
+    oscillation_mode: HumidifyOscillationMode = state_field(
+        "ancp", HumidifyOscillationMode
+    )
+    humidification: bool = state_field("hume", flag("HUMD"))
+    humidification_auto_mode: bool = state_field("haut", flag("ON"))
+    target_humidity: int = state_field("humt", int)
+    auto_target_humidity: int = state_field("rect", int)
+    water_hardness: WaterHardness = state_field(
+        "wath", WATER_HARDNESS_STR_TO_ENUM.__getitem__
+    )
+    time_until_next_clean: int = state_field("cltr", int)
+    clean_time_remaining: int = state_field("cdrr", int)
+
+
 class DysonPureHumidifyCool(DysonPureCoolBase):
     """Dyson Pure Humidify+Cool device."""
 
+    _STATUS_CLASS = DysonPureHumidifyCoolStatus
+
     @property
     def oscillation(self) -> bool:
         """Return oscillation status."""
-        return self._get_field_value(self._status, "oson") == "ON"
+        return self._status.oscillation
 
     @property
     def oscillation_mode(self) -> HumidifyOscillationMode:
         """Return oscillation mode."""
-        return HumidifyOscillationMode(self._get_field_value(self._status, "ancp"))
+        return self._status.oscillation_mode
 
     @property
     def humidification(self) -> bool:
         """Return if humidification is on."""
-        return self._get_field_value(self._status, "hume") == "HUMD"
+        return self._status.humidification
 
     @property
     def humidification_auto_mode(self) -> bool:
         """Return if humidification auto mode is on."""
-        return self._get_field_value(self._status, "haut") == "ON"
+        return self._status.humidification_auto_mode
 
     @property
     def target_humidity(self) -> int:
         """Return target humidity in percentage."""
-        return int(self._get_field_value(self._status, "humt"))
+        return self._status.target_humidity
 
     @property
     def auto_target_humidity(self) -> int:
         """Return humidification auto mode target humidity."""
-        return int(self._get_field_value(self._status, "rect"))
+        return self._status.auto_target_humidity
 
     @property
     def water_hardness(self) -> WaterHardness:
         """Return the water hardness setting."""
-        return WATER_HARDNESS_STR_TO_ENUM[self._get_field_value(self._status, "wath")]
+        return self._status.water_hardness
 
     @property
     def time_until_next_clean(self) -> int:
         """Return the time remaining in hours before the next deep cleaning."""
-        return int(self._get_field_value(self._status, "cltr"))
+        return self._status.time_until_next_clean
 
     @property
     def clean_time_remaining(self) -> int:
         """Return the time remaining in minutes before the cleaning finishes."""
-        return int(self._get_field_value(self._status, "cdrr"))
+        return self._status.clean_time_remaining
 
     def enable_oscillation(
         self, oscillation_mode: Optional[HumidifyOscillationMode] = None
-    ) -> None:
+    ) -> "Future[DysonState]":
         """Turn on oscillation."""
         if oscillation_mode is None:
             oscillation_mode = self.oscillation_mode
 
-        self._set_configuration(oson="ON", fpwr="ON", ancp=oscillation_mode.value)
+        return self._set_configuration(
+            oson="ON", fpwr="ON", ancp=oscillation_mode.value
+        )
 
-    def disable_oscillation(self) -> None:
+    def disable_oscillation(self) -> "Future[DysonState]":
         """Turn off oscillation."""
-        self._set_configuration(oson="OFF")
+        return self._set_configuration(oson="OFF")
 
-    def enable_humidification(self) -> None:
+    def enable_humidification(self) -> "Future[DysonState]":
         """Enable humidification."""
-        self._set_configuration(hume="HUMD")
+        return self._set_configuration(hume="HUMD")
 
-    def disable_humidification(self) -> None:
+    def disable_humidification(self) -> "Future[DysonState]":
         """Disable humidification."""
-        self._set_configuration(hume="OFF")
+        return self._set_configuration(hume="OFF")
 
-    def enable_humidification_auto_mode(self) -> None:
+    def enable_humidification_auto_mode(self) -> "Future[DysonState]":
         """Enable humidification auto mode."""
-        self._set_configuration(haut="ON")
+        return self._set_configuration(haut="ON")
 
-    def disable_humidification_auto_mode(self) -> None:
+    def disable_humidification_auto_mode(self) -> "Future[DysonState]":
         """Disable humidification auto mode."""
-        self._set_configuration(haut="OFF")
+        return self._set_configuration(haut="OFF")
 
-    def set_target_humidity(self, target_humidity: int) -> None:
+    def set_target_humidity(self, target_humidity: int) -> "Future[DysonState]":
         """Set target humidity."""
-        self._set_configuration(humt=f"{target_humidity:04d}", haut="OFF")
+        return self._set_configuration(humt=f"{target_humidity:04d}", haut="OFF")
 
-    def set_water_hardness(self, water_hardness: WaterHardness) -> None:
+    def set_water_hardness(self, water_hardness: WaterHardness) -> "Future[DysonState]":
         """Set water hardness."""
-        self._set_configuration(wath=WATER_HARDNESS_ENUM_TO_STR[water_hardness])
+        return self._set_configuration(wath=WATER_HARDNESS_ENUM_TO_STR[water_hardness])
 
 
 class DysonPurifierHumidifyCoolFormaldehyde(DysonPureHumidifyCool):
@@ -107,4 +134,4 @@ class DysonPurifierHumidifyCoolFormaldehyde(DysonPureHumidifyCool):
     @property
     def formaldehyde(self):
         """Return formaldehyde reading."""
-        return int(self._get_environmental_field_value("hcho"))
+        return self._environmental_data.formaldehyde
@@ -2,13 +2,45 @@
 
 from typing import Optional, Tuple
 
+import attr
+
 from .const import CleaningType, VacuumState
 from .dyson_device import DysonDevice
+from .state import DysonState, state_field
+
+
+def _state(raw: dict) -> VacuumState:
+    return VacuumState(raw["state"] if "state" in raw else raw["newstate"])
+
+
+def _cleaning_type(value: str) -> Optional[CleaningType]:
+    return None if value == "" else CleaningType(value)
+
+
+def _cleaning_id(value: str) -> Optional[str]:
+    return None if value == "" else value
+
+
+def _position(value: list) -> Optional[Tuple[int, int]]:
+    return tuple(value) if len(value) == 2 else None
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonVacuumStatus(DysonState):
+    """Status snapshot of a Dyson vacuum device."""
+
+    state: VacuumState = state_field(None, _state)
+    cleaning_type: Optional[CleaningType] = state_field("fullCleanType", _cleaning_type)
+    cleaning_id: Optional[str] = state_field("cleanId", _cleaning_id)
+    battery_level: int = state_field("batteryChargeLevel", int)
+    position: Optional[Tuple[int, int]] = state_field("globalPosition", _position)
 
 
 class DysonVacuumDevice(DysonDevice):
     """Dyson vacuum device."""
 
+    _STATUS_CLASS = DysonVacuumStatus
+
     @property
     def _status_topic(self) -> str:
         """MQTT status topic."""
@@ -17,42 +49,27 @@ class DysonVacuumDevice(DysonDevice):
     @property
     def state(self) -> VacuumState:
         """State of the device."""
-        return VacuumState(
-            self._status["state"]
-            if "state" in self._status
-            else self._status["newstate"]
-        )
+        return self._status.state
 
     @property
     def cleaning_type(self) -> Optional[CleaningType]:
         """Return the type of the current cleaning task."""
-        cleaning_type = self._status["fullCleanType"]
-        if cleaning_type == "":
-            return None
-        return CleaningType(cleaning_type)
+        return self._status.cleaning_type
 
     @property
     def cleaning_id(self) -> Optional[str]:
         """Return the id of the current cleaning task."""
-        cleaning_id = self._status["cleanId"]
-        if cleaning_id == "":
-            return None
-        return cleaning_id
+        return self._status.cleaning_id
 
     @property
     def battery_level(self) -> int:
         """Battery level of the device in percentage."""
-        return self._status["batteryChargeLevel"]
+        return self._status.battery_level
 
     @property
     def position(self) -> Optional[Tuple[int, int]]:
         """Position (x, y) of the device."""
-        if (
-            "globalPosition" in self._status
-            and len(self._status["globalPosition"]) == 2
-        ):
-            return tuple(self._status["globalPosition"])
-        return None
+        return self._status.position
 
     @property
     def is_charging(self) -> bool:
@@ -65,7 +82,10 @@ class DysonVacuumDevice(DysonDevice):
         ]
 
     def _update_status(self, payload: dict) -> None:
-        self._status = payload
+        if payload["msg"] == "STATE-CHANGE" and self._status is not None:
+            self._status = self._status.merge(payload)
+        else:
+            self._status = self._STATUS_CLASS.from_raw(payload)
 
     def pause(self) -> None:
         """Pause cleaning."""
@@ -13,6 +13,10 @@ class DysonServerError(DysonException):
     """Represents Dyson server error."""
 
 
+class DysonCircuitOpen(DysonServerError):
+    """Represents requests refused after repeated errors of the server."""
+
+
 class DysonInvalidAccountStatus(DysonException):
     """Represents invalid account status."""
 
@@ -41,6 +45,10 @@ class DysonNotConnected(DysonException):
     """Represents mqtt not connected."""
 
 
+class DysonCommandTimeout(DysonException):
+    """Represents command not acknowledged by the device in time."""
+
+
 class DysonInvalidCredential(DysonException):
     """Represents invalid mqtt credential."""
 
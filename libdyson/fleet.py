@@ -0,0 +1,155 @@
+"""Operations on a fleet of Dyson devices."""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Mapping, Optional
+
+from . import dyson_device
+from .dyson_device import DysonDevice, DysonFanDevice
+from .exceptions import DysonConnectTimeout, DysonException
+
+if TYPE_CHECKING:
+    from .connection_manager import DysonConnectionManager
+
+_LOGGER = logging.getLogger(__name__)
+
+# Connections opened at once by connect_all by default
+CONNECT_CONCURRENCY = 16
+
+
+def connect_all(
+    devices: Iterable[DysonDevice],
+    hosts: Mapping[str, str],
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    connection_manager: Optional["DysonConnectionManager"] = None,
+) -> Dict[str, Optional[Exception]]:
+    """Connect devices concurrently.
+
+    hosts maps device serials to their addresses, and KeyError is raised
+    before connecting anything if one is missing. At most concurrency
+    connections, CONNECT_CONCURRENCY by default, are opened at once. All
+    connections share a single deadline, twice TIMEOUT by default, so the
+    wall time does not grow with the number of devices. Returns a dict
+    mapping each serial to None if the device is connected, or to the
+    exception that failed its connection. Devices still queued when the
+    deadline passes fail with DysonConnectTimeout.
+    """
+    devices = list(devices)
+    if not devices:
+        return {}
+    missing = [device.serial for device in devices if device.serial not in hosts]
+    if missing:
+        raise KeyError(f"No host for {', '.join(missing)}")
+    if timeout is None:
+        timeout = dyson_device.TIMEOUT * 2
+    deadline = time.monotonic() + timeout
+
+    def _connect(device: DysonDevice) -> Optional[Exception]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return DysonConnectTimeout()
+        try:
+            device.connect(
+                hosts[device.serial],
+                connection_manager=connection_manager,
+                timeout=remaining,
+            )
+        except DysonException as err:
+            return err
+        except Exception as err:  # pylint: disable=broad-except
+            # Keep the results of the other devices
+            _LOGGER.exception("Failed to connect to device %s", device.serial)
+            return err
+        return None
+
+    with ThreadPoolExecutor(
+        max_workers=min(concurrency or CONNECT_CONCURRENCY, len(devices)),
+        thread_name_prefix="libdyson-connect-all",
+    ) as executor:
+        results = executor.map(_connect, devices)
+        return {device.serial: result for device, result in zip(devices, results)}
+
+
+class DysonEnvironmentalPoller:
+    """Poll environmental data of fan devices periodically.
+
+    Each device is polled once every interval seconds. Requests are spread
+    evenly over the interval rather than sent at once. Disconnected devices,
+    and devices whose data is younger than max_age seconds, half the interval
+    by default, are skipped.
+    """
+
+    def __init__(self, interval: float = 60, max_age: Optional[float] = None):
+        """Initialize the poller."""
+        self._interval = interval
+        self._max_age = interval / 2 if max_age is None else max_age
+        self._devices: Deque[DysonFanDevice] = deque()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def device_count(self) -> int:
+        """Return the number of polled devices."""
+        return len(self._devices)
+
+    def add(self, device: DysonFanDevice) -> None:
+        """Start polling a device."""
+        with self._lock:
+            if device not in self._devices:
+                self._devices.append(device)
+
+    def remove(self, device: DysonFanDevice) -> None:
+        """Stop polling a device."""
+        with self._lock:
+            if device in self._devices:
+                self._devices.remove(device)
+
+    def start(self) -> None:
+        """Start polling."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="libdyson-environmental-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _next_device(self) -> Optional[DysonFanDevice]:
+        with self._lock:
+            if not self._devices:
+                return None
+            self._devices.rotate(-1)
+            return self._devices[-1]
+
+    def _poll(self, device: DysonFanDevice) -> None:
+        if not device.is_connected:
+            return
+        age = device.environmental_data_age
+        if age is not None and age < self._max_age:
+            return
+        try:
+            device.request_environmental_data()
+        except DysonException as err:
+            _LOGGER.debug("Failed to poll %s: %s", device.serial, err)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            device = self._next_device()
+            if device is None:
+                self._stopped.wait(self._interval)
+                continue
+            self._poll(device)
+            self._stopped.wait(self._interval / max(len(self._devices), 1))
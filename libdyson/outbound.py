@@ -0,0 +1,129 @@
+"""Rate limited queue of messages sent to a device."""
+
+import heapq
+import itertools
+import logging
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from .scheduling import SCHEDULER, TokenBucket
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_COMMAND = 0
+PRIORITY_REQUEST = 1
+
+MergeFunction = Callable[[dict, dict], dict]
+
+
+class _Message:
+    """Queued message."""
+
+    def __init__(self, payload: dict, qos: int, key: Optional[Hashable]):
+        """Initialize the message."""
+        self.payload = payload
+        self.qos = qos
+        self.key = key
+
+
+class OutboundQueue:
+    """Rate limited priority queue of messages sent to a device.
+
+    Messages are published right away while the token bucket allows it.
+    Otherwise they are queued and sent as tokens become available, lower
+    priority values first. A message with a key is merged into a queued
+    message with the same key instead of being queued again. When max_size
+    messages are queued, a new message evicts the newest message of a lower
+    priority, or is dropped if there is none.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[dict, int], None],
+        rate: Optional[float],
+        burst: int,
+        max_size: int = 100,
+    ):
+        """Initialize the queue."""
+        self._publish = publish
+        self._bucket = None if rate is None else TokenBucket(rate, burst)
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[int, int, _Message]] = []
+        self._keys: Dict[Hashable, _Message] = {}
+        self._counter = itertools.count()
+        self._scheduled = False
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        """Return the number of queued messages."""
+        return len(self._heap)
+
+    def put(
+        self,
+        payload: dict,
+        qos: int = 0,
+        priority: int = PRIORITY_COMMAND,
+        key: Optional[Hashable] = None,
+        merge: Optional[MergeFunction] = None,
+    ) -> None:
+        """Publish a message, or queue it if the rate limit is reached.
+
+        If a message with the same key is queued, its payload is replaced, or
+        combined with the new one by merge if given.
+        """
+        with self._lock:
+            if key is not None and key in self._keys:
+                message = self._keys[key]
+                if merge is not None:
+                    payload = merge(message.payload, payload)
+                message.payload = payload
+                return
+            wait = 0.0
+            if not self._heap and self._bucket is not None:
+                wait = self._bucket.consume()
+            if self._heap or wait > 0:
+                self._push(priority, _Message(payload, qos, key))
+                if not self._scheduled:
+                    self._scheduled = True
+                    SCHEDULER.call_later(wait, self._drain)
+                return
+        self._publish(payload, qos)
+
+    def clear(self) -> None:
+        """Drop all queued messages."""
+        with self._lock:
+            self._heap = []
+            self._keys = {}
+
+    def _push(self, priority: int, message: _Message) -> None:
+        if len(self._heap) >= self._max_size:
+            self.dropped += 1
+            lowest = max(self._heap, key=lambda item: item[:2])
+            if lowest[0] <= priority:
+                _LOGGER.warning("Outbound queue full, dropping %s", message.payload)
+                return
+            _LOGGER.warning("Outbound queue full, dropping %s", lowest[2].payload)
+            self._heap.remove(lowest)
+            heapq.heapify(self._heap)
+            self._keys.pop(lowest[2].key, None)
+        heapq.heappush(self._heap, (priority, next(self._counter), message))
+        if message.key is not None:
+            self._keys[message.key] = message
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if not self._heap:
+                    self._scheduled = False
+                    return
+                wait = 0 if self._bucket is None else self._bucket.consume()
+                if wait > 0:
+                    SCHEDULER.call_later(wait, self._drain)
+                    return
+                _, _, message = heapq.heappop(self._heap)
+                self._keys.pop(message.key, None)
+            try:
+                self._publish(message.payload, message.qos)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Failed to publish queued message")
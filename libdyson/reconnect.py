@@ -0,0 +1,33 @@
+"""Reconnection backoff."""
+
+import random
+
+import attr
+
+
+def backoff(failures: int, min_delay: float, max_delay: float, jitter: float) -> float:
+    """Return a jittered exponential backoff delay after consecutive failures.
+
+    The delay doubles with each failure up to max_delay. A random part of it,
+    up to the jitter fraction, is taken off so that clients failing at the
+    same time do not retry at the same time.
+    """
+    delay = min(min_delay * 2 ** min(failures, 32), max_delay)
+    return delay * (1 - jitter * random.random())
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class ReconnectPolicy:
+    """Jittered exponential backoff between reconnection attempts."""
+
+    min_delay: float = 1
+    max_delay: float = 120
+    jitter: float = 0.5
+
+    def delay(self, failures: int) -> float:
+        """Return the delay before the next attempt after consecutive failures.
+
+        Jitter keeps devices dropped at the same time from reconnecting at the
+        same time.
+        """
+        return backoff(failures, self.min_delay, self.max_delay, self.jitter)
@@ -0,0 +1,94 @@
+"""Timers and rate limits shared by devices and cloud clients."""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Single thread running delayed callbacks.
+
+    Callbacks should be short, since they delay all the ones after them.
+    """
+
+    def __init__(self, name: str = "libdyson-scheduler"):
+        """Initialize the scheduler."""
+        self._name = name
+        self._condition = threading.Condition()
+        self._heap: List[Tuple[float, int, Callable[[], None]]] = []
+        self._counter = itertools.count()
+        self._thread = None
+
+    def call_later(self, delay: float, func: Callable[[], None]) -> None:
+        """Call func after delay seconds."""
+        with self._condition:
+            heapq.heappush(
+                self._heap, (time.monotonic() + delay, next(self._counter), func)
+            )
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    timeout = (
+                        self._heap[0][0] - time.monotonic() if self._heap else None
+                    )
+                    self._condition.wait(timeout)
+                _, _, func = heapq.heappop(self._heap)
+            try:
+                func()
+            except Exception:  # pylint: disable=broad-except
+                # Never let one callback stop the timers of all devices
+                _LOGGER.exception("Error in scheduled callback")
+
+
+# Runs command timeouts, coalescing windows and rate limited sends of all
+# devices
+SCHEDULER = Scheduler()
+
+
+class TokenBucket:
+    """Allow rate tokens per second on average and bursts of burst tokens."""
+
+    def __init__(self, rate: float, burst: int):
+        """Initialize the bucket."""
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self) -> float:
+        """Take a token.
+
+        Return 0 if a token was taken, otherwise the seconds until one is
+        available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self._rate
+
+    def acquire(self) -> None:
+        """Take a token, waiting until one is available."""
+        while True:
+            wait = self.consume()
+            if wait == 0:
+                return
+            time.sleep(wait)
@@ -0,0 +1,156 @@
+"""Immutable state snapshots of Dyson devices."""
+
+from functools import lru_cache
+from typing import Any, Callable, FrozenSet, Optional, Tuple
+
+import attr
+
+from .const import ENVIRONMENTAL_FAIL, ENVIRONMENTAL_INIT, ENVIRONMENTAL_OFF
+
+_ENVIRONMENTAL_VALUES = {
+    "OFF": ENVIRONMENTAL_OFF,
+    "INIT": ENVIRONMENTAL_INIT,
+    "FAIL": ENVIRONMENTAL_FAIL,
+}
+
+
+def state_field(field: Optional[str], converter: Callable[[Any], Any]):
+    """Define a snapshot attribute converted from a field of the raw state.
+
+    If field is None, the converter receives the whole raw state.
+    """
+    return attr.ib(metadata={"field": field, "converter": converter})
+
+
+def flag(*values: str) -> Callable[[str], bool]:
+    """Return a converter checking if a value is one of the given values."""
+    return lambda value: value in values
+
+
+def environmental(divisor: int = 1) -> Callable[[str], Any]:
+    """Return a converter of environmental sensor values."""
+
+    def _convert(value: str):
+        if value in _ENVIRONMENTAL_VALUES:
+            return _ENVIRONMENTAL_VALUES[value]
+        if divisor == 1:
+            return int(value)
+        return float(value) / divisor
+
+    return _convert
+
+
+@lru_cache(maxsize=None)
+def _converters(cls: type) -> Tuple[Tuple[str, Optional[str], Callable], ...]:
+    return tuple(
+        (
+            attribute.name,
+            attribute.metadata["field"],
+            attribute.metadata["converter"],
+        )
+        for attribute in attr.fields(cls)
+    )
+
+
+def _convert(converter: Callable[[Any], Any], value: Any) -> Any:
+    if value is None:
+        return None
+    return converter(value)
+
+
+@attr.s(frozen=True, slots=True)
+class DysonState:
+    """Base class of immutable state snapshots.
+
+    Values are converted once when the snapshot is built. A value that is
+    missing from the raw state, or cannot be converted, is None.
+    """
+
+    @classmethod
+    def from_raw(cls, raw: dict):
+        """Build a snapshot from raw state."""
+        values = {}
+        for name, field, converter in _converters(cls):
+            try:
+                if field is None:
+                    value = converter(raw)
+                else:
+                    value = _convert(converter, raw.get(field))
+            except (KeyError, TypeError, ValueError):
+                value = None
+            values[name] = value
+        return cls(**values)
+
+    def merge(self, raw: dict):
+        """Return a snapshot updated with the fields present in raw state.
+
+        Only the present fields are converted. If nothing changes, the
+        snapshot itself is returned.
+        """
+        changes = {}
+        for name, field, converter in _converters(type(self)):
+            if field is None:
+                try:
+                    value = converter(raw)
+                except (KeyError, TypeError, ValueError):
+                    continue  # Not included in this update
+            elif field not in raw:
+                continue
+            else:
+                try:
+                    value = _convert(converter, raw[field])
+                except (KeyError, TypeError, ValueError):
+                    value = None
+            if value != getattr(self, name):
+                changes[name] = value
+        if not changes:
+            return self
+        return attr.evolve(self, **changes)
+
+    def matches(self, raw: dict) -> bool:
+        """Return if the snapshot shows the values of raw state.
+
+        Fields the snapshot does not hold are ignored.
+        """
+        for name, field, converter in _converters(type(self)):
+            if field is None or field not in raw:
+                continue
+            try:
+                value = _convert(converter, raw[field])
+            except (KeyError, TypeError, ValueError):
+                return False
+            if value != getattr(self, name):
+                return False
+        return True
+
+    def changed_fields(self, previous: Optional["DysonState"]) -> FrozenSet[str]:
+        """Return the raw fields whose values differ from a previous snapshot.
+
+        Attributes computed from the whole raw state are reported by their
+        attribute names. Without a previous snapshot, all present fields are
+        reported.
+        """
+        if type(previous) is not type(self):
+            previous = None
+        changed = set()
+        for name, field, _ in _converters(type(self)):
+            value = getattr(self, name)
+            if previous is None:
+                if value is None:
+                    continue
+            elif getattr(previous, name) == value:
+                continue
+            changed.add(name if field is None else field)
+        return frozenset(changed)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class DysonSnapshot:
+    """Consistent snapshot of all the state of a device.
+
+    A new snapshot replaces the previous one by reference whenever a message
+    is received, so the fields of a snapshot always belong together.
+    """
+
+    status: Optional[DysonState] = None
+    environmental_data: Optional[DysonState] = None
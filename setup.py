@@ -9,7 +9,14 @@ REQUIRES = [
     "attrs",
 ]
 
+EXTRAS_REQUIRE = {
+    "orjson": ["orjson"],
+    "msgspec": ["msgspec"],
+    "aiohttp": ["aiohttp"],
+}
+
 setuptools.setup(
     include_package_data=True,
     install_requires=REQUIRES,
+    extras_require=EXTRAS_REQUIRE,
 )
@@ -12,5 +12,16 @@ def mocked_requests() -> MockedRequests:
     """Return mocked requests library."""
     mocked_requests = MockedRequests()
 
-    with patch("libdyson.cloud.account.requests.request", mocked_requests.request):
+    with patch(
+        "libdyson.cloud.account.requests.Session.request", mocked_requests.request
+    ):
         yield mocked_requests
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay():
+    """Retry cloud requests without delay and with closed circuits."""
+    with patch("libdyson.cloud.account.time.sleep"), patch.dict(
+        "libdyson.cloud.retry._BREAKERS", clear=True
+    ):
+        yield
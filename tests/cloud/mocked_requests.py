@@ -29,19 +29,24 @@ class MockedRequests:
         self, method: str, url: str, headers=None, verify=True, **kwargs
     ) -> requests.Response:
         """Run mocked request function."""
-        assert headers == DYSON_API_HEADERS
+        assert headers.items() >= DYSON_API_HEADERS.items()
         assert url.startswith(self.host)
         path = url[len(self.host) :]
         response = requests.Response()
         if not (method, path) in self._handlers:
             response.status_code = 404
             return response
-        status_code, payload = self._handlers[(method, path)](**kwargs)
+        status_code, payload, *response_headers = self._handlers[(method, path)](
+            headers=headers, **kwargs
+        )
         response.status_code = status_code
+        if response_headers:
+            response.headers.update(response_headers[0])
         if isinstance(payload, bytes):
             response._content = payload
         elif payload is not None:
             response.encoding = "utf-8"
             content = json.dumps(payload).encode("utf-8")
             response._content = content
+        response._content_consumed = True
         return response
@@ -0,0 +1,236 @@
+"""Tests for the asyncio cloud client."""
+
+import asyncio
+import time
+
+import pytest
+
+from libdyson.cloud import RetryPolicy
+from libdyson.cloud.account import (
+    API_PATH_DEVICES,
+    API_PATH_MOBILE_REQUEST,
+    API_PATH_MOBILE_VERIFY,
+    DYSON_API_HEADERS,
+)
+from libdyson.cloud.retry import get_circuit_breaker
+from libdyson.exceptions import (
+    DysonAuthRequired,
+    DysonInvalidAuth,
+    DysonLoginFailure,
+    DysonNetworkError,
+    DysonServerError,
+)
+
+from . import AUTH_INFO
+from .utils import encrypt_credential
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from libdyson.cloud.aio import (  # noqa: E402
+    AsyncDysonAccount,
+    AsyncDysonAccountCN,
+    AsyncDysonCloud360Eye,
+)
+
+SERIAL = "JH1-US-HBB1111A"
+CREDENTIAL = "aoWJM1kpL79MN2dPMlL5ysQv/APG+HAv+x3HDk0yuT3gMfgA3mLuil4O3d+q6CcyU+D1Hoir38soKoZHshYFeQ=="  # noqa: E501
+CLEANING_ID = "edcda2c9-5088-455e-b2ee-9422ef70afb2"
+MOBILE = "+8613588888888"
+OTP = "000000"
+CHALLENGE_ID = "2b289d7f-1e0d-41e2-a0cb-56115eab6855"
+
+
+async def _devices(request: web.Request) -> web.Response:
+    assert request.headers["User-Agent"] == DYSON_API_HEADERS["User-Agent"]
+    assert request.headers["Authorization"].startswith("Basic ")
+    return web.json_response(
+        [
+            {
+                "Active": True,
+                "Serial": SERIAL,
+                "Name": "Device",
+                "Version": "11.02.02",
+                "LocalCredentials": encrypt_credential(SERIAL, CREDENTIAL),
+                "AutoUpdate": True,
+                "NewVersionAvailable": False,
+                "ProductType": "N223",
+            },
+            {"Serial": "LIGHTCYCLE"},
+        ]
+    )
+
+
+async def _cleaning_history(request: web.Request) -> web.Response:
+    return web.json_response(
+        {
+            "Entries": [
+                {
+                    "Clean": CLEANING_ID,
+                    "Started": "2021-02-10T17:02:00",
+                    "Finished": "2021-02-10T17:02:10",
+                    "Area": 0.00,
+                    "Charges": 0,
+                    "Type": "Immediate",
+                    "IsInterim": False,
+                },
+            ]
+        }
+    )
+
+
+async def _cleaning_map(request: web.Request) -> web.Response:
+    if request.match_info["cleaning_id"] != CLEANING_ID:
+        return web.Response(status=404)
+    return web.Response(body=b"PNG")
+
+
+async def _mobile_request(request: web.Request) -> web.Response:
+    assert "Authorization" not in request.headers
+    assert await request.json() == {"mobile": MOBILE}
+    return web.json_response({"challengeId": CHALLENGE_ID})
+
+
+async def _mobile_verify(request: web.Request) -> web.Response:
+    body = await request.json()
+    if body["otpCode"] != OTP:
+        return web.Response(status=400)
+    return web.json_response({"token": "TOKEN", "tokenType": "Bearer"})
+
+
+def _flaky(failures: int):
+    requests = []
+
+    async def _handler(request: web.Request) -> web.Response:
+        requests.append(request)
+        if len(requests) <= failures:
+            return web.Response(status=503)
+        return web.Response()
+
+    return _handler
+
+
+async def _slow(request: web.Request) -> web.Response:
+    await asyncio.sleep(1)
+    return web.Response()
+
+
+def _status(status: int):
+    async def _handler(request: web.Request) -> web.Response:
+        return web.Response(status=status)
+
+    return _handler
+
+
+def _run(test) -> None:
+    async def _test() -> None:
+        app = web.Application()
+        app.router.add_get(API_PATH_DEVICES, _devices)
+        app.router.add_get(
+            f"/v1/assets/devices/{SERIAL}/cleanhistory", _cleaning_history
+        )
+        app.router.add_get(
+            f"/v1/mapvisualizer/devices/{SERIAL}/map/{{cleaning_id}}", _cleaning_map
+        )
+        app.router.add_post(API_PATH_MOBILE_REQUEST, _mobile_request)
+        app.router.add_post(API_PATH_MOBILE_VERIFY, _mobile_verify)
+        app.router.add_get("/error", _status(502))
+        app.router.add_get("/auth", _status(401))
+        app.router.add_get("/slow", _slow)
+        app.router.add_get("/flaky", _flaky(2))
+        async with TestServer(app) as server:
+            await test(f"http://{server.host}:{server.port}")
+
+    asyncio.run(_test())
+
+
+def test_devices():
+    """Test getting devices and 360 Eye data."""
+
+    async def _test(host: str) -> None:
+        async with AsyncDysonAccount(AUTH_INFO) as account:
+            account._HOST = host
+            devices = await account.devices()
+            assert len(devices) == 1
+            assert devices[0].serial == SERIAL
+            assert devices[0].credential == CREDENTIAL
+
+            device = AsyncDysonCloud360Eye(account, SERIAL)
+            tasks = await device.get_cleaning_history()
+            assert [task.cleaning_id for task in tasks] == [CLEANING_ID]
+            assert await device.get_cleaning_map(CLEANING_ID) == b"PNG"
+            assert await device.get_cleaning_map("unknown") is None
+
+    _run(_test)
+
+
+def test_login_mobile_otp():
+    """Test logging in with phone number."""
+
+    async def _test(host: str) -> None:
+        async with AsyncDysonAccountCN() as account:
+            account._HOST = host
+            verify = await account.login_mobile_otp(MOBILE)
+            with pytest.raises(DysonLoginFailure):
+                await verify("111111")
+            auth_info = await verify(OTP)
+            assert auth_info == {"token": "TOKEN", "tokenType": "Bearer"}
+            assert account.auth_info == auth_info
+
+    _run(_test)
+
+
+def test_errors():
+    """Test error handling."""
+
+    async def _test(host: str) -> None:
+        async with AsyncDysonAccount() as account:
+            account._HOST = host
+            with pytest.raises(DysonAuthRequired):
+                await account.devices()
+        async with AsyncDysonAccount(
+            AUTH_INFO, retry_policy=RetryPolicy(min_delay=0)
+        ) as account:
+            account._HOST = host
+            # Retried until the failure is not a server error any more
+            assert (await account.request("GET", "/flaky")).status_code == 200
+            with pytest.raises(DysonServerError):
+                await account.request("GET", "/error")
+            with pytest.raises(DysonInvalidAuth):
+                await account.request("GET", "/auth")
+            with pytest.raises(DysonNetworkError):
+                await account.devices(deadline=time.monotonic() - 1)
+            with pytest.raises(DysonNetworkError):
+                await account.request("GET", "/slow", deadline=time.monotonic() + 0.1)
+            account._HOST = "http://127.0.0.1:1"
+            with pytest.raises(DysonNetworkError):
+                await account.devices()
+
+    _run(_test)
+
+
+def test_circuit_breaker_trial():
+    """Test trial requests ending without outcome."""
+
+    async def _test(host: str) -> None:
+        breaker = get_circuit_breaker(host)
+        breaker.reset_timeout = 0
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        async with AsyncDysonAccount(AUTH_INFO) as account:
+            account._HOST = host
+            with pytest.raises(DysonNetworkError):
+                await account.request("GET", "/slow", deadline=time.monotonic() - 1)
+            task = asyncio.ensure_future(account.request("GET", "/slow"))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert breaker.is_open
+            with pytest.raises(DysonInvalidAuth):
+                await account.request("GET", "/auth")
+            assert not breaker.is_open
+
+    _run(_test)
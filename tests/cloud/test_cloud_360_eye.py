@@ -1,12 +1,17 @@
 """Tests for 360 Eye cloud client."""
 
 from datetime import datetime, timedelta
+import time
 from typing import Optional, Tuple
+from unittest.mock import MagicMock, patch
 
+import pytest
 from requests.auth import AuthBase
 
-from libdyson.cloud import DysonAccount
+from libdyson.cloud import DysonAccount, MapCache
 from libdyson.cloud.cloud_360_eye import CleaningType, DysonCloud360Eye
+from libdyson.exceptions import DysonNetworkError, DysonServerError
+from libdyson.scheduling import TokenBucket
 
 from . import AUTH_INFO
 from .mocked_requests import MockedRequests
@@ -98,3 +103,87 @@ def test_get_cleaning_map(mocked_requests: MockedRequests):
 
     # Non existed map
     assert device.get_cleaning_map("another_id") is None
+
+
+def test_iter_cleaning_history(mocked_requests: MockedRequests):
+    """Test streaming cleaning history from the cloud."""
+    entries = [
+        {
+            "Clean": f"cleaning-{day}",
+            "Started": f"2021-02-{day:02}T12:00:00",
+            "Finished": f"2021-02-{day:02}T13:00:00",
+            "Area": 10.5,
+            "Charges": 0,
+            "Type": "Scheduled",
+            "IsInterim": False,
+        }
+        for day in range(28, 0, -1)
+    ]
+    mocked_requests.register_handler(
+        "GET",
+        f"/v1/assets/devices/{SERIAL}/cleanhistory",
+        lambda **kwargs: (200, {"TriviaArea": 800.1243, "Entries": entries}),
+    )
+
+    account = DysonAccount(AUTH_INFO)
+    device = DysonCloud360Eye(account, SERIAL)
+    with patch("libdyson.cloud.cloud_360_eye.CHUNK_SIZE", 16):
+        tasks = device.iter_cleaning_history()
+        assert next(tasks).cleaning_id == "cleaning-28"
+        assert next(tasks).cleaning_id == "cleaning-27"
+        tasks.close()
+
+        tasks = list(device.iter_cleaning_history(since=datetime(2021, 2, 25)))
+    assert [task.cleaning_id for task in tasks] == [
+        "cleaning-28",
+        "cleaning-27",
+        "cleaning-26",
+        "cleaning-25",
+    ]
+
+    # The deadline is checked while the history is downloaded
+    deadline = time.monotonic() + 60
+    with patch("libdyson.cloud.cloud_360_eye.CHUNK_SIZE", 16):
+        tasks = device.iter_cleaning_history(deadline=deadline)
+        assert next(tasks).cleaning_id == "cleaning-28"
+        with patch(
+            "libdyson.cloud.cloud_360_eye.time.monotonic", return_value=deadline
+        ), pytest.raises(DysonNetworkError):
+            next(tasks)
+
+
+def test_prefetch_maps(mocked_requests: MockedRequests):
+    """Test downloading cleaning maps in parallel."""
+    for cleaning_id in ["1", "2", "3"]:
+        mocked_requests.register_handler(
+            "GET",
+            f"/v1/mapvisualizer/devices/{SERIAL}/map/{cleaning_id}",
+            lambda cleaning_id=cleaning_id, **kwargs: (200, cleaning_id.encode()),
+        )
+    mocked_requests.register_handler(
+        "GET",
+        f"/v1/mapvisualizer/devices/{SERIAL}/map/error",
+        lambda **kwargs: (500, None),
+    )
+
+    map_cache = MapCache()
+    map_cache.put(SERIAL, "cached", b"cached")
+    device = DysonCloud360Eye(DysonAccount(AUTH_INFO), SERIAL, map_cache)
+    rate_limiter = MagicMock(spec=TokenBucket)
+    results = dict(
+        device.prefetch_maps(
+            ["1", "2", "3", "missing", "error", "cached"],
+            concurrency=3,
+            rate_limiter=rate_limiter,
+        )
+    )
+    assert isinstance(results.pop("error"), DysonServerError)
+    assert results == {
+        "1": b"1",
+        "2": b"2",
+        "3": b"3",
+        "missing": None,
+        "cached": b"cached",
+    }
+    assert rate_limiter.acquire.call_count == 5
+    assert map_cache.get(SERIAL, "2") == (True, b"2")
@@ -0,0 +1,77 @@
+"""Tests for credential stores."""
+
+import os
+import pathlib
+from unittest.mock import MagicMock
+
+from cryptography.fernet import Fernet
+
+from libdyson.cloud import (
+    DysonAccount,
+    DysonDeviceInfo,
+    FileCredentialStore,
+    StoredDevice,
+)
+
+
+def _device_info(serial: str, credential: str) -> DysonDeviceInfo:
+    return DysonDeviceInfo(True, serial, "Name", "1.0", credential, True, False, "438")
+
+
+def test_file_credential_store(tmp_path: pathlib.Path):
+    """Test storing credentials in a file."""
+    path = str(tmp_path / "credentials.json")
+    store = FileCredentialStore(path)
+    assert store.load() == {}
+
+    devices = store.reconcile([_device_info("SERIAL1", "credential1")])
+    assert devices == {"SERIAL1": StoredDevice("SERIAL1", "credential1", "438")}
+    store.set_host("SERIAL1", "192.168.1.10")
+    store.set_host("UNKNOWN", "192.168.1.11")
+    assert FileCredentialStore(path).load() == {
+        "SERIAL1": StoredDevice("SERIAL1", "credential1", "438", "192.168.1.10")
+    }
+    assert os.stat(path).st_mode & 0o077 == 0
+
+    # Cloud changes replace the store but hosts are kept
+    devices = store.reconcile(
+        [_device_info("SERIAL1", "credential2"), _device_info("SERIAL2", "other")]
+    )
+    assert devices == {
+        "SERIAL1": StoredDevice("SERIAL1", "credential2", "438", "192.168.1.10"),
+        "SERIAL2": StoredDevice("SERIAL2", "other", "438"),
+    }
+    assert store.load() == devices
+    assert [name for name in os.listdir(tmp_path)] == ["credentials.json"]
+
+    # Unreadable file
+    with open(path, "w") as file:
+        file.write("{")
+    assert store.load() == {}
+
+
+def test_encryption(tmp_path: pathlib.Path):
+    """Test encrypting the store."""
+    path = str(tmp_path / "credentials")
+    key = Fernet.generate_key()
+    store = FileCredentialStore(path, key)
+    store.reconcile([_device_info("SERIAL1", "credential1")])
+    with open(path, "rb") as file:
+        assert b"credential1" not in file.read()
+    assert "SERIAL1" in FileCredentialStore(path, key).load()
+    assert FileCredentialStore(path, Fernet.generate_key()).load() == {}
+
+
+def test_refresh_in_background(tmp_path: pathlib.Path):
+    """Test refreshing the store from the cloud on a thread."""
+    account = MagicMock(spec=DysonAccount)
+    account.devices.return_value = [_device_info("SERIAL1", "credential1")]
+    store = FileCredentialStore(str(tmp_path / "credentials.json"))
+    devices = store.refresh_in_background(account).result(timeout=5)
+    assert list(devices) == ["SERIAL1"]
+    assert store.load() == devices
+
+    account.devices.side_effect = RuntimeError
+    assert isinstance(
+        store.refresh_in_background(account).exception(timeout=5), RuntimeError
+    )
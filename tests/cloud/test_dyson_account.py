@@ -1,12 +1,14 @@
 """Tests for DysonAccount."""
 
+import time
 from typing import Optional, Tuple
+from unittest.mock import patch
 
 import pytest
 import requests
 from requests.auth import AuthBase, HTTPBasicAuth
 
-from libdyson.cloud import DysonAccount
+from libdyson.cloud import DysonAccount, RetryPolicy
 from libdyson.cloud.account import (
     API_PATH_DEVICES,
     API_PATH_EMAIL_REQUEST,
@@ -14,12 +16,15 @@ from libdyson.cloud.account import (
     API_PATH_MOBILE_REQUEST,
     API_PATH_MOBILE_VERIFY,
     API_PATH_USER_STATUS,
+    DYSON_API_HOST,
     DYSON_API_HOST_CN,
     DysonAccountCN,
     HTTPBearerAuth,
 )
+from libdyson.cloud.retry import get_circuit_breaker
 from libdyson.exceptions import (
     DysonAuthRequired,
+    DysonCircuitOpen,
     DysonInvalidAccountStatus,
     DysonInvalidAuth,
     DysonLoginFailure,
@@ -373,3 +378,144 @@ def test_server_error(mocked_requests: MockedRequests):
     account = DysonAccount(AUTH_INFO)
     with pytest.raises(DysonServerError):
         account.devices()
+
+
+def test_session(mocked_requests: MockedRequests):
+    """Test requests share the account session."""
+
+    def _devices_handler(timeout, **kwargs) -> Tuple[int, list]:
+        assert timeout == 5
+        return (200, [])
+
+    mocked_requests.register_handler("GET", API_PATH_DEVICES, _devices_handler)
+
+    with patch.object(requests.Session, "close") as close:
+        with DysonAccount(AUTH_INFO, timeout=5) as account:
+            assert account.devices() == []
+        close.assert_called_once_with()
+
+        # A session given to the account is not closed with it
+        close.reset_mock()
+        session = requests.Session()
+        with DysonAccount(AUTH_INFO, session=session, timeout=5) as account:
+            assert account.devices() == []
+        close.assert_not_called()
+
+
+def test_timeout(mocked_requests: MockedRequests):
+    """Test per call timeouts and deadlines."""
+    timeouts = []
+
+    def _devices_handler(timeout, **kwargs) -> Tuple[int, list]:
+        timeouts.append(timeout)
+        return (200, [])
+
+    mocked_requests.register_handler("GET", API_PATH_DEVICES, _devices_handler)
+
+    account = DysonAccount(AUTH_INFO, timeout=(5, 20))
+    account.devices()
+    account.devices(timeout=3)
+    account.devices(deadline=time.monotonic() + 10)
+    assert timeouts[0] == (5, 20)
+    assert timeouts[1] == 3
+    assert timeouts[2][0] == 5
+    assert 9 < timeouts[2][1] <= 10
+
+    with pytest.raises(DysonNetworkError):
+        account.devices(deadline=time.monotonic() - 1)
+    assert len(timeouts) == 3
+
+
+def test_retry(mocked_requests: MockedRequests):
+    """Test retrying idempotent requests and the circuit breaker."""
+    responses = [(503, None, {"Retry-After": "2"}), (200, [])]
+
+    def _devices_handler(**kwargs):
+        return responses.pop(0)
+
+    def _handler_server_error(**kwargs):
+        return (500, None)
+
+    mocked_requests.register_handler("GET", API_PATH_DEVICES, _devices_handler)
+    mocked_requests.register_handler(
+        "POST", API_PATH_EMAIL_REQUEST, _handler_server_error
+    )
+
+    account = DysonAccount(AUTH_INFO, retry_policy=RetryPolicy(jitter=0))
+    with patch("libdyson.cloud.account.time.sleep") as sleep, patch(
+        "requests.Response.close", autospec=True
+    ) as close:
+        assert account.devices() == []
+        sleep.assert_called_once_with(2)
+        # The failed response is released before retrying
+        close.assert_called_once()
+        assert close.call_args[0][0].status_code == 503
+
+        # POST is not retried
+        with pytest.raises(DysonServerError):
+            account.login_email_otp(EMAIL, REGION)
+        sleep.assert_called_once()
+
+    # Circuit opens after 5 failures in a row, including the POST above
+    mocked_requests.register_handler("GET", API_PATH_DEVICES, _handler_server_error)
+    with patch.object(
+        mocked_requests, "request", wraps=mocked_requests.request
+    ) as request, patch("libdyson.cloud.account.requests.Session.request", request):
+        with pytest.raises(DysonServerError):
+            account.devices()
+        with pytest.raises(DysonCircuitOpen):
+            account.devices()
+        assert request.call_count == 4
+        with pytest.raises(DysonCircuitOpen):
+            account.devices()
+        assert request.call_count == 4
+
+    # A request failing before it is sent does not use up the trial request
+    breaker = get_circuit_breaker(DYSON_API_HOST)
+    breaker.reset_timeout = 0
+    with pytest.raises(DysonNetworkError):
+        account.devices(deadline=time.monotonic() - 1)
+    mocked_requests.register_handler(
+        "GET", API_PATH_DEVICES, lambda **kwargs: (200, [])
+    )
+    assert account.devices() == []
+    assert not breaker.is_open
+
+    # Other hosts are not affected
+    mocked_requests.host = DYSON_API_HOST_CN
+    mocked_requests.register_handler(
+        "GET", API_PATH_DEVICES, lambda **kwargs: (200, [])
+    )
+    assert DysonAccountCN(AUTH_INFO).devices() == []
+
+
+def test_manifest_cache(mocked_requests: MockedRequests):
+    """Test caching the device manifest."""
+    requests_headers = []
+
+    def _devices_handler(headers: dict, **kwargs):
+        requests_headers.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return (304, None)
+        return (200, DEVICES, {"ETag": '"v1"'})
+
+    mocked_requests.register_handler("GET", API_PATH_DEVICES, _devices_handler)
+
+    account = DysonAccount(AUTH_INFO, manifest_ttl=60)
+    with patch("libdyson.cloud.account.time.monotonic", return_value=0):
+        devices = account.devices()
+        assert account.devices() == devices
+        assert len(requests_headers) == 1
+        assert "If-None-Match" not in requests_headers[0]
+
+    # Expired, the server reports the manifest did not change
+    with patch("libdyson.cloud.account.time.monotonic", return_value=60):
+        assert account.devices() == devices
+        assert account.devices() == devices
+        assert len(requests_headers) == 2
+        assert requests_headers[1]["If-None-Match"] == '"v1"'
+
+        account.invalidate_devices()
+        assert account.devices() == devices
+        assert len(requests_headers) == 3
+        assert "If-None-Match" not in requests_headers[2]
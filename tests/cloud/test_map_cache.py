@@ -0,0 +1,93 @@
+"""Tests for the cleaning map cache."""
+
+import os
+import pathlib
+from unittest.mock import patch
+
+from libdyson.cloud import DysonAccount, MapCache
+from libdyson.cloud.cloud_360_eye import DysonCloud360Eye
+
+from . import AUTH_INFO
+from .mocked_requests import MockedRequests
+
+SERIAL = "JH1-US-HBB1111A"
+
+
+def test_memory():
+    """Test the in-memory tier."""
+    cache = MapCache(max_bytes=10)
+    assert cache.get(SERIAL, "1") == (False, None)
+    cache.put(SERIAL, "1", b"11111")
+    cache.put(SERIAL, "2", b"22222")
+    assert cache.get(SERIAL, "1") == (True, b"11111")
+    # Evicts the least recently used map
+    cache.put(SERIAL, "3", b"33333")
+    assert cache.get(SERIAL, "2") == (False, None)
+    assert cache.get(SERIAL, "1") == (True, b"11111")
+    assert cache.size == 10
+    # Too large to be held
+    cache.put(SERIAL, "4", b"4" * 11)
+    assert cache.get(SERIAL, "4") == (False, None)
+    assert cache.size == 10
+
+
+def test_negative():
+    """Test cleanings without map are remembered for a while."""
+    cache = MapCache(negative_ttl=60)
+    with patch("libdyson.cloud.map_cache.time.monotonic", return_value=0):
+        cache.put(SERIAL, "1", None)
+        assert cache.get(SERIAL, "1") == (True, None)
+    with patch("libdyson.cloud.map_cache.time.monotonic", return_value=60):
+        assert cache.get(SERIAL, "1") == (False, None)
+
+
+def test_disk(tmp_path: pathlib.Path):
+    """Test the on-disk tier."""
+    directory = str(tmp_path / "maps")
+    cache = MapCache(max_bytes=0, directory=directory, max_disk_bytes=10)
+    cache.put(SERIAL, "1", b"11111")
+    cache.put(SERIAL, "2", b"22222")
+    assert MapCache(directory=directory).get(SERIAL, "1") == (True, b"11111")
+    os.utime(cache._path((SERIAL, "1")), (0, 0))
+
+    # Evicts the oldest file
+    cache.put(SERIAL, "3", b"33333")
+    assert len(os.listdir(directory)) == 2
+    assert cache.get(SERIAL, "1") == (False, None)
+    assert cache.get(SERIAL, "2") == (True, b"22222")
+    assert cache.get(SERIAL, "3") == (True, b"33333")
+
+
+def test_disk_write_failure(tmp_path: pathlib.Path):
+    """Test failed writes do not leave files behind."""
+    directory = str(tmp_path / "maps")
+    cache = MapCache(max_bytes=0, directory=directory)
+    with patch("libdyson.cloud.map_cache.os.replace", side_effect=OSError):
+        cache.put(SERIAL, "1", b"11111")
+    assert os.listdir(directory) == []
+    assert cache.get(SERIAL, "1") == (False, None)
+
+
+def test_cloud_360_eye(mocked_requests: MockedRequests):
+    """Test cleaning maps are downloaded once."""
+    requests = []
+
+    def _map_handler(status: int, content: bytes):
+        def _handler(**kwargs):
+            requests.append(kwargs)
+            return (status, content)
+
+        return _handler
+
+    mocked_requests.register_handler(
+        "GET", f"/v1/mapvisualizer/devices/{SERIAL}/map/1", _map_handler(200, b"PNG")
+    )
+    mocked_requests.register_handler(
+        "GET", f"/v1/mapvisualizer/devices/{SERIAL}/map/2", _map_handler(404, None)
+    )
+    device = DysonCloud360Eye(DysonAccount(AUTH_INFO), SERIAL, MapCache())
+    assert device.get_cleaning_map("1") == b"PNG"
+    assert device.get_cleaning_map("1") == b"PNG"
+    assert device.get_cleaning_map("2") is None
+    assert device.get_cleaning_map("2") is None
+    assert len(requests) == 2
@@ -0,0 +1,46 @@
+"""Tests for retries and circuit breakers of cloud requests."""
+
+from unittest.mock import patch
+
+from libdyson.cloud.retry import CircuitBreaker, RetryPolicy
+
+
+def test_retry_policy():
+    """Test delays between attempts."""
+    policy = RetryPolicy(attempts=3, min_delay=1, max_delay=10, jitter=0)
+    assert policy.delay(0, None) == 1
+    assert policy.delay(1, 503) == 2
+    assert policy.delay(2, 503) is None  # No attempt left
+    assert policy.delay(0, 404) is None
+    assert policy.delay(0, 429, "5") == 5
+    assert policy.delay(0, 429, "60") is None  # Longer than max_delay
+    assert policy.delay(0, 429, "Wed, 21 Oct 2015 07:28:00 GMT") == 1  # Past
+    assert policy.delay(0, 429, "invalid") == 1
+
+
+def test_circuit_breaker():
+    """Test opening and closing the circuit."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    with patch("libdyson.cloud.retry.time.monotonic", return_value=0):
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.is_open
+        assert not breaker.allow()
+
+    with patch("libdyson.cloud.retry.time.monotonic", return_value=10):
+        # Only one trial request is let through
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert not breaker.allow()
+
+    with patch("libdyson.cloud.retry.time.monotonic", return_value=20):
+        # A trial request ending without outcome lets another one through
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.is_open
+        assert breaker.allow()
+        breaker.record_success()
+        assert not breaker.is_open
+        assert breaker.allow()
@@ -0,0 +1,59 @@
+"""Tests for cloud utilities."""
+
+import base64
+import json
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+import pytest
+
+from libdyson.cloud.utils import (
+    DYSON_ENCRYPTION_INIT_VECTOR,
+    DYSON_ENCRYPTION_KEY,
+    decrypt_password,
+    decrypt_passwords,
+    iter_json_array,
+)
+
+from .utils import encrypt_credential
+
+
+def test_decrypt_passwords():
+    """Test decrypting credentials."""
+    encrypted = [
+        encrypt_credential(f"SERIAL-{index}", "x" * index) for index in range(40)
+    ]
+    assert decrypt_passwords(encrypted) == ["x" * index for index in range(40)]
+    assert decrypt_password(encrypted[3]) == "xxx"
+    assert decrypt_passwords([]) == []
+
+
+def test_invalid_padding():
+    """Test badly padded credentials are rejected."""
+    encryptor = Cipher(
+        algorithms.AES(DYSON_ENCRYPTION_KEY),
+        modes.CBC(DYSON_ENCRYPTION_INIT_VECTOR),
+    ).encryptor()
+    data = b'{"apPasswordHash": "password"}\x01\x02'
+    encrypted = encryptor.update(data) + encryptor.finalize()
+    with pytest.raises(ValueError):
+        decrypt_password(base64.b64encode(encrypted).decode())
+    with pytest.raises(ValueError):
+        decrypt_passwords(["not base64"])
+
+
+def test_iter_json_array():
+    """Test decoding array items from chunks."""
+    items = [{"id": index, "name": "é" * index, "value": -1.5e3} for index in range(10)]
+    document = json.dumps(
+        {"Message": "Entries [1]", "Total": 800.125, "Entries": items, "Last": 1},
+        ensure_ascii=False,
+    ).encode()
+    for size in range(1, 20):
+        chunks = [document[i : i + size] for i in range(0, len(document), size)]
+        assert list(iter_json_array(chunks, "Entries")) == items
+
+    assert list(iter_json_array([b'{"Total": 10}'], "Entries")) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'{"Entries": [1, '], "Entries"))
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'["Entries"]'], "Entries"))
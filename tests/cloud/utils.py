@@ -15,10 +15,8 @@ def encrypt_credential(serial: str, credential: str) -> str:
         "apPasswordHash": credential,
     }
     data = json.dumps(data)
-    padded_length = (len(data) + 15) // 16 * 16
-    if padded_length > len(data):
-        n_pad = padded_length - len(data)
-        data += chr(n_pad) * n_pad
+    n_pad = 16 - len(data) % 16
+    data += chr(n_pad) * n_pad
     data = data.encode("utf-8")
     cipher = Cipher(
         algorithms.AES(DYSON_ENCRYPTION_KEY),
@@ -38,7 +38,9 @@ class MockedMQTT:
 
         self.on_connect = None
         self.on_disconnect = None
+        self.on_connect_fail = None
         self.on_message = None
+        self.reconnect_delay = None
 
         self._subscribed = False
         self.connected = False
@@ -71,6 +73,24 @@ class MockedMQTT:
         self.connected = False
         self.on_disconnect(self, None, 0)
 
+    def reconnect_delay_set(self, min_delay: float, max_delay: float) -> None:
+        """Set the delay before reconnecting."""
+        self.reconnect_delay = (min_delay, max_delay)
+
+    def lose_connection(self) -> None:
+        """Drop the connection without a request."""
+        self.connected = False
+        self._subscribed = False
+        self.on_disconnect(self, None, 7)
+
+    def reconnect(self, fail: bool = False) -> None:
+        """Reconnect after the connection is lost."""
+        if fail:
+            self.on_connect_fail(self, None)
+            return
+        self.connected = True
+        self.on_connect(self, None, None, 0)
+
     def loop_start(self) -> None:
         """Start loop."""
         self.loop_started = True
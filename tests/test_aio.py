@@ -0,0 +1,281 @@
+"""Tests for the asyncio interface."""
+
+import asyncio
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from libdyson.aio import (
+    AsyncDysonFanDevice,
+    AsyncDysonVacuumDevice,
+    _AsyncioNetwork,
+    get_async_device,
+)
+from libdyson.const import DEVICE_TYPE_360_EYE, DEVICE_TYPE_PURE_COOL, MessageType
+from libdyson.dyson_pure_cool import DysonPureCool
+from libdyson.exceptions import (
+    DysonConnectTimeout,
+    DysonInvalidCredential,
+    DysonNotConnected,
+)
+from libdyson.reconnect import ReconnectPolicy
+
+from . import CREDENTIAL, HOST, SERIAL
+from .mocked_mqtt import MockedMQTT
+from .test_connection_manager import _FakeClient
+from .test_pure_cool import ENVIRONMENTAL_DATA, STATUS  # noqa: F401
+
+DEVICE_TYPE = DEVICE_TYPE_PURE_COOL
+
+
+class _MockedNetwork:
+    """Network connecting the mocked client synchronously."""
+
+    def __init__(self):
+        """Initialize the network."""
+        self.registered = []
+
+    def __call__(self, loop, reconnect_policy):
+        """Return self as the network of the event loop."""
+        return self
+
+    def register(self, client, host: str) -> None:
+        """Register a client."""
+        self.registered.append(client)
+        client.connect_async(host)
+
+    def unregister(self, client) -> None:
+        """Unregister a client."""
+        self.registered.remove(client)
+
+
+@pytest.fixture()
+def network() -> _MockedNetwork:
+    """Return mocked asyncio network."""
+    network = _MockedNetwork()
+    with patch("libdyson.aio._AsyncioNetwork", network), patch(
+        "libdyson.aio.TIMEOUT", 0.1
+    ):
+        yield network
+
+
+def test_get_async_device():
+    """Test getting async devices."""
+    device = get_async_device(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    assert isinstance(device, AsyncDysonFanDevice)
+    assert isinstance(device.device, DysonPureCool)
+    device = get_async_device(SERIAL, CREDENTIAL, DEVICE_TYPE_360_EYE)
+    assert isinstance(device, AsyncDysonVacuumDevice)
+    assert get_async_device(SERIAL, CREDENTIAL, "unknown") is None
+
+
+def test_connect(mqtt_client: MockedMQTT, network: _MockedNetwork):
+    """Test connecting, sending commands and disconnecting."""
+
+    async def _test():
+        device = get_async_device(SERIAL, CREDENTIAL, DEVICE_TYPE)
+        await device.connect(HOST)
+        assert device.is_connected is True
+        assert device.hepa_filter_life == 100
+        assert network.registered == [mqtt_client]
+
+        with patch("libdyson.dyson_device.TIMEOUT", 5):
+            command = asyncio.ensure_future(device.set_speed(3))
+            await asyncio.sleep(0)
+        assert mqtt_client.commands[0]["data"] == {"fpwr": "ON", "fnsp": "0003"}
+        assert not command.done()
+        mqtt_client.state_change(
+            {"product-state": {"fpwr": ["OFF", "ON"], "fnsp": ["AUTO", "0003"]}}
+        )
+        status = await asyncio.wait_for(command, 5)
+        assert status.speed == 3
+
+        await device.disconnect()
+        assert device.is_connected is False
+        assert mqtt_client.connected is False
+        assert network.registered == []
+
+    asyncio.run(_test())
+
+
+def test_disconnect_cleanup(mqtt_client: MockedMQTT, network: _MockedNetwork):
+    """Test disconnecting with pending changes and commands."""
+
+    async def _test():
+        device = get_async_device(SERIAL, CREDENTIAL, DEVICE_TYPE)
+        device.device.coalesce_window = 10
+        await device.connect(HOST)
+        with patch("libdyson.dyson_device.TIMEOUT", 5):
+            command = asyncio.ensure_future(device.enable_night_mode())
+            await asyncio.sleep(0)
+        assert len(mqtt_client.commands) == 0
+
+        # Changes of the coalescing window are sent and commands fail
+        await device.disconnect()
+        assert mqtt_client.commands[0]["data"] == {"nmod": "ON"}
+        with pytest.raises(DysonNotConnected):
+            await asyncio.wait_for(command, 5)
+
+    asyncio.run(_test())
+
+
+def test_updates(mqtt_client: MockedMQTT, network: _MockedNetwork):
+    """Test iterating over updates."""
+
+    async def _test():
+        device = get_async_device(SERIAL, CREDENTIAL, DEVICE_TYPE)
+        await device.connect(HOST)
+        updates = device.updates()
+        next_update = asyncio.ensure_future(updates.__anext__())
+        await asyncio.sleep(0)
+        await device.request_environmental_data()
+        assert await next_update == MessageType.ENVIRONMENTAL
+        await updates.aclose()
+        await device.disconnect()
+
+    asyncio.run(_test())
+
+
+def test_invalid_credential(mqtt_client: MockedMQTT, network: _MockedNetwork):
+    """Test invalid credential."""
+
+    async def _test():
+        device = get_async_device(SERIAL, "invalid", DEVICE_TYPE)
+        with pytest.raises(DysonInvalidCredential):
+            await device.connect(HOST)
+        assert device.is_connected is False
+        assert network.registered == []
+
+    asyncio.run(_test())
+
+
+def test_connect_timeout(mqtt_client: MockedMQTT, network: _MockedNetwork):
+    """Test connection timed out."""
+
+    async def _test():
+        device = get_async_device(SERIAL, CREDENTIAL, DEVICE_TYPE)
+        with pytest.raises(DysonConnectTimeout):
+            await device.connect("192.168.1.5")
+        assert device.is_connected is False
+
+    asyncio.run(_test())
+
+
+def test_connect_environmental_timeout(
+    mqtt_client: MockedMQTT, network: _MockedNetwork
+):
+    """Test environmental data timed out during connection."""
+    original_publish = mqtt_client.publish
+
+    def _publish(topic: str, payload: str, qos: int = 0) -> None:
+        if (
+            json.loads(payload)["msg"]
+            == "REQUEST-PRODUCT-ENVIRONMENT-CURRENT-SENSOR-DATA"
+        ):
+            return
+        original_publish(topic, payload, qos)
+
+    mqtt_client.publish = _publish
+
+    async def _test():
+        device = get_async_device(SERIAL, CREDENTIAL, DEVICE_TYPE)
+        with pytest.raises(DysonConnectTimeout):
+            await device.connect(HOST)
+        assert device.is_connected is False
+        assert mqtt_client.connected is False
+
+        # Both waits share the deadline of timeout
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with pytest.raises(DysonConnectTimeout):
+            await device.connect(HOST, timeout=0.3)
+        assert 0.25 < loop.time() - start < 0.6
+
+    asyncio.run(_test())
+
+
+def test_asyncio_network():
+    """Test serving network I/O on the event loop."""
+
+    async def _test():
+        network = _AsyncioNetwork(asyncio.get_running_loop(), ReconnectPolicy())
+        client = _FakeClient()
+        network.register(client, HOST)
+        for _ in range(100):
+            if client.peer is not None:
+                break
+            await asyncio.sleep(0.01)
+        client.peer.setblocking(False)
+        loop = asyncio.get_running_loop()
+        assert await loop.sock_recv(client.peer, 1024) == b"CONNECT"
+
+        await loop.sock_sendall(client.peer, b"PUBLISH")
+        for _ in range(100):
+            if client.received.is_set():
+                break
+            await asyncio.sleep(0.01)
+        assert client.received.is_set()
+
+        network.unregister(client)
+        client.disconnect()
+        await asyncio.sleep(0)
+        assert network._clients == {}
+
+    asyncio.run(_test())
+
+
+def test_asyncio_network_unregister():
+    """Test unregistering clients waiting to reconnect or connecting."""
+
+    async def _test():
+        network = _AsyncioNetwork(
+            asyncio.get_running_loop(), ReconnectPolicy(min_delay=0.05, jitter=0)
+        )
+
+        # Waiting for the next attempt
+        client = _FakeClient(refuse=True)
+        attempts = []
+        refused = client.reconnect
+
+        def _refused():
+            attempts.append(None)
+            refused()
+
+        client.reconnect = _refused
+        network.register(client, HOST)
+        for _ in range(100):
+            if client in network._reconnect_handles:
+                break
+            await asyncio.sleep(0.01)
+        network.unregister(client)
+        assert network._clients == {}
+        await asyncio.sleep(0.2)
+        assert len(attempts) == 1
+
+        # Connection being opened
+        client = _FakeClient()
+        opening = threading.Event()
+        proceed = threading.Event()
+        connect = client.reconnect
+
+        def _reconnect():
+            opening.set()
+            proceed.wait(timeout=5)
+            connect()
+
+        client.reconnect = _reconnect
+        network.register(client, HOST)
+        await asyncio.get_running_loop().run_in_executor(None, opening.wait, 5)
+        network.unregister(client)
+        proceed.set()
+        for _ in range(100):
+            if client.closed.is_set():
+                break
+            await asyncio.sleep(0.01)
+        assert client.closed.is_set()
+        await asyncio.sleep(0)
+        assert network._clients == {}
+
+    asyncio.run(_test())
@@ -0,0 +1,185 @@
+"""Tests for DysonConnectionManager."""
+
+import socket
+import threading
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+
+from libdyson.connection_manager import DysonConnectionManager
+from libdyson.reconnect import ReconnectPolicy
+
+from . import HOST
+
+
+class _FakeClient:
+    """Minimal paho client driven through the external loop API."""
+
+    def __init__(self, refuse: bool = False):
+        """Initialize the client."""
+        self.on_socket_open = None
+        self.on_socket_close = None
+        self.on_socket_register_write = None
+        self.on_socket_unregister_write = None
+        self.host = None
+        self.peer: Optional[socket.socket] = None
+        self.received = threading.Event()
+        self.closed = threading.Event()
+        self.misc_called = threading.Event()
+        self._refuse = refuse
+        self._sock = None
+        self._out = b""
+
+    def connect_async(self, host: str) -> None:
+        """Store the host."""
+        self.host = host
+
+    def reconnect(self) -> None:
+        """Open the connection."""
+        if self._refuse:
+            raise ConnectionRefusedError
+        self._sock, self.peer = socket.socketpair()
+        self._sock.setblocking(False)
+        self.on_socket_open(self, None, self._sock)
+        self.publish(b"CONNECT")
+
+    def socket(self):
+        """Return the socket."""
+        return self._sock
+
+    def want_write(self) -> bool:
+        """Return if there is data to write."""
+        return len(self._out) > 0
+
+    def publish(self, data: bytes) -> None:
+        """Queue data to write."""
+        self._out += data
+        self.on_socket_register_write(self, None, self._sock)
+
+    def loop_read(self) -> None:
+        """Read from the socket."""
+        if self._sock.recv(1024):
+            self.received.set()
+        else:
+            self._close()
+
+    def loop_write(self) -> None:
+        """Write to the socket."""
+        sent = self._sock.send(self._out)
+        self._out = self._out[sent:]
+        if not self._out:
+            self.on_socket_unregister_write(self, None, self._sock)
+
+    def loop_misc(self) -> None:
+        """Run periodic tasks."""
+        self.misc_called.set()
+
+    def disconnect(self) -> None:
+        """Close the connection."""
+        if self._sock is not None:
+            self._close()
+
+    def _close(self) -> None:
+        sock = self._sock
+        self._sock = None
+        self.on_socket_close(self, None, sock)
+        sock.close()
+        self.closed.set()
+
+
+RECONNECT_POLICY = ReconnectPolicy(min_delay=0.1)
+
+
+@pytest.fixture(autouse=True)
+def short_intervals():
+    """Shorten loop intervals to speed up tests."""
+    with patch("libdyson.connection_manager.MISC_INTERVAL", 0.1):
+        yield
+
+
+def _wait_for_peer(client: _FakeClient) -> socket.socket:
+    for _ in range(100):
+        if client.peer is not None:
+            return client.peer
+        threading.Event().wait(0.05)
+    raise AssertionError("Client never connected")
+
+
+def test_shared_loop():
+    """Test serving many clients on a single thread."""
+    manager = DysonConnectionManager(reconnect_policy=RECONNECT_POLICY)
+    manager.start()
+    threads_before = threading.active_count()
+    clients = [_FakeClient() for _ in range(50)]
+    for client in clients:
+        manager.register(client, HOST)
+    assert manager.client_count == 50
+
+    for client in clients:
+        peer = _wait_for_peer(client)
+        peer.settimeout(5)
+        assert peer.recv(1024) == b"CONNECT"
+        assert client.host == HOST
+
+    for client in clients:
+        client.peer.send(b"PUBLISH")
+    for client in clients:
+        assert client.received.wait(timeout=5)
+    assert clients[0].misc_called.wait(timeout=5)
+
+    # Only the shared loop and the connect workers
+    assert threading.active_count() - threads_before <= 4
+
+    for client in clients:
+        manager.unregister(client)
+        client.disconnect()
+        assert client.closed.wait(timeout=5)
+    assert manager.client_count == 0
+    manager.stop()
+
+
+def test_remote_close():
+    """Test reconnecting after the remote end closes the connection."""
+    manager = DysonConnectionManager(loops=2, reconnect_policy=RECONNECT_POLICY)
+    manager.start()
+    client = _FakeClient()
+    manager.register(client, HOST)
+    peer = _wait_for_peer(client)
+    client.peer = None
+    peer.close()
+    assert client.closed.wait(timeout=5)
+    new_peer = _wait_for_peer(client)
+    assert new_peer is not peer
+    manager.unregister(client)
+    client.disconnect()
+    manager.stop()
+
+
+def test_connection_refused():
+    """Test unregistering a client that never connected."""
+    manager = DysonConnectionManager(reconnect_policy=RECONNECT_POLICY)
+    manager.start()
+    client = _FakeClient(refuse=True)
+    manager.register(client, HOST)
+    manager.unregister(client)
+    assert manager.client_count == 0
+    manager.stop()
+
+
+def test_lazy_start():
+    """Test starting the loops with the first client."""
+    manager = DysonConnectionManager(reconnect_policy=RECONNECT_POLICY)
+    client = _FakeClient()
+    manager.register(client, HOST)
+    _wait_for_peer(client)
+    manager.unregister(client)
+    client.disconnect()
+    manager.stop()
+    threads = [thread.name for thread in threading.enumerate()]
+    assert not any(name.startswith("libdyson-connect_") for name in threads)
+    assert not any(name.startswith("libdyson-mqtt") for name in threads)
+
+    # A stopped manager cannot be used again
+    with pytest.raises(RuntimeError):
+        manager.register(_FakeClient(), HOST)
@@ -0,0 +1,40 @@
+"""Tests for payload decoders."""
+
+import json
+
+import pytest
+
+from libdyson.decoder import DECODERS, changed_state, get_decoder, normalize_state
+
+
+def test_get_decoder():
+    """Test getting decoders."""
+    assert get_decoder("json") is json.loads
+    assert get_decoder() in DECODERS.values()
+    with pytest.raises(ValueError):
+        get_decoder("unknown")
+
+
+@pytest.mark.parametrize("name", list(DECODERS))
+def test_decode(name: str):
+    """Test decoding bytes payload."""
+    decoder = get_decoder(name)
+    assert decoder(b'{"msg": "STATE-CHANGE", "fnsp": ["0001", "0002"]}') == {
+        "msg": "STATE-CHANGE",
+        "fnsp": ["0001", "0002"],
+    }
+
+
+def test_normalize_state():
+    """Test collapsing [old, new] pairs."""
+    assert normalize_state({"fnsp": ["0001", "0002"], "fnst": "FAN"}) == {
+        "fnsp": "0002",
+        "fnst": "FAN",
+    }
+
+
+def test_changed_state():
+    """Test dropping unchanged fields."""
+    assert changed_state(
+        {"fnsp": ["0001", "0002"], "fnst": ["FAN", "FAN"], "ercd": "NONE"}
+    ) == {"fnsp": "0002", "ercd": "NONE"}
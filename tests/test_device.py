@@ -11,6 +11,7 @@ from libdyson.exceptions import (
     DysonInvalidCredential,
     DysonNotConnected,
 )
+from libdyson.reconnect import ReconnectPolicy
 
 from . import CREDENTIAL, HOST, SERIAL
 from .mocked_mqtt import MockedMQTT
@@ -70,12 +71,31 @@ def test_properties():
 def test_connect(mqtt_client: MockedMQTT):
     """Test successful connection."""
     device = _TestDevice(SERIAL, CREDENTIAL)
+    assert device.is_data_available is False
     device.connect(HOST)
     assert device.is_connected is True
+    assert device.is_data_available is True
     assert mqtt_client.connected is True
     assert mqtt_client.loop_started is True
 
 
+def test_connect_with_connection_manager(mqtt_client: MockedMQTT):
+    """Test connection served by a connection manager."""
+    manager = MagicMock()
+    manager.register.side_effect = lambda client, host: client.connect_async(host)
+    device = _TestDevice(SERIAL, CREDENTIAL)
+    device.connect(HOST, connection_manager=manager)
+    assert device.is_connected is True
+    assert mqtt_client.connected is True
+    assert mqtt_client.loop_started is False
+    manager.register.assert_called_once_with(mqtt_client, HOST)
+
+    device.disconnect()
+    assert device.is_connected is False
+    assert mqtt_client.connected is False
+    manager.unregister.assert_called_once_with(mqtt_client)
+
+
 def test_invalid_credential(mqtt_client: MockedMQTT):
     """Test invalid credential."""
     device = _TestDevice(SERIAL, "invalid")
@@ -184,3 +204,50 @@ def test_status_update(mqtt_client: MockedMQTT):
     device.remove_message_listener(callback)
     mqtt_client.state_change(new_status)
     callback.assert_not_called()
+
+
+def test_reconnect(mqtt_client: MockedMQTT):
+    """Test reconnecting after the connection is lost."""
+    device = _TestDevice(SERIAL, CREDENTIAL)
+    device.reconnect_policy = ReconnectPolicy(min_delay=2, max_delay=5, jitter=0)
+    device.connect(HOST)
+    callback = MagicMock()
+    device.add_message_listener(callback)
+
+    mqtt_client.lose_connection()
+    assert device.is_connected is False
+    assert mqtt_client.reconnect_delay == (2, 2)
+    callback.assert_called_once_with(MessageType.STATE)
+    callback.reset_mock()
+
+    mqtt_client.reconnect(fail=True)
+    assert mqtt_client.reconnect_delay == (4, 4)
+    mqtt_client.reconnect(fail=True)
+    assert mqtt_client.reconnect_delay == (5, 5)
+    assert device.failed_reconnect_count == 2
+
+    # State is requested again after reconnecting
+    mqtt_client._status = {"key1": "V3"}
+    mqtt_client.reconnect()
+    assert device.is_connected is True
+    assert device.reconnect_count == 1
+    assert device._status == {"key1": "V3"}
+    assert callback.call_count == 2
+
+    # Backoff starts over
+    mqtt_client.lose_connection()
+    assert mqtt_client.reconnect_delay == (2, 2)
+
+    # No reconnection after disconnecting
+    mqtt_client.reconnect()
+    mqtt_client.reconnect_delay = None
+    device.disconnect()
+    assert mqtt_client.reconnect_delay is None
+
+
+def test_reconnect_policy():
+    """Test jittered backoff."""
+    policy = ReconnectPolicy(min_delay=1, max_delay=10, jitter=0.5)
+    for failures, delay in [(0, 1), (1, 2), (3, 8), (4, 10), (100, 10)]:
+        for _ in range(10):
+            assert delay / 2 <= policy.delay(failures) <= delay
@@ -0,0 +1,102 @@
+"""Tests for listener dispatchers."""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from libdyson.dispatch import (
+    DROP_NEWEST,
+    DROP_OLDEST,
+    AsyncioDispatcher,
+    InlineDispatcher,
+    ThreadDispatcher,
+)
+
+
+def _block(dispatcher: ThreadDispatcher) -> threading.Event:
+    """Block the worker with a slow call until the returned event is set."""
+    blocked = threading.Event()
+    release = threading.Event()
+
+    def _slow():
+        blocked.set()
+        release.wait(timeout=5)
+
+    dispatcher.dispatch("slow", _slow, ())
+    assert blocked.wait(timeout=5)
+    return release
+
+
+def _union(pending: tuple, new: tuple) -> tuple:
+    return (pending[0] | new[0],)
+
+
+def test_inline_dispatcher():
+    """Test running callbacks inline."""
+    callback = MagicMock()
+    InlineDispatcher().dispatch("key", callback, (1, 2))
+    callback.assert_called_once_with(1, 2)
+
+
+def test_thread_dispatcher_merge():
+    """Test merging pending calls of a slow listener."""
+    dispatcher = ThreadDispatcher()
+    calls = []
+    release = _block(dispatcher)
+    for value in range(5):
+        dispatcher.dispatch("key", calls.append, (value,))
+    dispatcher.dispatch("merged", calls.append, ({1},), _union)
+    dispatcher.dispatch("merged", calls.append, ({2},), _union)
+    release.set()
+    dispatcher.close()
+    assert calls == [4, {1, 2}]
+    assert dispatcher.dropped == 0
+
+
+@pytest.mark.parametrize(
+    "overflow,expected", [(DROP_OLDEST, [2, 3]), (DROP_NEWEST, [0, 1])]
+)
+def test_thread_dispatcher_overflow(overflow: str, expected: list):
+    """Test dropping calls when the queue is full."""
+    dispatcher = ThreadDispatcher(max_queue_size=2, overflow=overflow, merge=False)
+    calls = []
+    release = _block(dispatcher)
+    for value in range(4):
+        dispatcher.dispatch("key", calls.append, (value,))
+    release.set()
+    dispatcher.close()
+    assert calls == expected
+    assert dispatcher.dropped == 2
+
+
+def test_invalid_overflow():
+    """Test unknown overflow policy."""
+    with pytest.raises(ValueError):
+        ThreadDispatcher(overflow="unknown")
+
+
+def test_asyncio_dispatcher():
+    """Test running callbacks on an event loop."""
+
+    async def _test():
+        loop = asyncio.get_running_loop()
+        dispatcher = AsyncioDispatcher(loop)
+        calls = []
+
+        def _callback(value):
+            assert asyncio.get_running_loop() is loop
+            calls.append(value)
+
+        def _dispatch():
+            for value in range(3):
+                dispatcher.dispatch("key", _callback, (value,))
+
+        thread = threading.Thread(target=_dispatch)
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0)
+        assert calls == [2]
+
+    asyncio.run(_test())
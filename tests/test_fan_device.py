@@ -1,8 +1,10 @@
 """Tests for DysonFanDevice."""
 
 import json
+import threading
+import time
 from typing import Optional
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -11,8 +13,13 @@ from libdyson.const import (
     ENVIRONMENTAL_OFF,
     MessageType,
 )
+from libdyson.dispatch import ThreadDispatcher
 from libdyson.dyson_device import DysonFanDevice
-from libdyson.exceptions import DysonConnectTimeout, DysonNotConnected
+from libdyson.exceptions import (
+    DysonCommandTimeout,
+    DysonConnectTimeout,
+    DysonNotConnected,
+)
 
 from . import CREDENTIAL, HOST, SERIAL
 from .mocked_mqtt import MockedMQTT
@@ -94,6 +101,7 @@ def test_properties(mqtt_client: MockedMQTT):
         }
     }
     device.request_environmental_data()
+    assert device.environmental_data_age < 1
     assert device.humidity == 30
     assert device.temperature == 290.3
     assert device.sleep_timer == 3
@@ -212,3 +220,245 @@ def test_environmental_callback(mqtt_client: MockedMQTT):
     device.request_environmental_data()
     callback.assert_called_once_with(MessageType.ENVIRONMENTAL)
     callback.reset_mock()
+
+
+def test_connect_without_waiting_for_data(mqtt_client: MockedMQTT):
+    """Test connecting without waiting for the first data."""
+    original_publish = mqtt_client.publish
+
+    def _publish(topic: str, payload: str, qos: int = 0) -> None:
+        if (
+            json.loads(payload)["msg"]
+            == "REQUEST-PRODUCT-ENVIRONMENT-CURRENT-SENSOR-DATA"
+        ):
+            return  # Environmental data arrives later
+        original_publish(topic, payload, qos)
+
+    mqtt_client.publish = _publish
+
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.connect(HOST, wait_for_data=False)
+    assert device.is_connected is True
+    assert device.is_data_available is False
+    assert device.speed == 1
+
+    mqtt_client.publish = original_publish
+    device.request_environmental_data()
+    assert device.is_data_available is True
+    assert device.humidity == ENVIRONMENTAL_OFF
+
+
+def test_payload_decoder(mqtt_client: MockedMQTT):
+    """Test replacing the payload decoder."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.payload_decoder = MagicMock(side_effect=json.loads)
+    device.connect(HOST)
+    assert device.payload_decoder.call_count == 2
+    assert isinstance(device.payload_decoder.call_args[0][0], bytes)
+    assert device.speed == 1
+
+
+def test_snapshot(mqtt_client: MockedMQTT):
+    """Test snapshots are not affected by later messages."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.connect(HOST)
+    snapshot = device.snapshot()
+    assert snapshot.status.speed == 1
+    assert snapshot.environmental_data.humidity == ENVIRONMENTAL_OFF
+
+    mqtt_client.state_change({"product-state": {"fnsp": ["0001", "0005"]}})
+    assert device.speed == 5
+    assert snapshot.status.speed == 1
+    new_snapshot = device.snapshot()
+    assert new_snapshot.status.speed == 5
+    assert new_snapshot.environmental_data is snapshot.environmental_data
+
+
+def test_change_listener(mqtt_client: MockedMQTT):
+    """Test field level change notifications."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    callback = MagicMock()
+    speed_callback = MagicMock()
+    device.add_change_listener(callback)
+    device.add_change_listener(speed_callback, ["fnsp"])
+    device.connect(HOST)
+    callback.assert_any_call(
+        MessageType.STATE, frozenset(["fnst", "fnsp", "rhtm", "ercd", "nmod", "wacd"])
+    )
+    callback.assert_any_call(
+        MessageType.ENVIRONMENTAL, frozenset(["tact", "hact", "sltm"])
+    )
+    speed_callback.assert_called_once_with(MessageType.STATE, frozenset(["fnsp"]))
+    callback.reset_mock()
+    speed_callback.reset_mock()
+
+    mqtt_client.state_change(
+        {"product-state": {"fnsp": ["0001", "0001"], "nmod": ["OFF", "ON"]}}
+    )
+    callback.assert_called_once_with(MessageType.STATE, frozenset(["nmod"]))
+    speed_callback.assert_not_called()
+    callback.reset_mock()
+
+    # Nothing changed
+    device.request_environmental_data()
+    callback.assert_not_called()
+
+    device.remove_change_listener(callback)
+    mqtt_client.state_change({"product-state": {"fnsp": ["0001", "0002"]}})
+    callback.assert_not_called()
+    speed_callback.assert_called_once_with(MessageType.STATE, frozenset(["fnsp"]))
+
+
+def test_batch(mqtt_client: MockedMQTT):
+    """Test merging configuration changes in a batch."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.connect(HOST)
+    with device.batch():
+        device.enable_night_mode()
+        with device.batch():
+            device.set_sleep_timer(15)
+        device.disable_sleep_timer()
+        assert len(mqtt_client.commands) == 0
+    assert len(mqtt_client.commands) == 1
+    assert mqtt_client.commands[0]["data"] == {"nmod": "ON", "sltm": "OFF"}
+
+
+def test_coalesce_window(mqtt_client: MockedMQTT):
+    """Test coalescing configuration changes in a time window."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.coalesce_window = 0.05
+    device.connect(HOST)
+    device.enable_night_mode()
+    device.set_sleep_timer(15)
+    assert len(mqtt_client.commands) == 0
+    # The window is closed by the shared scheduler, not a thread per device
+    assert not any(isinstance(t, threading.Timer) for t in threading.enumerate())
+    for _ in range(100):
+        if mqtt_client.commands:
+            break
+        time.sleep(0.01)
+    assert len(mqtt_client.commands) == 1
+    assert mqtt_client.commands[0]["data"] == {"nmod": "ON", "sltm": "0015"}
+
+    # Pending changes are sent before disconnecting
+    device.reset_filter()
+    device.disconnect()
+    assert len(mqtt_client.commands) == 2
+    assert mqtt_client.commands[1]["data"] == {"rstf": "RSTF"}
+
+
+def test_dispatcher(mqtt_client: MockedMQTT):
+    """Test running listeners on a dispatcher."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.dispatcher = ThreadDispatcher()
+    threads = set()
+    changes = []
+
+    def _on_message(message_type: MessageType) -> None:
+        threads.add(threading.current_thread())
+
+    def _on_change(message_type: MessageType, fields: frozenset) -> None:
+        changes.append(fields)
+
+    device.add_message_listener(_on_message)
+    device.add_change_listener(_on_change, ["nmod"])
+    device.connect(HOST)
+    mqtt_client.state_change({"product-state": {"nmod": ["OFF", "ON"]}})
+    device.dispatcher.close()
+    assert len(threads) == 1
+    assert threading.current_thread() not in threads
+    # Depending on timing, the two changes may be merged
+    assert changes in ([frozenset(["nmod"])] * 2, [frozenset(["nmod"])])
+
+
+def test_command_acknowledgement(mqtt_client: MockedMQTT):
+    """Test commands resolved by the matching state change."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.connect(HOST)
+    with patch("libdyson.dyson_device.TIMEOUT", 5):
+        future = device.enable_night_mode()
+        assert not future.done()
+        mqtt_client.state_change({"product-state": {"fnsp": ["0001", "0002"]}})
+        assert not future.done()
+        mqtt_client.state_change({"product-state": {"nmod": ["OFF", "ON"]}})
+        assert future.result(timeout=0).night_mode is True
+
+        future = device.disable_night_mode()
+        device.disconnect()
+        with pytest.raises(DysonNotConnected):
+            future.result(timeout=0)
+
+
+def test_command_timeout(mqtt_client: MockedMQTT):
+    """Test commands not acknowledged in time."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.connect(HOST)
+    with patch("libdyson.dyson_device.TIMEOUT", 0.01):
+        future = device.enable_night_mode()
+    with pytest.raises(DysonCommandTimeout):
+        future.result(timeout=5)
+
+
+def test_command_cancelled(mqtt_client: MockedMQTT):
+    """Test commands cancelled by the caller."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.connect(HOST)
+    with patch("libdyson.dyson_device.TIMEOUT", 0.01):
+        device.enable_night_mode().cancel()
+        device.set_sleep_timer(15).cancel()
+    mqtt_client.state_change({"product-state": {"sltm": ["OFF", "0015"]}})
+    time.sleep(0.05)
+
+    # Timeouts still run after the cancelled ones expired
+    with patch("libdyson.dyson_device.TIMEOUT", 0.01):
+        future = device.disable_night_mode()
+    with pytest.raises(DysonCommandTimeout):
+        future.result(timeout=5)
+
+
+def test_optimistic(mqtt_client: MockedMQTT):
+    """Test applying configuration before the device reports it."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.optimistic = True
+    device.connect(HOST)
+    callback = MagicMock()
+    device.add_change_listener(callback)
+    with patch("libdyson.dyson_device.TIMEOUT", 5):
+        device.enable_night_mode()
+    assert device.night_mode is True
+    assert device.pending_fields == frozenset(["nmod"])
+    callback.assert_called_once_with(MessageType.STATE, frozenset(["nmod"]))
+
+    # Not confirmed yet
+    mqtt_client.state_change({"product-state": {"fnsp": ["0001", "0002"]}})
+    assert device.night_mode is True
+    assert device.speed == 2
+
+    mqtt_client.state_change({"product-state": {"nmod": ["OFF", "ON"]}})
+    assert device.night_mode is True
+    assert device.pending_fields == frozenset()
+
+
+def test_optimistic_rollback(mqtt_client: MockedMQTT):
+    """Test rolling back configuration the device does not report."""
+    device = DysonFanDevice(SERIAL, CREDENTIAL, DEVICE_TYPE)
+    device.optimistic = True
+    device.connect(HOST)
+    callback = MagicMock()
+    device.add_change_listener(callback)
+    threads = set()
+    with patch("libdyson.dyson_device.TIMEOUT", 0.05):
+        device.set_sleep_timer(15)
+        device.enable_night_mode()
+    assert device.night_mode is True
+    callback.reset_mock()
+    callback.side_effect = lambda *args: threads.add(threading.current_thread().name)
+    for _ in range(100):
+        if callback.called:
+            break
+        time.sleep(0.01)
+    assert device.pending_fields == frozenset()
+    assert device.night_mode is False
+    callback.assert_called_with(MessageType.STATE, frozenset(["nmod"]))
+    # Listeners do not run on the scheduler thread shared by all devices
+    assert threads == {"libdyson-dispatch-0"}
@@ -0,0 +1,128 @@
+"""Tests for fleet operations."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from libdyson.const import DEVICE_TYPE_PURE_COOL
+from libdyson.dyson_device import DysonFanDevice
+from libdyson.dyson_pure_cool import DysonPureCool
+from libdyson.exceptions import DysonConnectTimeout, DysonInvalidCredential
+from libdyson.fleet import DysonEnvironmentalPoller, connect_all
+
+from . import CREDENTIAL, HOST
+from .mocked_mqtt import MockedMQTT
+from .test_pure_cool import ENVIRONMENTAL_DATA, STATUS
+
+DEVICE_TYPE = DEVICE_TYPE_PURE_COOL
+
+
+class _FleetMQTT(MockedMQTT):
+    """Mocked client accepting any serial."""
+
+    def username_pw_set(self, username: str, password: str) -> None:
+        """Set username and password."""
+        super().username_pw_set(username, password)
+        self._expected_username = username
+        self._command_topic = f"{DEVICE_TYPE}/{username}/command"
+        self._status_topic = f"{DEVICE_TYPE}/{username}/status/current"
+
+
+def _create_client(protocol: str) -> _FleetMQTT:
+    return _FleetMQTT(
+        HOST, None, CREDENTIAL, None, None, STATUS, ENVIRONMENTAL_DATA
+    ).refersh(protocol)
+
+
+def test_connect_all():
+    """Test connecting multiple devices."""
+    devices = [
+        DysonPureCool(f"SERIAL-{index}", CREDENTIAL, DEVICE_TYPE) for index in range(20)
+    ]
+    devices.append(DysonPureCool("INVALID", "invalid", DEVICE_TYPE))
+    devices.append(DysonPureCool("OFFLINE", CREDENTIAL, DEVICE_TYPE))
+    hosts = {device.serial: HOST for device in devices}
+    hosts["OFFLINE"] = "192.168.1.5"
+
+    with patch("libdyson.dyson_device.mqtt.Client", _create_client):
+        start = time.monotonic()
+        results = connect_all(devices, hosts, timeout=0.5)
+        assert time.monotonic() - start < 1.5
+
+    for device in devices[:20]:
+        assert results[device.serial] is None
+        assert device.is_connected is True
+    assert isinstance(results["INVALID"], DysonInvalidCredential)
+    assert isinstance(results["OFFLINE"], DysonConnectTimeout)
+    assert devices[-1].is_connected is False
+
+
+def test_connect_all_deadline():
+    """Test devices queued after the deadline."""
+    devices = [
+        DysonPureCool("OFFLINE1", CREDENTIAL, DEVICE_TYPE),
+        DysonPureCool("OFFLINE2", CREDENTIAL, DEVICE_TYPE),
+    ]
+    hosts = {device.serial: "192.168.1.5" for device in devices}
+    with patch("libdyson.dyson_device.mqtt.Client", _create_client):
+        results = connect_all(devices, hosts, concurrency=1, timeout=0.1)
+    assert isinstance(results["OFFLINE1"], DysonConnectTimeout)
+    assert isinstance(results["OFFLINE2"], DysonConnectTimeout)
+
+
+def test_connect_all_empty():
+    """Test connecting no device."""
+    assert connect_all([], {}) == {}
+
+
+def test_connect_all_errors():
+    """Test missing hosts and unexpected errors."""
+    device = DysonPureCool("SERIAL-1", CREDENTIAL, DEVICE_TYPE)
+    with pytest.raises(KeyError):
+        connect_all([device], {})
+
+    failing = MagicMock(spec=DysonPureCool)
+    failing.serial = "FAILING"
+    failing.connect.side_effect = OSError
+    hosts = {"SERIAL-1": HOST, "FAILING": HOST}
+    with patch("libdyson.dyson_device.mqtt.Client", _create_client):
+        results = connect_all([device, failing], hosts)
+    assert results["SERIAL-1"] is None
+    assert isinstance(results["FAILING"], OSError)
+
+
+def _polled_device(connected: bool = True, age=None) -> MagicMock:
+    device = MagicMock(spec=DysonFanDevice)
+    device.is_connected = connected
+    device.environmental_data_age = age
+    device.polled_at = []
+    device.request_environmental_data.side_effect = lambda: device.polled_at.append(
+        time.monotonic()
+    )
+    return device
+
+
+def test_environmental_poller():
+    """Test polling environmental data of a fleet."""
+    devices = [_polled_device() for _ in range(4)]
+    fresh = _polled_device(age=0.1)
+    offline = _polled_device(connected=False)
+    poller = DysonEnvironmentalPoller(interval=1, max_age=1)
+    for device in devices + [fresh, offline]:
+        poller.add(device)
+    poller.add(fresh)
+    assert poller.device_count == 6
+    poller.remove(offline)
+    assert poller.device_count == 5
+
+    poller.start()
+    time.sleep(0.9)
+    poller.stop()
+
+    fresh.request_environmental_data.assert_not_called()
+    offline.request_environmental_data.assert_not_called()
+    polled_at = sorted(device.polled_at[0] for device in devices)
+    # Requests are spread over the interval
+    for previous, current in zip(polled_at, polled_at[1:]):
+        assert current - previous >= 0.15
@@ -0,0 +1,77 @@
+"""Tests for the outbound message queue."""
+
+import threading
+from typing import List, Tuple
+from unittest.mock import patch
+
+from libdyson.outbound import PRIORITY_COMMAND, PRIORITY_REQUEST, OutboundQueue
+
+
+def _merge(pending: dict, new: dict) -> dict:
+    return {"data": {**pending["data"], **new["data"]}}
+
+
+def test_rate_limit():
+    """Test queued messages are sent by priority and merged by key."""
+    published: List[Tuple[dict, int]] = []
+    sent = threading.Event()
+
+    def _publish(payload: dict, qos: int) -> None:
+        published.append((payload, qos))
+        if len(published) == 5:
+            sent.set()
+
+    queue = OutboundQueue(_publish, rate=100, burst=1)
+    queue.put({"msg": "FIRST"})
+    assert published == [({"msg": "FIRST"}, 0)]
+
+    queue.put({"msg": "REQUEST"}, priority=PRIORITY_REQUEST, key="REQUEST")
+    queue.put({"msg": "REQUEST"}, priority=PRIORITY_REQUEST, key="REQUEST")
+    queue.put({"data": {"fnsp": "0001"}}, 1, key="STATE-SET", merge=_merge)
+    queue.put({"msg": "START"})
+    queue.put({"data": {"nmod": "ON"}}, 1, key="STATE-SET", merge=_merge)
+    queue.put({"msg": "STOP"}, PRIORITY_COMMAND)
+    assert len(queue) == 4
+
+    assert sent.wait(timeout=1)
+    assert published[1:] == [
+        ({"data": {"fnsp": "0001", "nmod": "ON"}}, 1),
+        ({"msg": "START"}, 0),
+        ({"msg": "STOP"}, 0),
+        ({"msg": "REQUEST"}, 0),
+    ]
+    assert len(queue) == 0
+
+
+def test_unlimited():
+    """Test messages are sent right away without rate limit."""
+    published = []
+    queue = OutboundQueue(lambda payload, qos: published.append(payload), None, 0)
+    for index in range(50):
+        queue.put({"index": index})
+    assert len(published) == 50
+
+
+def test_full():
+    """Test a full queue evicts requests for commands and drops the rest."""
+    published = []
+    with patch("libdyson.outbound.SCHEDULER") as timeouts:
+        queue = OutboundQueue(
+            lambda payload, qos: published.append(payload), 1, 1, max_size=2
+        )
+        queue.put({"msg": "FIRST"})
+        queue.put({"msg": "REQUEST"}, priority=PRIORITY_REQUEST)
+        queue.put({"msg": "COMMAND1"})
+        # Evicts the request
+        queue.put({"msg": "COMMAND2"})
+        assert queue.dropped == 1
+        # Nothing left to evict
+        queue.put({"msg": "COMMAND3"})
+        queue.put({"msg": "REQUEST"}, priority=PRIORITY_REQUEST)
+        assert queue.dropped == 3
+        assert len(queue) == 2
+        timeouts.call_later.assert_called_once()
+
+        queue.clear()
+        assert len(queue) == 0
+    assert published == [{"msg": "FIRST"}]
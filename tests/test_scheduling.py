@@ -0,0 +1,40 @@
+"""Tests for shared timers and rate limits."""
+
+import threading
+from unittest.mock import patch
+
+from libdyson.scheduling import Scheduler, TokenBucket
+
+
+def test_scheduler():
+    """Test callbacks run in order of their delay."""
+    scheduler = Scheduler("libdyson-test-scheduler")
+    calls = []
+    done = threading.Event()
+
+    def _fail():
+        raise RuntimeError
+
+    def _last():
+        calls.append("last")
+        done.set()
+
+    scheduler.call_later(0.02, _last)
+    scheduler.call_later(0.01, _fail)
+    scheduler.call_later(0, lambda: calls.append("first"))
+    # A failing callback does not stop the others
+    assert done.wait(timeout=5)
+    assert calls == ["first", "last"]
+
+
+def test_token_bucket():
+    """Test tokens are refilled at rate up to burst."""
+    with patch("libdyson.scheduling.time.monotonic", return_value=0):
+        bucket = TokenBucket(rate=2, burst=2)
+        assert bucket.consume() == 0
+        assert bucket.consume() == 0
+        assert bucket.consume() == 0.5
+    with patch("libdyson.scheduling.time.monotonic", return_value=10):
+        assert bucket.consume() == 0
+        assert bucket.consume() == 0
+        assert bucket.consume() == 0.5
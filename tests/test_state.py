@@ -0,0 +1,61 @@
+"""Tests for state snapshots."""
+
+import attr
+import pytest
+
+from libdyson.const import ENVIRONMENTAL_INIT
+from libdyson.dyson_device import DysonFanEnvironmentalData, DysonFanStatus
+from libdyson.dyson_pure_hot_cool import DysonPureHotCoolStatus
+
+
+def test_from_raw():
+    """Test building a snapshot from raw state."""
+    status = DysonFanStatus.from_raw(
+        {"fnst": "FAN", "fnsp": "AUTO", "nmod": "OFF", "ercd": "NONE"}
+    )
+    assert status.fan_state is True
+    assert status.speed is None
+    assert status.night_mode is False
+    assert status.error_code == "NONE"
+    # Missing fields
+    assert status.continuous_monitoring is None
+    assert status.warning_code is None
+
+    environmental_data = DysonFanEnvironmentalData.from_raw(
+        {"hact": "0050", "tact": "2950", "sltm": "INIT"}
+    )
+    assert environmental_data.humidity == 50
+    assert environmental_data.temperature == 295.0
+    assert environmental_data.sleep_timer == ENVIRONMENTAL_INIT
+
+
+def test_immutable():
+    """Test snapshots are immutable and slots based."""
+    status = DysonPureHotCoolStatus.from_raw({"fnsp": "0003", "hmax": "2960"})
+    assert status.speed == 3
+    assert status.heat_target == 296
+    with pytest.raises(attr.exceptions.FrozenInstanceError):
+        status.speed = 4
+    assert not hasattr(status, "__dict__")
+
+
+def test_merge():
+    """Test merging changed fields into a snapshot."""
+    status = DysonFanStatus.from_raw({"fnst": "FAN", "fnsp": "0001", "nmod": "OFF"})
+    assert status.merge({"fnsp": "0001"}) is status
+
+    merged = status.merge({"fnsp": "0004"})
+    assert merged.speed == 4
+    assert merged.fan_state is True
+    assert status.speed == 1
+    assert merged.changed_fields(status) == frozenset(["fnsp"])
+    assert status.changed_fields(None) == frozenset(["fnst", "fnsp", "nmod"])
+
+
+def test_matches():
+    """Test checking if a snapshot shows raw values."""
+    status = DysonPureHotCoolStatus.from_raw({"fnsp": "0003", "hmax": "2960"})
+    assert status.matches({"fnsp": "0003", "hmax": "2960"})
+    assert status.matches({"rstf": "RSTF"})
+    assert not status.matches({"fnsp": "0004"})
+    assert not status.matches({"fnsp": "INVALID"})